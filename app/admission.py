@@ -0,0 +1,209 @@
+"""
+Admission control for the web dashboard.
+
+Each route class gets a concurrency limit and a bounded FIFO queue with a
+deadline. Requests are admitted in arrival order as slots free up; when the
+queue is full or the deadline passes, the request is rejected.
+"""
+
+import asyncio
+import threading
+import time
+from collections import deque
+from typing import Callable, Deque, Dict, Optional
+
+from app.exceptions import OpenManusError
+
+
+class AdmissionRejected(OpenManusError):
+    """Raised when a request cannot be admitted"""
+
+    def __init__(self, route_class: str, reason: str):
+        self.route_class = route_class
+        self.reason = reason  # "queue_full" or "timeout"
+        super().__init__(f"Request rejected by '{route_class}' admission: {reason}")
+
+
+class _Waiter:
+    """A queued request, woken up once a slot has been handed over to it."""
+
+    __slots__ = ("wake", "admitted")
+
+    def __init__(self, wake: Callable[[], None]):
+        self.wake = wake
+        self.admitted = False
+
+
+class AdmissionQueue:
+    """Concurrency limit with a bounded FIFO queue for one route class.
+
+    Usable from request threads (`acquire`) and from an event loop
+    (`acquire_async`); both kinds of waiters share the same queue.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        max_concurrent: int,
+        max_queue: int = 16,
+        timeout: float = 30.0,
+        wait_samples: int = 256,
+    ):
+        self.name = name
+        self.max_concurrent = max_concurrent
+        self.max_queue = max_queue
+        self.timeout = timeout
+
+        self._lock = threading.Lock()
+        self._waiters: Deque[_Waiter] = deque()
+        self._active = 0
+        self._admitted = 0
+        self._rejected = 0
+        self._timed_out = 0
+        self._wait_times: Deque[float] = deque(maxlen=wait_samples)
+
+    def _admit_or_enqueue(self, waiter: _Waiter) -> bool:
+        """Take a free slot or join the queue. Must hold the lock.
+
+        Returns:
+            True if admitted immediately, False if queued.
+
+        Raises:
+            AdmissionRejected: If the queue is full.
+        """
+        if self._active < self.max_concurrent and not self._waiters:
+            self._active += 1
+            self._record_admission(0.0)
+            return True
+        if len(self._waiters) >= self.max_queue:
+            self._rejected += 1
+            raise AdmissionRejected(self.name, "queue_full")
+        self._waiters.append(waiter)
+        return False
+
+    def _abandon(self, waiter: _Waiter) -> bool:
+        """Leave the queue after a timeout. Must hold the lock.
+
+        Returns:
+            True if the waiter was admitted in the meantime and keeps its slot.
+        """
+        if waiter.admitted:
+            return True
+        self._waiters.remove(waiter)
+        self._timed_out += 1
+        return False
+
+    def _record_admission(self, wait_time: float) -> None:
+        self._admitted += 1
+        self._wait_times.append(wait_time)
+
+    def acquire(self, timeout: Optional[float] = None) -> None:
+        """Wait for a slot from a request thread.
+
+        Raises:
+            AdmissionRejected: If the queue is full or the deadline passes.
+        """
+        event = threading.Event()
+        waiter = _Waiter(event.set)
+        start = time.monotonic()
+        with self._lock:
+            if self._admit_or_enqueue(waiter):
+                return
+
+        admitted = event.wait(self.timeout if timeout is None else timeout)
+        with self._lock:
+            if admitted or self._abandon(waiter):
+                self._record_admission(time.monotonic() - start)
+                return
+        raise AdmissionRejected(self.name, "timeout")
+
+    async def acquire_async(self, timeout: Optional[float] = None) -> None:
+        """Wait for a slot from the event loop without blocking it.
+
+        Raises:
+            AdmissionRejected: If the queue is full or the deadline passes.
+        """
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+
+        def set_admitted() -> None:
+            if not future.done():
+                future.set_result(None)
+
+        waiter = _Waiter(lambda: loop.call_soon_threadsafe(set_admitted))
+        start = time.monotonic()
+        with self._lock:
+            if self._admit_or_enqueue(waiter):
+                return
+
+        try:
+            await asyncio.wait_for(
+                asyncio.shield(future), self.timeout if timeout is None else timeout
+            )
+        except asyncio.TimeoutError:
+            with self._lock:
+                if not self._abandon(waiter):
+                    raise AdmissionRejected(self.name, "timeout")
+        except asyncio.CancelledError:
+            with self._lock:
+                admitted = self._abandon(waiter)
+            if admitted:
+                self.release()
+            raise
+        with self._lock:
+            self._record_admission(time.monotonic() - start)
+
+    def release(self) -> None:
+        """Free a slot, handing it straight to the oldest queued request"""
+        with self._lock:
+            if self._waiters:
+                waiter = self._waiters.popleft()
+                waiter.admitted = True
+                waiter.wake()
+            else:
+                self._active -= 1
+
+    def get_stats(self) -> Dict:
+        """Get queue depth, counters and recent wait times"""
+        with self._lock:
+            waits = sorted(self._wait_times)
+            return {
+                "active": self._active,
+                "max_concurrent": self.max_concurrent,
+                "queued": len(self._waiters),
+                "max_queue": self.max_queue,
+                "timeout": self.timeout,
+                "admitted": self._admitted,
+                "rejected": self._rejected,
+                "timed_out": self._timed_out,
+                "wait_avg": sum(waits) / len(waits) if waits else 0.0,
+                "wait_p95": waits[int(len(waits) * 0.95)] if waits else 0.0,
+                "wait_max": waits[-1] if waits else 0.0,
+            }
+
+
+class AdmissionController:
+    """Registry of admission queues, one per route class"""
+
+    def __init__(self):
+        self._queues: Dict[str, AdmissionQueue] = {}
+
+    def add_queue(
+        self,
+        name: str,
+        max_concurrent: int,
+        max_queue: int = 16,
+        timeout: float = 30.0,
+    ) -> AdmissionQueue:
+        """Register the admission queue for a route class"""
+        queue = AdmissionQueue(name, max_concurrent, max_queue, timeout)
+        self._queues[name] = queue
+        return queue
+
+    def get_queue(self, name: str) -> Optional[AdmissionQueue]:
+        """Get the admission queue of a route class, if it has one"""
+        return self._queues.get(name)
+
+    def get_stats(self) -> Dict[str, Dict]:
+        """Get stats for every route class"""
+        return {name: queue.get_stats() for name, queue in self._queues.items()}
@@ -1,3 +1,4 @@
+import itertools
 from abc import ABC, abstractmethod
 from contextlib import asynccontextmanager
 from typing import List, Optional
@@ -6,8 +7,10 @@ from pydantic import BaseModel, Field, model_validator
 
 from app.llm import LLM
 from app.logger import logger
-from app.sandbox.client import SANDBOX_CLIENT
+from app.prompt.memory import SUMMARIZE_PROMPT, SUMMARY_MESSAGE_CHARS
+from app.runtime import get_runtime
 from app.schema import ROLE_TYPE, AgentState, Memory, Message
+from app.session import AgentSnapshot, SessionLog
 
 
 class BaseAgent(BaseModel, ABC):
@@ -42,6 +45,19 @@ class BaseAgent(BaseModel, ABC):
 
     duplicate_threshold: int = 2
 
+    # Persistence
+    session: Optional[SessionLog] = Field(
+        default=None, description="Append-only log the agent checkpoints to"
+    )
+    session_key: Optional[str] = Field(
+        default=None, description="Key of this agent in the session log"
+    )
+
+    memory_context_share: float = Field(
+        default=0.8,
+        description="Share of the model context (after the completion) for memory",
+    )
+
     class Config:
         arbitrary_types_allowed = True
         extra = "allow"  # Allow extra fields for flexibility in subclasses
@@ -53,8 +69,40 @@ class BaseAgent(BaseModel, ABC):
             self.llm = LLM(config_name=self.name.lower())
         if not isinstance(self.memory, Memory):
             self.memory = Memory()
+        self._bind_memory()
         return self
 
+    def _bind_memory(self) -> None:
+        """Budget the memory by the model context and compact it with the LLM."""
+        if self.memory.max_tokens is None and self.llm.context_window:
+            budget = int(
+                (self.llm.context_window - self.llm.max_tokens)
+                * self.memory_context_share
+            )
+            self.memory.max_tokens = budget if budget > 0 else None
+        if self.memory.max_tokens is not None:
+            self.memory.bind(
+                token_counter=self.llm.count_message,
+                summarizer=self.summarize_messages,
+            )
+
+    async def summarize_messages(self, messages: List[Message]) -> str:
+        """Summarize older messages so memory can be compacted."""
+        lines = []
+        for message in messages:
+            text = message.content or ""
+            if message.tool_calls:
+                calls = ", ".join(
+                    f"{call.function.name}({call.function.arguments})"
+                    for call in message.tool_calls
+                )
+                text = f"{text} [tool calls: {calls}]".strip()
+            role = f"{message.role} {message.name}" if message.name else message.role
+            lines.append(f"[{role}] {text[:SUMMARY_MESSAGE_CHARS]}")
+
+        prompt = SUMMARIZE_PROMPT.format(transcript="\n".join(lines))
+        return await self.llm.ask([Message.user_message(prompt)], stream=False)
+
     @asynccontextmanager
     async def state_context(self, new_state: AgentState):
         """Context manager for safe agent state transitions.
@@ -130,6 +178,7 @@ class BaseAgent(BaseModel, ABC):
 
         if request:
             self.update_memory("user", request)
+            self.checkpoint()
 
         results: List[str] = []
         async with self.state_context(AgentState.RUNNING):
@@ -145,14 +194,31 @@ class BaseAgent(BaseModel, ABC):
                     self.handle_stuck_state()
 
                 results.append(f"Step {self.current_step}: {step_result}")
+                self.checkpoint()
 
             if self.current_step >= self.max_steps:
                 self.current_step = 0
                 self.state = AgentState.IDLE
                 results.append(f"Terminated: Reached max steps ({self.max_steps})")
-        await SANDBOX_CLIENT.cleanup()
+        self.checkpoint()
+        await get_runtime().sandbox.cleanup()
         return "\n".join(results) if results else "No steps executed"
 
+    def checkpoint(self) -> None:
+        """Append the agent's progress to its session log, if it has one."""
+        if self.session is not None:
+            self.session.record_agent(self.session_key or self.name, self)
+
+    def restore(self, snapshot: AgentSnapshot) -> None:
+        """Restore memory and step counter from a replayed session log.
+
+        An agent that was interrupted mid-run is put back to IDLE, so that
+        `run` continues from the restored step.
+        """
+        self.memory.messages = snapshot.messages
+        self.current_step = snapshot.current_step
+        self.state = AgentState.IDLE
+
     @abstractmethod
     async def step(self) -> str:
         """Execute a single step in the agent's workflow.
@@ -179,7 +245,7 @@ class BaseAgent(BaseModel, ABC):
         # Count identical content occurrences
         duplicate_count = sum(
             1
-            for msg in reversed(self.memory.messages[:-1])
+            for msg in itertools.islice(reversed(self.memory.messages), 1, None)
             if msg.role == "assistant" and msg.content == last_message.content
         )
 
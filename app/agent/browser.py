@@ -1,5 +1,5 @@
 import json
-from typing import Any, Optional
+from typing import Any, Optional, Tuple
 
 from pydantic import Field
 
@@ -37,6 +37,7 @@ class BrowserAgent(ToolCallAgent):
     special_tool_names: list[str] = Field(default_factory=lambda: [Terminate().name])
 
     _current_base64_image: Optional[str] = None
+    _current_image_dimensions: Optional[Tuple[int, int]] = None
 
     async def _handle_special_tool(self, name: str, result: Any, **kwargs):
         if not self._is_special_tool(name):
@@ -59,12 +60,18 @@ class BrowserAgent(ToolCallAgent):
                 logger.debug(f"Browser state error: {result.error}")
                 return None
 
-            # Store screenshot if available
-            if hasattr(result, "base64_image") and result.base64_image:
-                self._current_base64_image = result.base64_image
-
             # Parse the state info
-            return json.loads(result.output)
+            state = json.loads(result.output)
+
+            # Store the screenshot; none is taken when the page is unchanged
+            self._current_base64_image = result.base64_image or None
+            screenshot = state.get("screenshot") or {}
+            self._current_image_dimensions = (
+                (screenshot["width"], screenshot["height"])
+                if "width" in screenshot and "height" in screenshot
+                else None
+            )
+            return state
 
         except Exception as e:
             logger.debug(f"Failed to get browser state: {str(e)}")
@@ -108,8 +115,10 @@ class BrowserAgent(ToolCallAgent):
                 image_message = Message.user_message(
                     content="Current browser screenshot:",
                     base64_image=self._current_base64_image,
+                    image_dimensions=self._current_image_dimensions,
                 )
                 self.memory.add_message(image_message)
+                self._current_base64_image = None
 
         # Replace placeholders with actual browser state info
         self.next_step_prompt = NEXT_STEP_PROMPT.format(
@@ -29,6 +29,8 @@ class Manus(BrowserAgent):
 
     max_observe: int = 10000
     max_steps: int = 20
+    parallel_tool_calls: bool = True
+    stream_tool_calls: bool = True
 
     # Add general-purpose tools to the tool collection
     available_tools: ToolCollection = Field(
@@ -43,7 +45,7 @@ class Manus(BrowserAgent):
         original_prompt = self.next_step_prompt
 
         # Only check recent messages (last 3) for browser activity
-        recent_messages = self.memory.messages[-3:] if self.memory.messages else []
+        recent_messages = self.memory.get_recent_messages(3)
         browser_in_use = any(
             "browser_use" in msg.content.lower()
             for msg in recent_messages
@@ -56,7 +56,7 @@ class PlanningAgent(ToolCallAgent):
             if self.active_plan_id
             else self.next_step_prompt
         )
-        self.messages.append(Message.user_message(prompt))
+        self.memory.add_message(Message.user_message(prompt))
 
         # Get the current step index before thinking
         self.current_step_index = await self._get_current_step_index()
@@ -157,46 +157,17 @@ class PlanningAgent(ToolCallAgent):
 
     async def _get_current_step_index(self) -> Optional[int]:
         """
-        Parse the current plan to identify the first non-completed step's index.
+        Find the first non-completed step's index and mark it in progress.
         Returns None if no active step is found.
         """
         if not self.active_plan_id:
             return None
 
-        plan = await self.get_plan()
-
-        try:
-            plan_lines = plan.splitlines()
-            steps_index = -1
-
-            # Find the index of the "Steps:" line
-            for i, line in enumerate(plan_lines):
-                if line.strip() == "Steps:":
-                    steps_index = i
-                    break
-
-            if steps_index == -1:
-                return None
-
-            # Find the first non-completed step
-            for i, line in enumerate(plan_lines[steps_index + 1 :], start=0):
-                if "[ ]" in line or "[→]" in line:  # not_started or in_progress
-                    # Mark current step as in_progress
-                    await self.available_tools.execute(
-                        name="planning",
-                        tool_input={
-                            "command": "mark_step",
-                            "plan_id": self.active_plan_id,
-                            "step_index": i,
-                            "step_status": "in_progress",
-                        },
-                    )
-                    return i
-
-            return None  # No active step found
-        except Exception as e:
-            logger.warning(f"Error finding current step index: {e}")
+        plans = self.available_tools.get_tool("planning").plans
+        if self.active_plan_id not in plans:
             return None
+        # The plan store indexes the current step, so no need to render the plan
+        return plans.start_current_step(self.active_plan_id)
 
     async def create_initial_plan(self, request: str) -> None:
         """Create an initial plan based on the request."""
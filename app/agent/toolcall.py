@@ -1,5 +1,6 @@
+import asyncio
 import json
-from typing import Any, List, Optional, Union
+from typing import Any, List, Optional, Tuple, Union
 
 from pydantic import Field
 
@@ -14,6 +15,61 @@ from app.tool import CreateChatCompletion, Terminate, ToolCollection
 TOOL_CALL_REQUIRED = "Tool calls required but none provided"
 
 
+class ToolCallDispatcher:
+    """
+    Starts an agent's tool calls as they arrive from a streamed response.
+
+    Calls keep the ordering rules of `ToolCallAgent._execute_tool_calls`: in
+    sequential mode each call waits for the previous one; in parallel mode
+    parallel-safe calls wait only for the last exclusive call, while
+    exclusive and special calls wait for every call before them.
+    """
+
+    def __init__(self, agent: "ToolCallAgent"):
+        self.agent = agent
+        self._semaphore = asyncio.Semaphore(max(1, agent.max_concurrent_tools))
+        self._tasks: List[Tuple[Any, asyncio.Task]] = []
+        self._barrier: Optional[asyncio.Task] = None
+
+    def dispatch(self, call: ToolCall) -> None:
+        """Start a tool call once the calls it must follow have finished."""
+        if any(dispatched is call for dispatched, _ in self._tasks):
+            return
+        previous = [task for _, task in self._tasks]
+        if not self.agent.parallel_tool_calls:
+            task = self._start(call, previous[-1:], limited=False)
+        elif self.agent._is_parallel_safe(call):
+            barrier = [self._barrier] if self._barrier else []
+            task = self._start(call, barrier, limited=True)
+        else:
+            task = self._barrier = self._start(call, previous, limited=False)
+        self._tasks.append((call, task))
+
+    def _start(
+        self, call: ToolCall, after: List[asyncio.Task], limited: bool
+    ) -> asyncio.Task:
+        async def run() -> Tuple[str, Optional[str]]:
+            if after:
+                await asyncio.wait(after)
+            if limited:
+                async with self._semaphore:
+                    return await self.agent._execute_tool_call(call)
+            return await self.agent._execute_tool_call(call)
+
+        return asyncio.create_task(run())
+
+    async def results(self, calls: List[ToolCall]) -> List[Tuple[str, Optional[str]]]:
+        """Wait for the given calls, starting any not dispatched yet, in order."""
+        for call in calls:
+            self.dispatch(call)
+        tasks = {id(call): task for call, task in self._tasks}
+        return [await tasks[id(call)] for call in calls]
+
+    def cancel(self) -> None:
+        for _, task in self._tasks:
+            task.cancel()
+
+
 class ToolCallAgent(ReActAgent):
     """Base agent class for handling tool/function calls with enhanced abstraction"""
 
@@ -35,12 +91,27 @@ class ToolCallAgent(ReActAgent):
     max_steps: int = 30
     max_observe: Optional[Union[int, bool]] = None
 
+    # Run independent (parallel-safe) tool calls of one turn concurrently
+    parallel_tool_calls: bool = False
+    max_concurrent_tools: int = 4
+    # Stream responses and start each tool call as soon as it is complete
+    stream_tool_calls: bool = False
+    _dispatcher: Optional[ToolCallDispatcher] = None
+
     async def think(self) -> bool:
         """Process current state and decide next actions using tools"""
         if self.next_step_prompt:
             user_msg = Message.user_message(self.next_step_prompt)
-            self.messages += [user_msg]
+            self.memory.add_message(user_msg)
 
+        # Tools may start while the rest of the response is still streaming
+        dispatcher = (
+            ToolCallDispatcher(self)
+            if self.stream_tool_calls and self.tool_choices != ToolChoice.NONE
+            else None
+        )
+        self._dispatcher = None
+        received = False
         try:
             # Get response with tool options
             response = await self.llm.ask_tool(
@@ -52,16 +123,23 @@ class ToolCallAgent(ReActAgent):
                 ),
                 tools=self.available_tools.to_params(),
                 tool_choice=self.tool_choices,
+                tools_tokens=self.available_tools.count_param_tokens(
+                    self.llm.token_counter
+                ),
+                on_tool_call=dispatcher.dispatch if dispatcher else None,
             )
+            received = True
         except ValueError:
             raise
         except Exception as e:
-            # Check if this is a RetryError containing TokenLimitExceeded
-            if hasattr(e, "__cause__") and isinstance(e.__cause__, TokenLimitExceeded):
-                token_limit_error = e.__cause__
-                logger.error(
-                    f"🚨 Token limit error (from RetryError): {token_limit_error}"
+            # TokenLimitExceeded is not retried, but may be wrapped by a caller
+            if isinstance(e, TokenLimitExceeded) or isinstance(
+                e.__cause__, TokenLimitExceeded
+            ):
+                token_limit_error = (
+                    e if isinstance(e, TokenLimitExceeded) else e.__cause__
                 )
+                logger.error(f"🚨 Token limit error: {token_limit_error}")
                 self.memory.add_message(
                     Message.assistant_message(
                         f"Maximum token limit reached, cannot continue execution: {str(token_limit_error)}"
@@ -70,6 +148,9 @@ class ToolCallAgent(ReActAgent):
                 self.state = AgentState.FINISHED
                 return False
             raise
+        finally:
+            if dispatcher and not received:
+                dispatcher.cancel()
 
         self.tool_calls = tool_calls = (
             response.tool_calls if response and response.tool_calls else []
@@ -110,6 +191,9 @@ class ToolCallAgent(ReActAgent):
             )
             self.memory.add_message(assistant_msg)
 
+            # act() collects the calls that were started during streaming
+            self._dispatcher = dispatcher
+
             if self.tool_choices == ToolChoice.REQUIRED and not self.tool_calls:
                 return True  # Will be handled in act()
 
@@ -119,6 +203,8 @@ class ToolCallAgent(ReActAgent):
 
             return bool(self.tool_calls)
         except Exception as e:
+            if dispatcher:
+                dispatcher.cancel()
             logger.error(f"🚨 Oops! The {self.name}'s thinking process hit a snag: {e}")
             self.memory.add_message(
                 Message.assistant_message(
@@ -136,12 +222,11 @@ class ToolCallAgent(ReActAgent):
             # Return last message content if no tool calls
             return self.messages[-1].content or "No content or commands to execute"
 
-        results = []
-        for command in self.tool_calls:
-            # Reset base64_image for each tool call
-            self._current_base64_image = None
+        outcomes = await self._execute_tool_calls()
 
-            result = await self.execute_tool(command)
+        results = []
+        for command, (result, base64_image) in zip(self.tool_calls, outcomes):
+            self._current_base64_image = base64_image
 
             if self.max_observe:
                 result = result[: self.max_observe]
@@ -150,26 +235,78 @@ class ToolCallAgent(ReActAgent):
                 f"🎯 Tool '{command.function.name}' completed its mission! Result: {result}"
             )
 
-            # Add tool response to memory
+            # Add tool response to memory, in the order the calls were made
             tool_msg = Message.tool_message(
                 content=result,
                 tool_call_id=command.id,
                 name=command.function.name,
-                base64_image=self._current_base64_image,
+                base64_image=base64_image,
             )
             self.memory.add_message(tool_msg)
             results.append(result)
 
         return "\n\n".join(results)
 
+    async def _execute_tool_calls(self) -> List[Tuple[str, Optional[str]]]:
+        """Execute all pending tool calls, returning results in call order.
+
+        In parallel mode, consecutive parallel-safe calls are gathered under a
+        concurrency limit, while exclusive and special tools run on their own
+        after everything before them has finished.
+        """
+        if self._dispatcher is not None:
+            dispatcher, self._dispatcher = self._dispatcher, None
+            return await dispatcher.results(self.tool_calls)
+
+        if not self.parallel_tool_calls:
+            return [await self._execute_tool_call(call) for call in self.tool_calls]
+
+        semaphore = asyncio.Semaphore(max(1, self.max_concurrent_tools))
+
+        async def run_limited(call: ToolCall) -> Tuple[str, Optional[str]]:
+            async with semaphore:
+                return await self._execute_tool_call(call)
+
+        outcomes: List[Tuple[str, Optional[str]]] = []
+        batch: List[ToolCall] = []
+        for call in self.tool_calls:
+            if self._is_parallel_safe(call):
+                batch.append(call)
+                continue
+            if batch:
+                outcomes.extend(await asyncio.gather(*map(run_limited, batch)))
+                batch = []
+            outcomes.append(await self._execute_tool_call(call))
+        if batch:
+            outcomes.extend(await asyncio.gather(*map(run_limited, batch)))
+        return outcomes
+
+    def _is_parallel_safe(self, command: ToolCall) -> bool:
+        """Check if a tool call may run concurrently with other calls"""
+        name = command.function.name if command and command.function else None
+        tool = self.available_tools.get_tool(name) if name else None
+        if tool is None:
+            return True  # Invalid calls fail fast without side effects
+        return tool.parallel_safe and not self._is_special_tool(name)
+
     async def execute_tool(self, command: ToolCall) -> str:
         """Execute a single tool call with robust error handling"""
+        observation, base64_image = await self._execute_tool_call(command)
+        if base64_image:
+            self._current_base64_image = base64_image
+        return observation
+
+    async def _execute_tool_call(self, command: ToolCall) -> Tuple[str, Optional[str]]:
+        """Execute a single tool call, returning its observation and any image.
+
+        Keeps no per-call state on the agent so that calls can run concurrently.
+        """
         if not command or not command.function or not command.function.name:
-            return "Error: Invalid command format"
+            return "Error: Invalid command format", None
 
         name = command.function.name
         if name not in self.available_tools.tool_map:
-            return f"Error: Unknown tool '{name}'"
+            return f"Error: Unknown tool '{name}'", None
 
         try:
             # Parse arguments
@@ -182,37 +319,26 @@ class ToolCallAgent(ReActAgent):
             # Handle special tools
             await self._handle_special_tool(name=name, result=result)
 
-            # Check if result is a ToolResult with base64_image
-            if hasattr(result, "base64_image") and result.base64_image:
-                # Store the base64_image for later use in tool_message
-                self._current_base64_image = result.base64_image
-
-                # Format result for display
-                observation = (
-                    f"Observed output of cmd `{name}` executed:\n{str(result)}"
-                    if result
-                    else f"Cmd `{name}` completed with no output"
-                )
-                return observation
+            # Keep the screenshot, if any, for the tool message
+            base64_image = getattr(result, "base64_image", None) or None
 
-            # Format result for display (standard case)
+            # Format result for display
             observation = (
                 f"Observed output of cmd `{name}` executed:\n{str(result)}"
                 if result
                 else f"Cmd `{name}` completed with no output"
             )
-
-            return observation
+            return observation, base64_image
         except json.JSONDecodeError:
             error_msg = f"Error parsing arguments for {name}: Invalid JSON format"
             logger.error(
                 f"📝 Oops! The arguments for '{name}' don't make sense - invalid JSON, arguments:{command.function.arguments}"
             )
-            return f"Error: {error_msg}"
+            return f"Error: {error_msg}", None
         except Exception as e:
             error_msg = f"⚠️ Tool '{name}' encountered a problem: {str(e)}"
             logger.exception(error_msg)
-            return f"Error: {error_msg}"
+            return f"Error: {error_msg}", None
 
     async def _handle_special_tool(self, name: str, result: Any, **kwargs):
         """Handle special tool execution and state changes"""
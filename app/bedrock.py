@@ -6,6 +6,8 @@ import uuid
 from datetime import datetime
 import sys
 
+from app.streaming import get_stream_sink
+
 # Global variables to track the current tool use ID across function calls
 # Tmp solution
 CURRENT_TOOLUSE_ID = None
@@ -222,35 +224,44 @@ class ChatCompletions:
             'usage': {},
             'metrics': {}
         }
-        bedrock_response_text = ""
-        bedrock_response_tool_input = ""
+        bedrock_response_text = []
+        bedrock_response_tool_input = []
+        sink = get_stream_sink()
 
         # Process streaming response
         stream = response.get('stream')
         if stream:
-            for event in stream:
-                if event.get('messageStart', {}).get('role'):
-                    bedrock_response['output']['message']['role'] = event['messageStart']['role']
-                if event.get('contentBlockDelta', {}).get('delta', {}).get('text'):
-                    bedrock_response_text += event['contentBlockDelta']['delta']['text']
-                    print(event['contentBlockDelta']['delta']['text'], end='', flush=True)
-                if event.get('contentBlockStop', {}).get('contentBlockIndex') == 0:
-                    bedrock_response['output']['message']['content'].append({"text": bedrock_response_text})
-                if event.get('contentBlockStart', {}).get('start', {}).get('toolUse'):
-                    bedrock_tool_use = event['contentBlockStart']['start']['toolUse']
-                    tool_use = {
-                        "toolUseId": bedrock_tool_use['toolUseId'],
-                        "name": bedrock_tool_use['name'],
-                    }
-                    bedrock_response['output']['message']['content'].append({"toolUse": tool_use})
-                    global CURRENT_TOOLUSE_ID
-                    CURRENT_TOOLUSE_ID = bedrock_tool_use['toolUseId']
-                if event.get('contentBlockDelta', {}).get('delta', {}).get('toolUse'):
-                    bedrock_response_tool_input += event['contentBlockDelta']['delta']['toolUse']['input']
-                    print(event['contentBlockDelta']['delta']['toolUse']['input'], end='', flush=True)
-                if event.get('contentBlockStop', {}).get('contentBlockIndex') == 1:
-                    bedrock_response['output']['message']['content'][1]['toolUse']['input'] = json.loads(bedrock_response_tool_input)
-        print()
+            try:
+                for event in stream:
+                    if event.get('messageStart', {}).get('role'):
+                        bedrock_response['output']['message']['role'] = event['messageStart']['role']
+                    if event.get('contentBlockDelta', {}).get('delta', {}).get('text'):
+                        text = event['contentBlockDelta']['delta']['text']
+                        bedrock_response_text.append(text)
+                        if sink is not None:
+                            await sink.on_token(text)
+                    if event.get('contentBlockStop', {}).get('contentBlockIndex') == 0:
+                        bedrock_response['output']['message']['content'].append({"text": "".join(bedrock_response_text)})
+                    if event.get('contentBlockStart', {}).get('start', {}).get('toolUse'):
+                        bedrock_tool_use = event['contentBlockStart']['start']['toolUse']
+                        tool_use = {
+                            "toolUseId": bedrock_tool_use['toolUseId'],
+                            "name": bedrock_tool_use['name'],
+                        }
+                        bedrock_response['output']['message']['content'].append({"toolUse": tool_use})
+                        global CURRENT_TOOLUSE_ID
+                        CURRENT_TOOLUSE_ID = bedrock_tool_use['toolUseId']
+                    if event.get('contentBlockDelta', {}).get('delta', {}).get('toolUse'):
+                        bedrock_response_tool_input.append(event['contentBlockDelta']['delta']['toolUse']['input'])
+                    if event.get('contentBlockStop', {}).get('contentBlockIndex') == 1:
+                        bedrock_response['output']['message']['content'][1]['toolUse']['input'] = json.loads("".join(bedrock_response_tool_input))
+            except Exception:
+                # The partial text is void; the request may be retried
+                if sink is not None and bedrock_response_text:
+                    await sink.on_reset()
+                raise
+        if sink is not None and bedrock_response_text:
+            await sink.on_end("".join(bedrock_response_text))
         openai_response = self._convert_bedrock_response_to_openai_format(bedrock_response)
         return openai_response
 
@@ -24,9 +24,45 @@ class LLMSettings(BaseModel):
         None,
         description="Maximum input tokens to use across all requests (None for unlimited)",
     )
+    context_window: Optional[int] = Field(
+        None,
+        description="Model context size in tokens (None to infer it from the model name)",
+    )
     temperature: float = Field(1.0, description="Sampling temperature")
     api_type: str = Field(..., description="Azure, Openai, or Ollama")
     api_version: str = Field(..., description="Azure Openai version if AzureOpenai")
+    cache_backend: Optional[str] = Field(
+        None, description="Response cache backend: memory, sqlite, or None to disable"
+    )
+    cache_ttl: Optional[int] = Field(
+        None, description="Seconds a cached response stays valid (None for no expiry)"
+    )
+    cache_max_entries: int = Field(
+        1000, description="Maximum number of cached responses before eviction"
+    )
+    cache_path: Optional[str] = Field(
+        None, description="SQLite cache file path (defaults to .cache/llm_cache.sqlite)"
+    )
+    requests_per_minute: Optional[int] = Field(
+        None,
+        description="Requests per minute allowed to this model (None for no limit)",
+    )
+    tokens_per_minute: Optional[int] = Field(
+        None,
+        description="Input tokens per minute allowed to this model (None for no limit)",
+    )
+    max_concurrent_requests: Optional[int] = Field(
+        None, description="Maximum requests in flight to this model (None for no limit)"
+    )
+    max_connections: int = Field(
+        100, description="Maximum open HTTP connections to the API endpoint"
+    )
+    max_keepalive_connections: int = Field(
+        20, description="Idle HTTP connections kept alive to the API endpoint"
+    )
+    keepalive_expiry: float = Field(
+        30.0, description="Seconds an idle HTTP connection is kept alive"
+    )
 
 
 class ProxySettings(BaseModel):
@@ -49,6 +85,35 @@ class SearchSettings(BaseModel):
         default=3,
         description="Maximum number of times to retry all engines when all fail",
     )
+    hedged: bool = Field(
+        default=False,
+        description="Race fallback engines against a slow or failing preferred engine",
+    )
+    hedge_delay: float = Field(
+        default=2.0,
+        description="Seconds to wait for an engine before also starting the next one in hedged mode",
+    )
+    adaptive_order: bool = Field(
+        default=True,
+        description="Order engines by their observed latency and error rate",
+    )
+    cache_enabled: bool = Field(
+        default=False, description="Whether to cache search results"
+    )
+    cache_ttl: int = Field(
+        default=3600, description="Seconds a cached search result stays valid"
+    )
+    negative_cache_ttl: int = Field(
+        default=60,
+        description="Seconds to skip an engine after it failed for the same query",
+    )
+    cache_max_entries: int = Field(
+        default=1000, description="Maximum number of cached searches per tier"
+    )
+    cache_path: Optional[str] = Field(
+        None,
+        description="SQLite file for a persistent cache tier (memory only if unset)",
+    )
 
 
 class BrowserSettings(BaseModel):
@@ -74,6 +139,36 @@ class BrowserSettings(BaseModel):
     max_content_length: int = Field(
         2000, description="Maximum length for content retrieval operations"
     )
+    max_browsers: int = Field(
+        1, description="Number of long-lived browsers shared by all browser tools"
+    )
+    max_contexts: int = Field(
+        4, description="Maximum number of browser contexts leased at once"
+    )
+    context_max_pages: int = Field(
+        50, description="Pages a browser context serves before it is recycled"
+    )
+    max_memory_mb: Optional[int] = Field(
+        None, description="Browser memory (MB) above which browsers are recycled"
+    )
+    reuse_contexts: bool = Field(
+        True, description="Reset and reuse released browser contexts"
+    )
+    screenshot_full_page: bool = Field(
+        False, description="Capture the full page instead of only the viewport"
+    )
+    screenshot_max_dimension: int = Field(
+        1280, description="Downscale screenshots to fit this size (0 keeps it)"
+    )
+    screenshot_quality: int = Field(
+        75, ge=1, le=100, description="JPEG quality of browser screenshots"
+    )
+    screenshot_change_threshold: Optional[int] = Field(
+        0,
+        description="Number of changed thumbnail pixels at or below which a "
+        "screenshot counts as unchanged and is not resent (None disables change "
+        "detection)",
+    )
 
 
 class SandboxSettings(BaseModel):
@@ -158,6 +253,17 @@ class Config:
             "temperature": base_llm.get("temperature", 1.0),
             "api_type": base_llm.get("api_type", ""),
             "api_version": base_llm.get("api_version", ""),
+            "cache_backend": base_llm.get("cache_backend"),
+            "cache_ttl": base_llm.get("cache_ttl"),
+            "cache_max_entries": base_llm.get("cache_max_entries", 1000),
+            "cache_path": base_llm.get("cache_path"),
+            "context_window": base_llm.get("context_window"),
+            "requests_per_minute": base_llm.get("requests_per_minute"),
+            "tokens_per_minute": base_llm.get("tokens_per_minute"),
+            "max_concurrent_requests": base_llm.get("max_concurrent_requests"),
+            "max_connections": base_llm.get("max_connections", 100),
+            "max_keepalive_connections": base_llm.get("max_keepalive_connections", 20),
+            "keepalive_expiry": base_llm.get("keepalive_expiry", 30.0),
         }
 
         # handle browser config.
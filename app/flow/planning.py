@@ -1,6 +1,8 @@
+import asyncio
 import json
+import re
 import time
-from typing import Dict, List, Optional, Union
+from typing import Dict, List, Optional, Set, Tuple, Union
 
 from pydantic import Field
 
@@ -8,7 +10,9 @@ from app.agent.base import BaseAgent
 from app.flow.base import BaseFlow, PlanStepStatus
 from app.llm import LLM
 from app.logger import logger
+from app.runtime import get_runtime, session_runtime
 from app.schema import AgentState, Message, ToolChoice
+from app.session import SessionLog
 from app.tool import PlanningTool
 
 
@@ -20,6 +24,8 @@ class PlanningFlow(BaseFlow):
     executor_keys: List[str] = Field(default_factory=list)
     active_plan_id: str = Field(default_factory=lambda: f"plan_{int(time.time())}")
     current_step_index: Optional[int] = None
+    session: Optional[SessionLog] = None
+    max_parallel_steps: int = 1  # Independent plan steps run at the same time
 
     def __init__(
         self, agents: Union[BaseAgent, List[BaseAgent], Dict[str, BaseAgent]], **data
@@ -44,6 +50,12 @@ class PlanningFlow(BaseFlow):
         if not self.executor_keys:
             self.executor_keys = list(self.agents.keys())
 
+        # Agents checkpoint every step to the flow's session log
+        if self.session is not None:
+            for key, agent in self.agents.items():
+                agent.session = self.session
+                agent.session_key = key
+
     def get_executor(self, step_type: Optional[str] = None) -> BaseAgent:
         """
         Get an appropriate executor agent for the current step.
@@ -61,6 +73,38 @@ class PlanningFlow(BaseFlow):
         # Fallback to primary agent
         return self.primary_agent
 
+    async def resume(self) -> str:
+        """Restore the flow from its session log and continue executing it.
+
+        Plans, agent memories and step counters are replayed from the log;
+        completed steps are skipped and the interrupted step is run again.
+        """
+        if self.session is None:
+            raise ValueError("Cannot resume a flow without a session log")
+
+        state = self.session.load()
+        self.planning_tool.plans.update(state.plans)
+        if state.active_plan_id:
+            self.active_plan_id = state.active_plan_id
+        for key, snapshot in state.agents.items():
+            if key in self.agents:
+                self.agents[key].restore(snapshot)
+
+        logger.info(
+            f"Resuming plan {self.active_plan_id} from {self.session.path} "
+            f"at step {state.current_step_index}"
+        )
+        return await self.execute("")
+
+    def _checkpoint(self) -> None:
+        """Append the active plan and flow progress to the session log."""
+        if self.session is None:
+            return
+        plan = self.planning_tool.plans.get(self.active_plan_id)
+        if plan is not None:
+            self.session.record_plan(self.active_plan_id, plan)
+        self.session.record_flow(self.active_plan_id, self.current_step_index)
+
     async def execute(self, input_text: str) -> str:
         """Execute the planning flow with agents."""
         try:
@@ -77,6 +121,13 @@ class PlanningFlow(BaseFlow):
                         f"Plan creation failed. Plan ID {self.active_plan_id} not found in planning tool."
                     )
                     return f"Failed to create plan for: {input_text}"
+                self._checkpoint()
+
+            # Plans with step dependencies run as a graph, possibly in parallel
+            plan = self.planning_tool.plans.get(self.active_plan_id, {})
+            if "step_dependencies" in plan:
+                result = await self._execute_plan_graph()
+                return result + await self._finalize_plan()
 
             result = ""
             while True:
@@ -87,12 +138,14 @@ class PlanningFlow(BaseFlow):
                 if self.current_step_index is None:
                     result += await self._finalize_plan()
                     break
+                self._checkpoint()
 
                 # Execute current step with appropriate agent
                 step_type = step_info.get("type") if step_info else None
                 executor = self.get_executor(step_type)
                 step_result = await self._execute_step(executor, step_info)
                 result += step_result + "\n"
+                self._checkpoint()
 
                 # Check if agent wants to terminate
                 if hasattr(executor, "state") and executor.state == AgentState.FINISHED:
@@ -108,11 +161,17 @@ class PlanningFlow(BaseFlow):
         logger.info(f"Creating initial plan with ID: {self.active_plan_id}")
 
         # Create a system message for plan creation
-        system_message = Message.system_message(
+        instructions = (
             "You are a planning assistant. Create a concise, actionable plan with clear steps. "
             "Focus on key milestones rather than detailed sub-steps. "
             "Optimize for clarity and efficiency."
         )
+        if self.max_parallel_steps > 1:
+            instructions += (
+                " Steps that do not depend on each other can run in parallel: "
+                "give `step_dependencies` listing, for each step, the steps it needs."
+            )
+        system_message = Message.system_message(instructions)
 
         # Create a user message with the request
         user_message = Message.user_message(
@@ -175,62 +234,128 @@ class PlanningFlow(BaseFlow):
             return None, None
 
         try:
-            # Direct access to plan data from planning tool storage
-            plan_data = self.planning_tool.plans[self.active_plan_id]
-            steps = plan_data.get("steps", [])
-            step_statuses = plan_data.get("step_statuses", [])
+            # The plan store indexes the first non-completed step
+            plans = self.planning_tool.plans
+            step_index = plans.start_current_step(self.active_plan_id)
+            if step_index is None:
+                return None, None  # No active step found
+
+            step = plans[self.active_plan_id]["steps"][step_index]
+            return step_index, self._parse_step_info(step_index, step)
+
+        except Exception as e:
+            logger.warning(f"Error finding current step index: {e}")
+            return None, None
 
-            # Find first non-completed step
-            for i, step in enumerate(steps):
-                if i >= len(step_statuses):
-                    status = PlanStepStatus.NOT_STARTED.value
-                else:
-                    status = step_statuses[i]
+    @staticmethod
+    def _parse_step_info(index: int, step: str) -> dict:
+        """Build the step info of a plan step, with its type if it has one."""
+        step_info = {"text": step, "index": index}
 
-                if status in PlanStepStatus.get_active_statuses():
-                    # Extract step type/category if available
-                    step_info = {"text": step}
+        # Try to extract step type from the text (e.g., [SEARCH] or [CODE])
+        type_match = re.search(r"\[([A-Z_]+)\]", step)
+        if type_match:
+            step_info["type"] = type_match.group(1).lower()
+        return step_info
 
-                    # Try to extract step type from the text (e.g., [SEARCH] or [CODE])
-                    import re
+    async def _execute_plan_graph(self) -> str:
+        """
+        Execute the plan's steps in dependency order.
+
+        Every step whose dependencies are completed is started on an idle
+        executor, up to `max_parallel_steps` at a time. A step that fails is
+        marked blocked, and steps depending on it are not run. Each step runs
+        in its own session runtime, so concurrent steps never share (or tear
+        down) one sandbox or edit history.
+        """
+        idle = list(self.agents.values())
+        running: Dict[asyncio.Task, Tuple[int, BaseAgent]] = {}
+        attempted: Set[int] = set()
+        results = []
+
+        try:
+            while True:
+                plan = self.planning_tool.plans[self.active_plan_id]
+                for index in self.planning_tool.get_ready_steps(self.active_plan_id):
+                    if len(running) >= self.max_parallel_steps:
+                        break
+                    if index in attempted:
+                        continue
+                    step_info = self._parse_step_info(index, plan["steps"][index])
+                    executor = self._take_idle_executor(idle, step_info.get("type"))
+                    if executor is None:
+                        continue
+
+                    attempted.add(index)
+                    await self.planning_tool.execute(
+                        command="mark_step",
+                        plan_id=self.active_plan_id,
+                        step_index=index,
+                        step_status=PlanStepStatus.IN_PROGRESS.value,
+                    )
+                    task = asyncio.create_task(
+                        self._execute_isolated_step(executor, step_info)
+                    )
+                    running[task] = (index, executor)
 
-                    type_match = re.search(r"\[([A-Z_]+)\]", step)
-                    if type_match:
-                        step_info["type"] = type_match.group(1).lower()
+                self._checkpoint()
+                if not running:
+                    break
 
-                    # Mark current step as in_progress
-                    try:
+                done, _ = await asyncio.wait(
+                    running, return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in done:
+                    index, executor = running.pop(task)
+                    idle.append(executor)
+                    results.append(task.result())
+                    if plan["step_statuses"][index] != PlanStepStatus.COMPLETED.value:
                         await self.planning_tool.execute(
                             command="mark_step",
                             plan_id=self.active_plan_id,
-                            step_index=i,
-                            step_status=PlanStepStatus.IN_PROGRESS.value,
+                            step_index=index,
+                            step_status=PlanStepStatus.BLOCKED.value,
                         )
-                    except Exception as e:
-                        logger.warning(f"Error marking step as in_progress: {e}")
-                        # Update step status directly if needed
-                        if i < len(step_statuses):
-                            step_statuses[i] = PlanStepStatus.IN_PROGRESS.value
-                        else:
-                            while len(step_statuses) < i:
-                                step_statuses.append(PlanStepStatus.NOT_STARTED.value)
-                            step_statuses.append(PlanStepStatus.IN_PROGRESS.value)
+        finally:
+            for task in running:
+                task.cancel()
 
-                        plan_data["step_statuses"] = step_statuses
+        return "".join(result + "\n" for result in results)
 
-                    return i, step_info
-
-            return None, None  # No active step found
-
-        except Exception as e:
-            logger.warning(f"Error finding current step index: {e}")
-            return None, None
+    async def _execute_isolated_step(self, executor: BaseAgent, step_info: dict) -> str:
+        """Execute a step in a runtime of its own, keeping its token usage."""
+        parent = get_runtime()
+        async with session_runtime() as runtime:
+            try:
+                return await self._execute_step(executor, step_info)
+            finally:
+                parent.merge_token_usage(runtime)
+
+    def _take_idle_executor(
+        self, idle: List[BaseAgent], step_type: Optional[str]
+    ) -> Optional[BaseAgent]:
+        """Take an idle agent that can execute a step of the given type."""
+        if step_type and step_type in self.agents:
+            candidates = [self.agents[step_type]]
+        else:
+            candidates = [
+                self.agents[key] for key in self.executor_keys if key in self.agents
+            ] or [self.primary_agent]
+
+        for agent in candidates:
+            for i, idle_agent in enumerate(idle):
+                if idle_agent is agent:
+                    return idle.pop(i)
+        return None
 
     async def _execute_step(self, executor: BaseAgent, step_info: dict) -> str:
         """Execute the current step with the specified agent using agent.run()."""
+        # Steps run concurrently in a plan graph, so use the step's own index
+        step_index = step_info.get("index", self.current_step_index)
+
         # Prepare context for the agent with current plan status
         plan_status = await self._get_plan_text()
-        step_text = step_info.get("text", f"Step {self.current_step_index}")
+        step_text = step_info.get("text", f"Step {step_index}")
 
         # Create a prompt for the agent to execute the current step
         step_prompt = f"""
@@ -238,7 +363,7 @@ class PlanningFlow(BaseFlow):
         {plan_status}
 
         YOUR CURRENT TASK:
-        You are now working on step {self.current_step_index}: "{step_text}"
+        You are now working on step {step_index}: "{step_text}"
 
         Please execute this step using the appropriate tools. When you're done, provide a summary of what you accomplished.
         """
@@ -248,16 +373,18 @@ class PlanningFlow(BaseFlow):
             step_result = await executor.run(step_prompt)
 
             # Mark the step as completed after successful execution
-            await self._mark_step_completed()
+            await self._mark_step_completed(step_index)
 
             return step_result
         except Exception as e:
-            logger.error(f"Error executing step {self.current_step_index}: {e}")
-            return f"Error executing step {self.current_step_index}: {str(e)}"
-
-    async def _mark_step_completed(self) -> None:
-        """Mark the current step as completed."""
-        if self.current_step_index is None:
+            logger.error(f"Error executing step {step_index}: {e}")
+            return f"Error executing step {step_index}: {str(e)}"
+
+    async def _mark_step_completed(self, step_index: Optional[int] = None) -> None:
+        """Mark the current (or the given) step as completed."""
+        if step_index is None:
+            step_index = self.current_step_index
+        if step_index is None:
             return
 
         try:
@@ -265,26 +392,14 @@ class PlanningFlow(BaseFlow):
             await self.planning_tool.execute(
                 command="mark_step",
                 plan_id=self.active_plan_id,
-                step_index=self.current_step_index,
+                step_index=step_index,
                 step_status=PlanStepStatus.COMPLETED.value,
             )
             logger.info(
-                f"Marked step {self.current_step_index} as completed in plan {self.active_plan_id}"
+                f"Marked step {step_index} as completed in plan {self.active_plan_id}"
             )
         except Exception as e:
             logger.warning(f"Failed to update plan status: {e}")
-            # Update step status directly in planning tool storage
-            if self.active_plan_id in self.planning_tool.plans:
-                plan_data = self.planning_tool.plans[self.active_plan_id]
-                step_statuses = plan_data.get("step_statuses", [])
-
-                # Ensure the step_statuses list is long enough
-                while len(step_statuses) <= self.current_step_index:
-                    step_statuses.append(PlanStepStatus.NOT_STARTED.value)
-
-                # Update the status
-                step_statuses[self.current_step_index] = PlanStepStatus.COMPLETED.value
-                plan_data["step_statuses"] = step_statuses
 
     async def _get_plan_text(self) -> str:
         """Get the current plan as formatted text."""
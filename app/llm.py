@@ -1,26 +1,29 @@
+import hashlib
+import json
 import math
-from typing import Dict, List, Optional, Union
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Union
 
 import tiktoken
-from openai import (
-    APIError,
-    AsyncAzureOpenAI,
-    AsyncOpenAI,
-    AuthenticationError,
-    OpenAIError,
-    RateLimitError,
-)
+from openai import APIError, AuthenticationError, OpenAIError, RateLimitError
+from openai.types.chat import ChatCompletionChunk, ChatCompletionMessageToolCall
 from openai.types.chat.chat_completion_message import ChatCompletionMessage
-from tenacity import (
-    retry,
-    retry_if_exception_type,
-    stop_after_attempt,
-    wait_random_exponential,
-)
 
-from app.config import LLMSettings, config
+from app.config import PROJECT_ROOT, LLMSettings, config
 from app.exceptions import TokenLimitExceeded
+from app.llm_client import (
+    RateLimiter,
+    get_llm_client,
+    get_rate_limiter,
+    retry_llm_request,
+)
 from app.logger import logger  # Assuming a logger is set up in your app
+from app.runtime import TokenUsage, get_runtime
 from app.schema import (
     ROLE_VALUES,
     TOOL_CHOICE_TYPE,
@@ -28,7 +31,7 @@ from app.schema import (
     Message,
     ToolChoice,
 )
-from app.bedrock import BedrockClient
+from app.streaming import StreamSink, get_stream_sink
 
 
 REASONING_MODELS = ["o1", "o3-mini"]
@@ -41,6 +44,27 @@ MULTIMODAL_MODELS = [
     "claude-3-haiku-20240307",
 ]
 
+# Context sizes of known models, matched by name prefix (longest first)
+MODEL_CONTEXT_WINDOWS = {
+    "gpt-3.5-turbo": 16385,
+    "gpt-4": 8192,
+    "gpt-4-turbo": 128000,
+    "gpt-4o": 128000,
+    "gpt-4.1": 1047576,
+    "o1": 200000,
+    "o3": 200000,
+    "o4": 200000,
+    "claude": 200000,
+}
+
+
+def get_context_window(model: str) -> Optional[int]:
+    """Get the context size of a known model, or None if it is unknown"""
+    for prefix in sorted(MODEL_CONTEXT_WINDOWS, key=len, reverse=True):
+        if model.startswith(prefix):
+            return MODEL_CONTEXT_WINDOWS[prefix]
+    return None
+
 
 class TokenCounter:
     # Token constants
@@ -151,31 +175,261 @@ class TokenCounter:
                 token_count += self.count_text(function.get("arguments", ""))
         return token_count
 
+    def count_single_message(self, message: dict) -> int:
+        """Calculate the number of tokens in a single formatted message"""
+        tokens = self.BASE_MESSAGE_TOKENS  # Base tokens per message
+
+        # Add role tokens
+        tokens += self.count_text(message.get("role", ""))
+
+        # Add content tokens
+        if "content" in message:
+            tokens += self.count_content(message["content"])
+
+        # Add tool calls tokens
+        if "tool_calls" in message:
+            tokens += self.count_tool_calls(message["tool_calls"])
+
+        # Add name and tool_call_id tokens
+        tokens += self.count_text(message.get("name", ""))
+        tokens += self.count_text(message.get("tool_call_id", ""))
+
+        return tokens
+
     def count_message_tokens(self, messages: List[dict]) -> int:
         """Calculate the total number of tokens in a message list"""
         total_tokens = self.FORMAT_TOKENS  # Base format tokens
 
         for message in messages:
-            tokens = self.BASE_MESSAGE_TOKENS  # Base tokens per message
+            total_tokens += self.count_single_message(message)
 
-            # Add role tokens
-            tokens += self.count_text(message.get("role", ""))
+        return total_tokens
 
-            # Add content tokens
-            if "content" in message:
-                tokens += self.count_content(message["content"])
 
-            # Add tool calls tokens
-            if "tool_calls" in message:
-                tokens += self.count_tool_calls(message["tool_calls"])
+class ResponseCache(ABC):
+    """Content-addressed cache of LLM responses.
+
+    Keys are a canonical hash of the formatted request, so identical
+    messages/tools/temperature payloads map to the same entry.
+    """
+
+    # Request parameters that don't influence the response content
+    IGNORED_PARAMS = ("stream", "timeout")
+
+    def __init__(self, ttl: Optional[int] = None, max_entries: int = 1000):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+
+    @classmethod
+    def make_key(cls, kind: str, params: dict) -> str:
+        """Build a canonical hash for a request of the given kind"""
+        payload = {k: v for k, v in params.items() if k not in cls.IGNORED_PARAMS}
+        canonical = json.dumps(
+            {"kind": kind, "params": payload},
+            sort_keys=True,
+            separators=(",", ":"),
+            ensure_ascii=False,
+            default=str,
+        )
+        return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
 
-            # Add name and tool_call_id tokens
-            tokens += self.count_text(message.get("name", ""))
-            tokens += self.count_text(message.get("tool_call_id", ""))
+    def get(self, key: str) -> Optional[str]:
+        """Get a cached response, counting the lookup as a hit or a miss"""
+        value = self._get(key)
+        if value is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return value
+
+    def set(self, key: str, value: str) -> None:
+        """Store a response"""
+        self._set(key, value)
+
+    def _is_expired(self, created_at: float) -> bool:
+        return self.ttl is not None and time.time() - created_at > self.ttl
+
+    @abstractmethod
+    def _get(self, key: str) -> Optional[str]:
+        """Backend lookup, returning None for missing or expired entries"""
+
+    @abstractmethod
+    def _set(self, key: str, value: str) -> None:
+        """Backend store, evicting entries beyond max_entries"""
+
+    @abstractmethod
+    def __len__(self) -> int:
+        """Number of stored entries"""
+
+    def clear(self) -> None:
+        """Remove all entries and reset counters"""
+        self.hits = 0
+        self.misses = 0
+
+    def close(self) -> None:
+        """Release resources held by the backend"""
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get cache statistics"""
+        lookups = self.hits + self.misses
+        return {
+            "backend": type(self).__name__,
+            "entries": len(self),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+
+
+class InMemoryResponseCache(ResponseCache):
+    """LRU response cache kept in process memory"""
+
+    def __init__(self, ttl: Optional[int] = None, max_entries: int = 1000):
+        super().__init__(ttl, max_entries)
+        self._entries: "OrderedDict[str, tuple[float, str]]" = OrderedDict()
+
+    def _get(self, key: str) -> Optional[str]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        created_at, value = entry
+        if self._is_expired(created_at):
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    def _set(self, key: str, value: str) -> None:
+        self._entries[key] = (time.time(), value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def clear(self) -> None:
+        super().clear()
+        self._entries.clear()
+
+
+class SQLiteResponseCache(ResponseCache):
+    """Response cache persisted in a SQLite file, shared across runs"""
 
-            total_tokens += tokens
+    def __init__(
+        self,
+        path: Union[str, Path],
+        ttl: Optional[int] = None,
+        max_entries: int = 1000,
+    ):
+        super().__init__(ttl, max_entries)
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL, "
+                "created_at REAL NOT NULL, accessed_at REAL NOT NULL)"
+            )
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS responses_accessed "
+                "ON responses (accessed_at)"
+            )
 
-        return total_tokens
+    def _get(self, key: str) -> Optional[str]:
+        with self._lock, self._conn:
+            row = self._conn.execute(
+                "SELECT value, created_at FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            value, created_at = row
+            if self._is_expired(created_at):
+                self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                return None
+            self._conn.execute(
+                "UPDATE responses SET accessed_at = ? WHERE key = ?",
+                (time.time(), key),
+            )
+            return value
+
+    def _set(self, key: str, value: str) -> None:
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?)",
+                (key, value, now, now),
+            )
+            if self.ttl is not None:
+                self._conn.execute(
+                    "DELETE FROM responses WHERE created_at < ?", (now - self.ttl,)
+                )
+            # Evict least recently used entries beyond the size limit
+            self._conn.execute(
+                "DELETE FROM responses WHERE key IN ("
+                "SELECT key FROM responses ORDER BY accessed_at DESC "
+                "LIMIT -1 OFFSET ?)",
+                (self.max_entries,),
+            )
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+
+    def clear(self) -> None:
+        super().clear()
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM responses")
+
+    def close(self) -> None:
+        """Close the underlying database connection"""
+        with self._lock:
+            self._conn.close()
+
+
+def create_response_cache(llm_config: LLMSettings) -> Optional[ResponseCache]:
+    """Create the response cache configured for an LLM, or None if disabled"""
+    backend = (llm_config.cache_backend or "").lower()
+    if not backend or backend == "none":
+        return None
+    if backend == "memory":
+        return InMemoryResponseCache(
+            ttl=llm_config.cache_ttl, max_entries=llm_config.cache_max_entries
+        )
+    if backend == "sqlite":
+        return SQLiteResponseCache(
+            path=llm_config.cache_path or PROJECT_ROOT / ".cache" / "llm_cache.sqlite",
+            ttl=llm_config.cache_ttl,
+            max_entries=llm_config.cache_max_entries,
+        )
+    raise ValueError(f"Unsupported LLM cache backend: {llm_config.cache_backend}")
+
+
+def close_response_caches() -> None:
+    """Close the response caches of every LLM; later requests are not cached."""
+    for llm in LLM._instances.values():
+        cache, llm.response_cache = llm.response_cache, None
+        if cache is not None:
+            try:
+                cache.close()
+            except Exception as e:
+                logger.debug(f"Failed to close LLM response cache: {e}")
+
+
+def _is_complete_json(parts: List[str]) -> bool:
+    """Whether streamed tool call arguments already form a complete JSON object."""
+    if not parts or not parts[-1].rstrip().endswith("}"):
+        return False
+    try:
+        json.loads("".join(parts))
+    except ValueError:
+        return False
+    return True
 
 
 class LLM:
@@ -193,9 +447,10 @@ class LLM:
     def __init__(
         self, config_name: str = "default", llm_config: Optional[LLMSettings] = None
     ):
-        if not hasattr(self, "client"):  # Only initialize if not already initialized
+        if not hasattr(self, "settings"):  # Only initialize if not already initialized
             llm_config = llm_config or config.llm
             llm_config = llm_config.get(config_name, llm_config["default"])
+            self.settings = llm_config
             self.model = llm_config.model
             self.max_tokens = llm_config.max_tokens
             self.temperature = llm_config.temperature
@@ -204,14 +459,16 @@ class LLM:
             self.api_version = llm_config.api_version
             self.base_url = llm_config.base_url
 
-            # Add token counting related attributes
-            self.total_input_tokens = 0
-            self.total_completion_tokens = 0
+            # Token counters live in the session runtime, see total_input_tokens
+            self.config_name = config_name
             self.max_input_tokens = (
                 llm_config.max_input_tokens
                 if hasattr(llm_config, "max_input_tokens")
                 else None
             )
+            self.context_window = getattr(
+                llm_config, "context_window", None
+            ) or get_context_window(self.model)
 
             # Initialize tokenizer
             try:
@@ -220,18 +477,177 @@ class LLM:
                 # If the model is not in tiktoken's presets, use cl100k_base as default
                 self.tokenizer = tiktoken.get_encoding("cl100k_base")
 
-            if self.api_type == "azure":
-                self.client = AsyncAzureOpenAI(
-                    base_url=self.base_url,
-                    api_key=self.api_key,
-                    api_version=self.api_version,
-                )
-            elif self.api_type == "aws":
-                self.client = BedrockClient()
-            else:
-                self.client = AsyncOpenAI(api_key=self.api_key, base_url=self.base_url)
+            # API clients are pooled per endpoint, see the `client` property
+            self._client = None
 
             self.token_counter = TokenCounter(self.tokenizer)
+            self.response_cache = create_response_cache(llm_config)
+
+    @property
+    def client(self):
+        """The API client shared by every LLM using this endpoint."""
+        if self._client is not None:
+            return self._client
+        return get_llm_client(self.settings)
+
+    @client.setter
+    def client(self, client) -> None:
+        self._client = client
+
+    @property
+    def rate_limiter(self) -> RateLimiter:
+        """The limiter shared by every request to this model."""
+        return get_rate_limiter(self.settings)
+
+    async def _create_completion(self, params: dict, input_tokens: int):
+        """Send a completion request once the model's rate limits allow it."""
+        async with self.rate_limiter.limit(input_tokens) as limiter:
+            response = await self.client.chat.completions.create(**params)
+        if getattr(response, "usage", None):
+            limiter.consume_tokens(response.usage.completion_tokens)
+        return response
+
+    async def _stream_completion(
+        self, params: dict, input_tokens: int
+    ) -> AsyncIterator[ChatCompletionChunk]:
+        """Stream a completion's chunks, holding a request slot until it ends."""
+        async with self.rate_limiter.limit(input_tokens):
+            response = await self.client.chat.completions.create(**params)
+            async for chunk in response:
+                yield chunk
+
+    async def _stream_text(
+        self, params: dict, input_tokens: int, sink: Optional[StreamSink]
+    ) -> str:
+        """Stream a completion's text, forwarding each chunk to `sink`."""
+        sink = sink or get_stream_sink()
+        collected: List[str] = []
+        try:
+            async for chunk in self._stream_completion(params, input_tokens):
+                if not chunk.choices:
+                    continue
+                chunk_message = chunk.choices[0].delta.content
+                if chunk_message:
+                    collected.append(chunk_message)
+                    if sink is not None:
+                        await sink.on_token(chunk_message)
+        except Exception:
+            # The request is retried from the start, so the partial text is void
+            if sink is not None and collected:
+                await sink.on_reset()
+            raise
+
+        text = "".join(collected)
+        if sink is not None:
+            await sink.on_end(text)
+        return text
+
+    @staticmethod
+    async def _replay_to_sink(text: Optional[str], sink: Optional[StreamSink]) -> None:
+        """Send a response that was not streamed, e.g. a cached one, to a sink."""
+        sink = sink or get_stream_sink()
+        if sink is not None and text:
+            await sink.on_token(text)
+            await sink.on_end(text)
+
+    async def _stream_tool_message(
+        self,
+        params: dict,
+        input_tokens: int,
+        on_tool_call: Callable[[ChatCompletionMessageToolCall], Any],
+    ) -> ChatCompletionMessage:
+        """
+        Stream a tool-calling completion and assemble the message.
+
+        Tool call deltas are accumulated per index, and each call is handed to
+        `on_tool_call` as soon as its arguments form a complete JSON object, or
+        at the latest when the next call starts or the stream ends. Text goes
+        to the context's stream sink as it arrives.
+        """
+        content: List[str] = []
+        calls: Dict[int, dict] = {}
+        usage = None
+        sink = get_stream_sink()
+
+        def emit(entry: dict) -> None:
+            if entry["call"] is None:
+                entry["call"] = ChatCompletionMessageToolCall(
+                    id=entry["id"],
+                    type="function",
+                    function={
+                        "name": entry["name"],
+                        "arguments": "".join(entry["arguments"]),
+                    },
+                )
+                on_tool_call(entry["call"])
+
+        try:
+            async for chunk in self._stream_completion(
+                {**params, "stream": True}, input_tokens
+            ):
+                usage = getattr(chunk, "usage", None) or usage
+                if not chunk.choices:
+                    continue
+                delta = chunk.choices[0].delta
+                if delta.content:
+                    content.append(delta.content)
+                    if sink is not None:
+                        await sink.on_token(delta.content)
+
+                for call_delta in delta.tool_calls or []:
+                    entry = calls.get(call_delta.index)
+                    if entry is None:
+                        # A new call starts, so the previous ones are complete
+                        for previous in calls.values():
+                            emit(previous)
+                        entry = calls[call_delta.index] = {
+                            "id": "",
+                            "name": "",
+                            "arguments": [],
+                            "call": None,
+                        }
+                    if call_delta.id:
+                        entry["id"] = call_delta.id
+                    function = call_delta.function
+                    if function and function.name:
+                        entry["name"] += function.name
+                    if function and function.arguments:
+                        entry["arguments"].append(function.arguments)
+                        if entry["call"] is None and _is_complete_json(
+                            entry["arguments"]
+                        ):
+                            emit(entry)
+        except Exception as e:
+            if sink is not None and content:
+                await sink.on_reset()
+            if any(entry["call"] is not None for entry in calls.values()):
+                # Tools are already running, so the request must not be retried
+                raise RuntimeError(f"Tool call stream interrupted: {e}") from e
+            raise
+
+        for entry in calls.values():
+            emit(entry)
+
+        text = "".join(content)
+        if sink is not None and text:
+            await sink.on_end(text)
+        tool_calls = [calls[index]["call"] for index in sorted(calls)]
+        if usage:
+            prompt_tokens, completion_tokens = (
+                usage.prompt_tokens,
+                usage.completion_tokens,
+            )
+        else:
+            prompt_tokens = input_tokens
+            completion_tokens = self.count_tokens(text) + sum(
+                self.count_tokens(call.function.arguments) for call in tool_calls
+            )
+        self.update_token_count(prompt_tokens, completion_tokens)
+        self.rate_limiter.consume_tokens(completion_tokens)
+
+        return ChatCompletionMessage(
+            role="assistant", content=text or None, tool_calls=tool_calls or None
+        )
 
     def count_tokens(self, text: str) -> int:
         """Calculate the number of tokens in a text"""
@@ -239,8 +655,103 @@ class LLM:
             return 0
         return len(self.tokenizer.encode(text))
 
-    def count_message_tokens(self, messages: List[dict]) -> int:
-        return self.token_counter.count_message_tokens(messages)
+    def count_message_tokens(
+        self, messages: List[Union[dict, Message]], supports_images: bool = False
+    ) -> int:
+        """
+        Calculate the number of tokens in a message list.
+
+        Message objects carry their own token count, so only messages that are
+        new (or changed) since the last call are tokenized again. Dicts are
+        counted as they would be sent after formatting.
+        """
+        total_tokens = self.token_counter.FORMAT_TOKENS
+        cache_key = (self.tokenizer.name, supports_images)
+
+        for message in messages:
+            if isinstance(message, Message):
+                tokens = message.get_token_count(cache_key)
+                if tokens is None:
+                    tokens = self._count_formatted(message, supports_images)
+                    message.set_token_count(cache_key, tokens)
+            else:
+                tokens = self._count_formatted(dict(message), supports_images)
+            total_tokens += tokens
+
+        return total_tokens
+
+    def count_message(self, message: Message) -> int:
+        """Calculate the tokens of a single message as sent to this model"""
+        supports_images = self.model in MULTIMODAL_MODELS
+        return (
+            self.count_message_tokens([message], supports_images)
+            - self.token_counter.FORMAT_TOKENS
+        )
+
+    def _count_formatted(
+        self, message: Union[dict, Message], supports_images: bool
+    ) -> int:
+        """Count tokens of a single message in its formatted (wire) form"""
+        if isinstance(message, Message):
+            dimensions = message.image_dimensions
+        else:
+            dimensions = message.get("image_dimensions")
+
+        total = 0
+        for formatted in self.format_messages([message], supports_images):
+            if dimensions and isinstance(formatted.get("content"), list):
+                formatted["content"] = [
+                    (
+                        {**item, "dimensions": tuple(dimensions)}
+                        if isinstance(item, dict) and "image_url" in item
+                        else item
+                    )
+                    for item in formatted["content"]
+                ]
+            total += self.token_counter.count_single_message(formatted)
+        return total
+
+    def _get_cached_response(
+        self, kind: str, params: dict
+    ) -> tuple[Optional[str], Optional[str]]:
+        """Look up a cached response, returning (cache key, cached value)"""
+        if self.response_cache is None:
+            return None, None
+        cache_key = self.response_cache.make_key(kind, params)
+        cached = self.response_cache.get(cache_key)
+        if cached is not None:
+            logger.info(f"LLM response cache hit for {kind} ({self.model})")
+        return cache_key, cached
+
+    def _cache_response(self, cache_key: Optional[str], value: str) -> None:
+        """Store a response if caching is enabled"""
+        if cache_key is not None:
+            self.response_cache.set(cache_key, value)
+
+    def get_cache_stats(self) -> Optional[Dict[str, Any]]:
+        """Get response cache hit/miss statistics, or None if caching is disabled"""
+        return self.response_cache.get_stats() if self.response_cache else None
+
+    @property
+    def token_usage(self) -> TokenUsage:
+        """Token usage of the running session through this LLM."""
+        return get_runtime().token_usage[self.config_name]
+
+    @property
+    def total_input_tokens(self) -> int:
+        return self.token_usage.input_tokens
+
+    @total_input_tokens.setter
+    def total_input_tokens(self, value: int) -> None:
+        self.token_usage.input_tokens = value
+
+    @property
+    def total_completion_tokens(self) -> int:
+        return self.token_usage.completion_tokens
+
+    @total_completion_tokens.setter
+    def total_completion_tokens(self, value: int) -> None:
+        self.token_usage.completion_tokens = value
 
     def update_token_count(self, input_tokens: int, completion_tokens: int = 0) -> None:
         """Update token counts"""
@@ -308,6 +819,9 @@ class LLM:
                 if "role" not in message:
                     raise ValueError("Message dict must contain 'role' field")
 
+                # Image dimensions are only used for token accounting
+                message.pop("image_dimensions", None)
+
                 # Process base64 images if present and model supports images
                 if supports_images and message.get("base64_image"):
                     # Initialize or convert content to appropriate format
@@ -358,19 +872,14 @@ class LLM:
 
         return formatted_messages
 
-    @retry(
-        wait=wait_random_exponential(min=1, max=60),
-        stop=stop_after_attempt(6),
-        retry=retry_if_exception_type(
-            (OpenAIError, Exception, ValueError)
-        ),  # Don't retry TokenLimitExceeded
-    )
+    @retry_llm_request
     async def ask(
         self,
         messages: List[Union[dict, Message]],
         system_msgs: Optional[List[Union[dict, Message]]] = None,
         stream: bool = True,
         temperature: Optional[float] = None,
+        stream_sink: Optional[StreamSink] = None,
     ) -> str:
         """
         Send a prompt to the LLM and get the response.
@@ -380,6 +889,7 @@ class LLM:
             system_msgs: Optional system messages to prepend
             stream (bool): Whether to stream the response
             temperature (float): Sampling temperature for the response
+            stream_sink: Receives the streamed text (default: the context's sink)
 
         Returns:
             str: The generated response
@@ -394,6 +904,11 @@ class LLM:
             # Check if the model supports images
             supports_images = self.model in MULTIMODAL_MODELS
 
+            # Calculate input token count (cached per message, so count before formatting)
+            input_tokens = self.count_message_tokens(
+                list(system_msgs or []) + list(messages), supports_images
+            )
+
             # Format system and user messages with image support check
             if system_msgs:
                 system_msgs = self.format_messages(system_msgs, supports_images)
@@ -401,9 +916,6 @@ class LLM:
             else:
                 messages = self.format_messages(messages, supports_images)
 
-            # Calculate input token count
-            input_tokens = self.count_message_tokens(messages)
-
             # Check if token limits are exceeded
             if not self.check_token_limit(input_tokens):
                 error_message = self.get_limit_error_message(input_tokens)
@@ -423,10 +935,16 @@ class LLM:
                     temperature if temperature is not None else self.temperature
                 )
 
+            cache_key, cached = self._get_cached_response("ask", params)
+            if cached is not None:
+                if stream:
+                    await self._replay_to_sink(cached, stream_sink)
+                return cached
+
             if not stream:
                 # Non-streaming request
-                response = await self.client.chat.completions.create(
-                    **params, stream=False
+                response = await self._create_completion(
+                    {**params, "stream": False}, input_tokens
                 )
 
                 if not response.choices or not response.choices[0].message.content:
@@ -437,23 +955,16 @@ class LLM:
                     response.usage.prompt_tokens, response.usage.completion_tokens
                 )
 
+                self._cache_response(cache_key, response.choices[0].message.content)
                 return response.choices[0].message.content
 
             # Streaming request, For streaming, update estimated token count before making the request
             self.update_token_count(input_tokens)
 
-            response = await self.client.chat.completions.create(**params, stream=True)
-
-            collected_messages = []
-            completion_text = ""
-            async for chunk in response:
-                chunk_message = chunk.choices[0].delta.content or ""
-                collected_messages.append(chunk_message)
-                completion_text += chunk_message
-                print(chunk_message, end="", flush=True)
-
-            print()  # Newline after streaming
-            full_response = "".join(collected_messages).strip()
+            completion_text = await self._stream_text(
+                {**params, "stream": True}, input_tokens, stream_sink
+            )
+            full_response = completion_text.strip()
             if not full_response:
                 raise ValueError("Empty response from streaming LLM")
 
@@ -463,7 +974,9 @@ class LLM:
                 f"Estimated completion tokens for streaming response: {completion_tokens}"
             )
             self.total_completion_tokens += completion_tokens
+            self.rate_limiter.consume_tokens(completion_tokens)
 
+            self._cache_response(cache_key, full_response)
             return full_response
 
         except TokenLimitExceeded:
@@ -485,13 +998,7 @@ class LLM:
             logger.exception(f"Unexpected error in ask")
             raise
 
-    @retry(
-        wait=wait_random_exponential(min=1, max=60),
-        stop=stop_after_attempt(6),
-        retry=retry_if_exception_type(
-            (OpenAIError, Exception, ValueError)
-        ),  # Don't retry TokenLimitExceeded
-    )
+    @retry_llm_request
     async def ask_with_images(
         self,
         messages: List[Union[dict, Message]],
@@ -499,6 +1006,7 @@ class LLM:
         system_msgs: Optional[List[Union[dict, Message]]] = None,
         stream: bool = False,
         temperature: Optional[float] = None,
+        stream_sink: Optional[StreamSink] = None,
     ) -> str:
         """
         Send a prompt with images to the LLM and get the response.
@@ -509,6 +1017,7 @@ class LLM:
             system_msgs: Optional system messages to prepend
             stream (bool): Whether to stream the response
             temperature (float): Sampling temperature for the response
+            stream_sink: Receives the streamed text (default: the context's sink)
 
         Returns:
             str: The generated response
@@ -595,32 +1104,37 @@ class LLM:
                     temperature if temperature is not None else self.temperature
                 )
 
+            cache_key, cached = self._get_cached_response("ask_with_images", params)
+            if cached is not None:
+                if stream:
+                    await self._replay_to_sink(cached, stream_sink)
+                return cached
+
             # Handle non-streaming request
             if not stream:
-                response = await self.client.chat.completions.create(**params)
+                response = await self._create_completion(params, input_tokens)
 
                 if not response.choices or not response.choices[0].message.content:
                     raise ValueError("Empty or invalid response from LLM")
 
                 self.update_token_count(response.usage.prompt_tokens)
+                self._cache_response(cache_key, response.choices[0].message.content)
                 return response.choices[0].message.content
 
             # Handle streaming request
             self.update_token_count(input_tokens)
-            response = await self.client.chat.completions.create(**params)
-
-            collected_messages = []
-            async for chunk in response:
-                chunk_message = chunk.choices[0].delta.content or ""
-                collected_messages.append(chunk_message)
-                print(chunk_message, end="", flush=True)
-
-            print()  # Newline after streaming
-            full_response = "".join(collected_messages).strip()
+            full_response = (
+                await self._stream_text(params, input_tokens, stream_sink)
+            ).strip()
 
             if not full_response:
                 raise ValueError("Empty response from streaming LLM")
 
+            completion_tokens = self.count_tokens(full_response)
+            self.total_completion_tokens += completion_tokens
+            self.rate_limiter.consume_tokens(completion_tokens)
+
+            self._cache_response(cache_key, full_response)
             return full_response
 
         except TokenLimitExceeded:
@@ -641,13 +1155,7 @@ class LLM:
             logger.error(f"Unexpected error in ask_with_images: {e}")
             raise
 
-    @retry(
-        wait=wait_random_exponential(min=1, max=60),
-        stop=stop_after_attempt(6),
-        retry=retry_if_exception_type(
-            (OpenAIError, Exception, ValueError)
-        ),  # Don't retry TokenLimitExceeded
-    )
+    @retry_llm_request
     async def ask_tool(
         self,
         messages: List[Union[dict, Message]],
@@ -656,6 +1164,8 @@ class LLM:
         tools: Optional[List[dict]] = None,
         tool_choice: TOOL_CHOICE_TYPE = ToolChoice.AUTO,  # type: ignore
         temperature: Optional[float] = None,
+        tools_tokens: Optional[int] = None,
+        on_tool_call: Optional[Callable[[ChatCompletionMessageToolCall], Any]] = None,
         **kwargs,
     ) -> ChatCompletionMessage | None:
         """
@@ -668,6 +1178,9 @@ class LLM:
             tools: List of tools to use
             tool_choice: Tool choice strategy
             temperature: Sampling temperature for the response
+            tools_tokens: Pre-computed token count of `tools` (counted here if None)
+            on_tool_call: If given, the response is streamed and each tool call
+                is passed to it as soon as it is complete, before the response ends
             **kwargs: Additional completion arguments
 
         Returns:
@@ -687,6 +1200,11 @@ class LLM:
             # Check if the model supports images
             supports_images = self.model in MULTIMODAL_MODELS
 
+            # Calculate input token count (cached per message, so count before formatting)
+            input_tokens = self.count_message_tokens(
+                list(system_msgs or []) + list(messages), supports_images
+            )
+
             # Format messages
             if system_msgs:
                 system_msgs = self.format_messages(system_msgs, supports_images)
@@ -694,14 +1212,12 @@ class LLM:
             else:
                 messages = self.format_messages(messages, supports_images)
 
-            # Calculate input token count
-            input_tokens = self.count_message_tokens(messages)
-
             # If there are tools, calculate token count for tool descriptions
-            tools_tokens = 0
-            if tools:
-                for tool in tools:
-                    tools_tokens += self.count_tokens(str(tool))
+            if tools_tokens is None:
+                tools_tokens = 0
+                if tools:
+                    for tool in tools:
+                        tools_tokens += self.count_tokens(str(tool))
 
             input_tokens += tools_tokens
 
@@ -735,13 +1251,30 @@ class LLM:
                     temperature if temperature is not None else self.temperature
                 )
 
-            response: ChatCompletion = await self.client.chat.completions.create(
-                **params, stream=False
+            cache_key, cached = self._get_cached_response("ask_tool", params)
+            if cached is not None:
+                message = ChatCompletionMessage.model_validate_json(cached)
+                if on_tool_call is not None:
+                    await self._replay_to_sink(message.content, None)
+                    for call in message.tool_calls or []:
+                        on_tool_call(call)
+                return message
+
+            # Bedrock has no streaming tool calls; its calls are passed on at the end
+            if on_tool_call is not None and self.api_type != "aws":
+                message = await self._stream_tool_message(
+                    params, input_tokens, on_tool_call
+                )
+                self._cache_response(cache_key, message.model_dump_json())
+                return message
+
+            response: ChatCompletion = await self._create_completion(
+                {**params, "stream": False}, input_tokens
             )
 
             # Check if response is valid
             if not response.choices or not response.choices[0].message:
-                print(response)
+                logger.warning(f"Invalid or empty response from LLM: {response}")
                 # raise ValueError("Invalid or empty response from LLM")
                 return None
 
@@ -750,7 +1283,13 @@ class LLM:
                 response.usage.prompt_tokens, response.usage.completion_tokens
             )
 
-            return response.choices[0].message
+            message = response.choices[0].message
+            if on_tool_call is not None:
+                for call in message.tool_calls or []:
+                    on_tool_call(call)
+
+            self._cache_response(cache_key, message.model_dump_json())
+            return message
 
         except TokenLimitExceeded:
             # Re-raise token limit errors without logging
@@ -0,0 +1,295 @@
+"""
+Pooled, rate-limited access to LLM endpoints.
+
+API clients are shared per endpoint, so every LLM configuration talking to
+the same provider reuses one keep-alive connection pool. Requests to a model
+go through a `RateLimiter` that caps concurrency and spreads requests and
+tokens over each minute with token buckets. A 429 pauses every request to
+that model for the time the provider asks for in `Retry-After`, instead of
+letting each caller retry on its own. Only errors that can succeed on a
+second attempt are retried.
+"""
+
+import asyncio
+import time
+import weakref
+from contextlib import asynccontextmanager
+from email.utils import parsedate_to_datetime
+from typing import AsyncIterator, Dict, Optional, Tuple
+
+import httpx
+from openai import (
+    APIConnectionError,
+    APIStatusError,
+    AsyncAzureOpenAI,
+    AsyncOpenAI,
+    DefaultAsyncHttpxClient,
+    RateLimitError,
+)
+from tenacity import (
+    retry,
+    retry_if_exception,
+    stop_after_attempt,
+    wait_random_exponential,
+)
+from tenacity.wait import wait_base
+
+from app.bedrock import BedrockClient
+from app.config import LLMSettings
+from app.logger import logger
+
+
+# Longest server-requested delay we honor, and the pause after a 429 without one
+MAX_RETRY_AFTER = 120.0
+DEFAULT_RATE_LIMIT_PAUSE = 1.0
+
+# Status codes worth retrying: timeouts, conflicts, rate limits, server errors
+RETRYABLE_STATUS_CODES = {408, 409, 429}
+
+
+def retry_after_seconds(error: BaseException) -> Optional[float]:
+    """Delay requested by the server in an error response, if any."""
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None)
+    if not headers:
+        return None
+
+    delay = None
+    if headers.get("retry-after-ms"):
+        try:
+            delay = float(headers["retry-after-ms"]) / 1000
+        except ValueError:
+            pass
+    if delay is None and headers.get("retry-after"):
+        value = headers["retry-after"]
+        try:
+            delay = float(value)
+        except ValueError:
+            try:
+                delay = parsedate_to_datetime(value).timestamp() - time.time()
+            except (TypeError, ValueError):
+                pass
+    if delay is None:
+        return None
+    return min(max(delay, 0.0), MAX_RETRY_AFTER)
+
+
+def is_retryable(error: BaseException) -> bool:
+    """
+    Whether a failed request may succeed if sent again.
+
+    Connection errors, timeouts, rate limits and server errors are retried.
+    Client errors (bad request, authentication, context length, ...), an
+    exhausted quota and local errors such as `TokenLimitExceeded` are not.
+    """
+    if isinstance(error, APIConnectionError):
+        return True
+    if isinstance(error, RateLimitError):
+        return getattr(error, "code", None) != "insufficient_quota"
+    if isinstance(error, APIStatusError):
+        return error.status_code in RETRYABLE_STATUS_CODES or error.status_code >= 500
+    return False
+
+
+class wait_retry_after(wait_base):
+    """Wait as long as the server asked to, or fall back to another strategy."""
+
+    def __init__(self, fallback: wait_base):
+        self.fallback = fallback
+
+    def __call__(self, retry_state) -> float:
+        error = retry_state.outcome.exception() if retry_state.outcome else None
+        delay = retry_after_seconds(error) if error else None
+        return delay if delay is not None else self.fallback(retry_state)
+
+
+# Retry policy of LLM requests
+retry_llm_request = retry(
+    wait=wait_retry_after(wait_random_exponential(min=1, max=60)),
+    stop=stop_after_attempt(6),
+    retry=retry_if_exception(is_retryable),
+    reraise=True,
+)
+
+
+class TokenBucket:
+    """
+    Allows `rate_per_minute` units per minute, with bursts up to `capacity`.
+
+    Waiters are served in arrival order. Usage reported after the fact with
+    `consume` may leave the bucket in debt, which delays later requests.
+    """
+
+    def __init__(self, rate_per_minute: float, capacity: Optional[float] = None):
+        self.rate = rate_per_minute / 60
+        self.capacity = capacity or rate_per_minute
+        self._available = self.capacity
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._available = min(
+            self.capacity, self._available + (now - self._updated) * self.rate
+        )
+        self._updated = now
+
+    async def acquire(self, amount: float = 1) -> float:
+        """Take `amount` units, waiting for them; returns the seconds waited."""
+        amount = min(amount, self.capacity)
+        waited = 0.0
+        async with self._lock:
+            self._refill()
+            while self._available < amount:
+                delay = (amount - self._available) / self.rate
+                await asyncio.sleep(delay)
+                waited += delay
+                self._refill()
+            self._available -= amount
+        return waited
+
+    def consume(self, amount: float) -> None:
+        """Take units that were used without waiting for them."""
+        self._refill()
+        self._available -= amount
+
+
+class RateLimiter:
+    """Concurrency, request and token limits of one model endpoint."""
+
+    def __init__(
+        self,
+        requests_per_minute: Optional[int] = None,
+        tokens_per_minute: Optional[int] = None,
+        max_concurrent: Optional[int] = None,
+    ):
+        self.requests = (
+            TokenBucket(requests_per_minute) if requests_per_minute else None
+        )
+        self.tokens = TokenBucket(tokens_per_minute) if tokens_per_minute else None
+        self._slots = asyncio.Semaphore(max_concurrent) if max_concurrent else None
+        self._paused_until = 0.0
+
+        self.total_requests = 0
+        self.rate_limited = 0
+        self.throttled_seconds = 0.0
+
+    def pause(self, seconds: float) -> None:
+        """Hold back every request for `seconds`, e.g. after a 429."""
+        self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+
+    def consume_tokens(self, tokens: int) -> None:
+        """Count tokens known only after a response, such as completions."""
+        if self.tokens and tokens:
+            self.tokens.consume(tokens)
+
+    @asynccontextmanager
+    async def limit(self, tokens: int = 0) -> AsyncIterator["RateLimiter"]:
+        """Hold a request slot, waiting for the limits to allow `tokens` more."""
+        if self._slots:
+            await self._slots.acquire()
+        try:
+            while (delay := self._paused_until - time.monotonic()) > 0:
+                await asyncio.sleep(delay)
+                self.throttled_seconds += delay
+            if self.requests:
+                self.throttled_seconds += await self.requests.acquire(1)
+            if self.tokens and tokens:
+                self.throttled_seconds += await self.tokens.acquire(tokens)
+
+            self.total_requests += 1
+            try:
+                yield self
+            except RateLimitError as e:
+                self.rate_limited += 1
+                delay = retry_after_seconds(e)
+                self.pause(DEFAULT_RATE_LIMIT_PAUSE if delay is None else delay)
+                raise
+        finally:
+            if self._slots:
+                self._slots.release()
+
+    def get_stats(self) -> dict:
+        return {
+            "total_requests": self.total_requests,
+            "rate_limited": self.rate_limited,
+            "throttled_seconds": round(self.throttled_seconds, 3),
+        }
+
+
+_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[Tuple, object]]" = (
+    weakref.WeakKeyDictionary()
+)
+_limiters: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[Tuple, RateLimiter]]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def get_llm_client(settings: LLMSettings):
+    """
+    Get the shared API client of an endpoint for the running event loop.
+
+    Clients are bound to the loop they were created on, like their
+    connections, so each loop gets its own.
+    """
+    clients = _clients.setdefault(asyncio.get_running_loop(), {})
+    key = (settings.api_type, settings.base_url, settings.api_key, settings.api_version)
+    client = clients.get(key)
+    if client is None:
+        client = _create_client(settings)
+        clients[key] = client
+    return client
+
+
+def _create_client(settings: LLMSettings):
+    if settings.api_type == "aws":
+        return BedrockClient()
+
+    http_client = DefaultAsyncHttpxClient(
+        limits=httpx.Limits(
+            max_connections=settings.max_connections,
+            max_keepalive_connections=settings.max_keepalive_connections,
+            keepalive_expiry=settings.keepalive_expiry,
+        )
+    )
+    # Retries are ours (retry_llm_request), so the SDK must not retry as well
+    if settings.api_type == "azure":
+        return AsyncAzureOpenAI(
+            base_url=settings.base_url,
+            api_key=settings.api_key,
+            api_version=settings.api_version,
+            http_client=http_client,
+            max_retries=0,
+        )
+    return AsyncOpenAI(
+        api_key=settings.api_key,
+        base_url=settings.base_url,
+        http_client=http_client,
+        max_retries=0,
+    )
+
+
+def get_rate_limiter(settings: LLMSettings) -> RateLimiter:
+    """Get the rate limiter of a model endpoint for the running event loop."""
+    limiters = _limiters.setdefault(asyncio.get_running_loop(), {})
+    key = (settings.base_url, settings.model)
+    limiter = limiters.get(key)
+    if limiter is None:
+        limiter = RateLimiter(
+            requests_per_minute=settings.requests_per_minute,
+            tokens_per_minute=settings.tokens_per_minute,
+            max_concurrent=settings.max_concurrent_requests,
+        )
+        limiters[key] = limiter
+    return limiter
+
+
+async def close_llm_clients() -> None:
+    """Close the shared API clients of the running event loop."""
+    clients = _clients.pop(asyncio.get_running_loop(), {})
+    for client in clients.values():
+        if hasattr(client, "close"):
+            try:
+                await client.close()
+            except Exception as e:
+                logger.debug(f"Failed to close LLM client: {e}")
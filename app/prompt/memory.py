@@ -0,0 +1,16 @@
+SUMMARIZE_PROMPT = """\
+Summarize the earlier part of a conversation between a user and an AI agent, so the agent can continue the task without it.
+
+Keep:
+- The task and every requirement the user stated
+- Facts and results obtained so far (file paths, URLs, values, tool outputs that matter)
+- Decisions made and approaches that failed
+- What remains to be done
+
+Be concise and write in plain prose.
+
+Conversation:
+{transcript}"""
+
+# Characters kept per message when building the transcript to summarize
+SUMMARY_MESSAGE_CHARS = 2000
@@ -0,0 +1,103 @@
+"""
+Session-scoped runtime state.
+
+State that used to be process-wide, the sandbox client, the file editor's
+undo history and the LLM token counters, lives in a `SessionRuntime`. The
+runtime of the running session is found through a context variable, so
+concurrent sessions on one event loop each see their own state, and tasks
+started by a session inherit it. Code running outside any session uses a
+process-wide default runtime, which keeps single-agent scripts unchanged.
+"""
+
+import itertools
+from collections import defaultdict
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from typing import AsyncIterator, DefaultDict, Dict, List, Optional
+
+from app.logger import logger
+from app.sandbox.client import SANDBOX_CLIENT, LocalSandboxClient
+
+
+class TokenUsage:
+    """Input and completion tokens used through one LLM configuration."""
+
+    __slots__ = ("input_tokens", "completion_tokens")
+
+    def __init__(self):
+        self.input_tokens = 0
+        self.completion_tokens = 0
+
+
+class SessionRuntime:
+    """The state of one agent session."""
+
+    def __init__(self, session_id: str, sandbox: Optional[LocalSandboxClient] = None):
+        self.session_id = session_id
+        self.sandbox = sandbox or LocalSandboxClient()
+        self.file_history: DefaultDict[str, List[str]] = defaultdict(list)
+        self.token_usage: Dict[str, TokenUsage] = defaultdict(TokenUsage)
+
+    def get_token_usage(self) -> Dict[str, Dict[str, int]]:
+        """Tokens used so far, by LLM configuration name."""
+        return {
+            name: {
+                "input_tokens": usage.input_tokens,
+                "completion_tokens": usage.completion_tokens,
+            }
+            for name, usage in self.token_usage.items()
+        }
+
+    def merge_token_usage(self, other: "SessionRuntime") -> None:
+        """Add the tokens used in another runtime, e.g. a finished sub-task."""
+        for name, usage in other.token_usage.items():
+            total = self.token_usage[name]
+            total.input_tokens += usage.input_tokens
+            total.completion_tokens += usage.completion_tokens
+
+    async def close(self) -> None:
+        """Release the session's resources."""
+        try:
+            await self.sandbox.cleanup()
+        except Exception as e:
+            logger.warning(f"Error cleaning up sandbox of {self.session_id}: {e}")
+
+
+DEFAULT_RUNTIME = SessionRuntime("default", sandbox=SANDBOX_CLIENT)
+
+_current_runtime: ContextVar[SessionRuntime] = ContextVar(
+    "session_runtime", default=DEFAULT_RUNTIME
+)
+_session_ids = itertools.count(1)
+_active: Dict[str, SessionRuntime] = {}
+
+
+def get_runtime() -> SessionRuntime:
+    """Get the runtime of the running session, or the default runtime."""
+    return _current_runtime.get()
+
+
+def get_active_sessions() -> List[str]:
+    """IDs of the sessions currently running in this process."""
+    return list(_active)
+
+
+@asynccontextmanager
+async def session_runtime(
+    session_id: Optional[str] = None,
+) -> AsyncIterator[SessionRuntime]:
+    """
+    Run the enclosed code in a fresh session runtime.
+
+    The runtime applies to the current task and to tasks created inside the
+    block, and is closed when the block exits.
+    """
+    runtime = SessionRuntime(session_id or f"session_{next(_session_ids)}")
+    token = _current_runtime.set(runtime)
+    _active[runtime.session_id] = runtime
+    try:
+        yield runtime
+    finally:
+        _current_runtime.reset(token)
+        _active.pop(runtime.session_id, None)
+        await runtime.close()
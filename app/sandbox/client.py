@@ -70,6 +70,10 @@ class BaseSandboxClient(ABC):
     async def copy_to(self, local_path: str, container_path: str) -> None:
         """Copies file to container."""
 
+    @abstractmethod
+    async def copy_many(self, files: Dict[str, str], to_container: bool = True) -> None:
+        """Copies a batch of files to or from container."""
+
     @abstractmethod
     async def read_file(self, path: str) -> str:
         """Reads file."""
@@ -152,6 +156,20 @@ class LocalSandboxClient(BaseSandboxClient):
             raise RuntimeError("Sandbox not initialized")
         await self.sandbox.copy_to(local_path, container_path)
 
+    async def copy_many(self, files: Dict[str, str], to_container: bool = True) -> None:
+        """Copies a batch of files between local and container.
+
+        Args:
+            files: Mapping of source path to destination path.
+            to_container: Copy from local to container if True, else the reverse.
+
+        Raises:
+            RuntimeError: If sandbox not initialized.
+        """
+        if not self.sandbox:
+            raise RuntimeError("Sandbox not initialized")
+        await self.sandbox.copy_many(files, to_container)
+
     async def read_file(self, path: str) -> str:
         """Reads file from container.
 
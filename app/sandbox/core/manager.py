@@ -1,7 +1,8 @@
 import asyncio
 import uuid
+from collections import deque
 from contextlib import asynccontextmanager
-from typing import Dict, Optional, Set
+from typing import Deque, Dict, Optional, Set, Tuple
 
 import docker
 from docker.errors import APIError, ImageNotFound
@@ -18,12 +19,18 @@ class SandboxManager:
     monitoring, and cleanup. Provides concurrent access control and automatic
     cleanup mechanisms for sandbox resources.
 
+    With a warm pool enabled, ready-to-use sandboxes are kept per
+    SandboxSettings profile and handed out without waiting for container
+    startup; the pool is refilled in the background.
+
     Attributes:
         max_sandboxes: Maximum allowed number of sandboxes.
         idle_timeout: Sandbox idle timeout in seconds.
         cleanup_interval: Cleanup check interval in seconds.
+        warm_pool_size: Number of ready sandboxes kept per profile.
         _sandboxes: Active sandbox instance mapping.
         _last_used: Last used time record for sandboxes.
+        _warm_pool: Ready sandboxes per profile, with their creation time.
     """
 
     def __init__(
@@ -31,6 +38,7 @@ class SandboxManager:
         max_sandboxes: int = 100,
         idle_timeout: int = 3600,
         cleanup_interval: int = 300,
+        warm_pool_size: int = 0,
     ):
         """Initializes sandbox manager.
 
@@ -38,10 +46,12 @@ class SandboxManager:
             max_sandboxes: Maximum sandbox count limit.
             idle_timeout: Idle timeout in seconds.
             cleanup_interval: Cleanup check interval in seconds.
+            warm_pool_size: Ready sandboxes to keep per profile (0 disables).
         """
         self.max_sandboxes = max_sandboxes
         self.idle_timeout = idle_timeout
         self.cleanup_interval = cleanup_interval
+        self.warm_pool_size = warm_pool_size
 
         # Docker client
         self._client = docker.from_env()
@@ -54,6 +64,13 @@ class SandboxManager:
         self._locks: Dict[str, asyncio.Lock] = {}
         self._global_lock = asyncio.Lock()
         self._active_operations: Set[str] = set()
+        self._pending_creations = 0
+
+        # Warm pool, keyed by sandbox profile
+        self._warm_pool: Dict[str, Deque[Tuple[DockerSandbox, float]]] = {}
+        self._warm_profiles: Dict[str, SandboxSettings] = {}
+        self._refill_tasks: Dict[str, asyncio.Task] = {}
+        self._eviction_tasks: Set[asyncio.Task] = set()
 
         # Cleanup task
         self._cleanup_task: Optional[asyncio.Task] = None
@@ -118,6 +135,10 @@ class SandboxManager:
     ) -> str:
         """Creates a new sandbox instance.
 
+        Takes a ready sandbox from the warm pool when one matches the
+        configuration; otherwise creates one. Only the slot reservation is
+        done under the global lock, so creations run concurrently.
+
         Args:
             config: Sandbox configuration.
             volume_bindings: Volume mapping configuration.
@@ -128,33 +149,165 @@ class SandboxManager:
         Raises:
             RuntimeError: If max sandbox count reached or creation fails.
         """
+        config = config or SandboxSettings()
+        profile = self._profile_key(config)
+
         async with self._global_lock:
-            if len(self._sandboxes) >= self.max_sandboxes:
+            if len(self._sandboxes) + self._pending_creations >= self.max_sandboxes:
                 raise RuntimeError(
                     f"Maximum number of sandboxes ({self.max_sandboxes}) reached"
                 )
 
-            config = config or SandboxSettings()
-            if not await self.ensure_image(config.image):
-                raise RuntimeError(f"Failed to ensure Docker image: {config.image}")
+            # Volume bindings are per-request, so only plain sandboxes are pooled
+            sandbox = None if volume_bindings else self._take_warm_sandbox(profile)
+            if sandbox is not None:
+                sandbox_id = self._register_sandbox(sandbox)
+            else:
+                # Pooled sandboxes give way to real requests
+                if self._available_slots() <= 0:
+                    self._evict_warm_sandbox()
+                self._pending_creations += 1
 
-            sandbox_id = str(uuid.uuid4())
-            try:
-                sandbox = DockerSandbox(config, volume_bindings)
-                await sandbox.create()
+        if self.warm_pool_size > 0 and not volume_bindings:
+            self._warm_profiles.setdefault(profile, config)
+            self._schedule_refill(profile)
 
-                self._sandboxes[sandbox_id] = sandbox
-                self._last_used[sandbox_id] = asyncio.get_event_loop().time()
-                self._locks[sandbox_id] = asyncio.Lock()
+        if sandbox is not None:
+            logger.info(f"Created sandbox {sandbox_id} from warm pool")
+            return sandbox_id
+
+        try:
+            sandbox = await self._build_sandbox(config, volume_bindings)
+        finally:
+            self._pending_creations -= 1
+
+        async with self._global_lock:
+            sandbox_id = self._register_sandbox(sandbox)
+
+        logger.info(f"Created sandbox {sandbox_id}")
+        return sandbox_id
+
+    async def _build_sandbox(
+        self,
+        config: SandboxSettings,
+        volume_bindings: Optional[Dict[str, str]] = None,
+    ) -> DockerSandbox:
+        """Pulls the image if needed and starts a new sandbox.
 
-                logger.info(f"Created sandbox {sandbox_id}")
-                return sandbox_id
+        Args:
+            config: Sandbox configuration.
+            volume_bindings: Volume mapping configuration.
+
+        Returns:
+            DockerSandbox: Started sandbox.
+
+        Raises:
+            RuntimeError: If the image is unavailable or creation fails.
+        """
+        if not await self.ensure_image(config.image):
+            raise RuntimeError(f"Failed to ensure Docker image: {config.image}")
 
+        try:
+            sandbox = DockerSandbox(config, volume_bindings)
+            await sandbox.create()
+            return sandbox
+        except Exception as e:
+            logger.error(f"Failed to create sandbox: {e}")
+            raise RuntimeError(f"Failed to create sandbox: {e}")
+
+    def _register_sandbox(self, sandbox: DockerSandbox) -> str:
+        """Registers a sandbox as active. Must hold the global lock.
+
+        Args:
+            sandbox: Started sandbox.
+
+        Returns:
+            str: New sandbox ID.
+        """
+        sandbox_id = str(uuid.uuid4())
+        self._sandboxes[sandbox_id] = sandbox
+        self._last_used[sandbox_id] = asyncio.get_event_loop().time()
+        self._locks[sandbox_id] = asyncio.Lock()
+        return sandbox_id
+
+    @staticmethod
+    def _profile_key(config: SandboxSettings) -> str:
+        """Gets the warm pool key for a sandbox configuration."""
+        return config.model_dump_json()
+
+    def _available_slots(self) -> int:
+        """Gets the number of sandboxes that can still be started."""
+        pooled = sum(len(pool) for pool in self._warm_pool.values())
+        return (
+            self.max_sandboxes - len(self._sandboxes) - self._pending_creations - pooled
+        )
+
+    def _take_warm_sandbox(self, profile: str) -> Optional[DockerSandbox]:
+        """Takes a ready sandbox for the profile from the warm pool, if any."""
+        pool = self._warm_pool.get(profile)
+        if not pool:
+            return None
+        sandbox, _ = pool.popleft()
+        return sandbox
+
+    def _evict_warm_sandbox(self) -> None:
+        """Removes the oldest pooled sandbox of the largest pool."""
+        pools = [pool for pool in self._warm_pool.values() if pool]
+        if not pools:
+            return
+        sandbox, _ = max(pools, key=len).popleft()
+        task = asyncio.create_task(sandbox.cleanup())
+        self._eviction_tasks.add(task)
+        task.add_done_callback(self._eviction_tasks.discard)
+
+    def _schedule_refill(self, profile: str) -> None:
+        """Starts a background refill of the profile's pool if none is running."""
+        if self._is_shutting_down:
+            return
+        task = self._refill_tasks.get(profile)
+        if task is None or task.done():
+            self._refill_tasks[profile] = asyncio.create_task(
+                self._refill_warm_pool(profile)
+            )
+
+    async def _refill_warm_pool(self, profile: str) -> None:
+        """Creates sandboxes until the profile's pool is full or no slots remain.
+
+        Args:
+            profile: Warm pool key.
+        """
+        config = self._warm_profiles[profile]
+        pool = self._warm_pool.setdefault(profile, deque())
+
+        while not self._is_shutting_down and len(pool) < self.warm_pool_size:
+            async with self._global_lock:
+                if self._available_slots() <= 0:
+                    return
+                self._pending_creations += 1
+
+            try:
+                sandbox = await self._build_sandbox(config)
             except Exception as e:
-                logger.error(f"Failed to create sandbox: {e}")
-                if sandbox_id in self._sandboxes:
-                    await self.delete_sandbox(sandbox_id)
-                raise RuntimeError(f"Failed to create sandbox: {e}")
+                logger.error(f"Failed to refill sandbox warm pool: {e}")
+                return
+            finally:
+                self._pending_creations -= 1
+
+            if self._is_shutting_down:
+                await sandbox.cleanup()
+                return
+            pool.append((sandbox, asyncio.get_event_loop().time()))
+
+    async def warm_up(self, config: Optional[SandboxSettings] = None) -> None:
+        """Fills the warm pool for a sandbox profile.
+
+        Args:
+            config: Sandbox configuration to keep ready sandboxes for.
+        """
+        config = config or SandboxSettings()
+        profile = self._profile_key(config)
+        self._warm_profiles.setdefault(profile, config)
+        await self._refill_warm_pool(profile)
 
     async def get_sandbox(self, sandbox_id: str) -> DockerSandbox:
         """Gets a sandbox instance.
@@ -189,6 +342,8 @@ class SandboxManager:
         current_time = asyncio.get_event_loop().time()
         to_cleanup = []
 
+        to_recycle = []
+
         async with self._global_lock:
             for sandbox_id, last_used in self._last_used.items():
                 if (
@@ -197,12 +352,26 @@ class SandboxManager:
                 ):
                     to_cleanup.append(sandbox_id)
 
+            # Recycle pooled sandboxes that sat idle too long
+            for pool in self._warm_pool.values():
+                while pool and current_time - pool[0][1] > self.idle_timeout:
+                    to_recycle.append(pool.popleft()[0])
+
         for sandbox_id in to_cleanup:
             try:
                 await self.delete_sandbox(sandbox_id)
             except Exception as e:
                 logger.error(f"Error cleaning up sandbox {sandbox_id}: {e}")
 
+        for sandbox in to_recycle:
+            try:
+                await sandbox.cleanup()
+            except Exception as e:
+                logger.error(f"Error recycling pooled sandbox: {e}")
+
+        for profile in self._warm_profiles:
+            self._schedule_refill(profile)
+
     async def cleanup(self) -> None:
         """Cleans up all resources."""
         logger.info("Starting manager cleanup...")
@@ -216,15 +385,30 @@ class SandboxManager:
             except (asyncio.CancelledError, asyncio.TimeoutError):
                 pass
 
+        # Cancel warm pool refills
+        for task in self._refill_tasks.values():
+            task.cancel()
+        if self._refill_tasks:
+            await asyncio.wait(self._refill_tasks.values(), timeout=1.0)
+        self._refill_tasks.clear()
+
         # Get all sandbox IDs to clean up
         async with self._global_lock:
             sandbox_ids = list(self._sandboxes.keys())
+            pooled = [
+                sandbox for pool in self._warm_pool.values() for sandbox, _ in pool
+            ]
+            self._warm_pool.clear()
 
         # Concurrently clean up all sandboxes
         cleanup_tasks = []
         for sandbox_id in sandbox_ids:
             task = asyncio.create_task(self._safe_delete_sandbox(sandbox_id))
             cleanup_tasks.append(task)
+        for sandbox in pooled:
+            cleanup_tasks.append(asyncio.create_task(sandbox.cleanup()))
+        # Sandboxes evicted from the pool may still be shutting down
+        cleanup_tasks.extend(self._eviction_tasks)
 
         if cleanup_tasks:
             # Wait for all cleanup tasks to complete, with timeout to avoid infinite waiting
@@ -306,6 +490,9 @@ class SandboxManager:
         return {
             "total_sandboxes": len(self._sandboxes),
             "active_operations": len(self._active_operations),
+            "warm_sandboxes": sum(len(pool) for pool in self._warm_pool.values()),
+            "warm_pool_size": self.warm_pool_size,
+            "warm_profiles": len(self._warm_profiles),
             "max_sandboxes": self.max_sandboxes,
             "idle_timeout": self.idle_timeout,
             "cleanup_interval": self.cleanup_interval,
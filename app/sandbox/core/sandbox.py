@@ -1,10 +1,11 @@
 import asyncio
 import io
 import os
+import shutil
 import tarfile
 import tempfile
 import uuid
-from typing import Dict, Optional
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
 
 import docker
 from docker.errors import NotFound
@@ -15,6 +16,79 @@ from app.sandbox.core.exceptions import SandboxTimeoutError
 from app.sandbox.core.terminal import AsyncDockerizedTerminal
 
 
+# Chunk size used when streaming archives between Docker and the host
+STREAM_CHUNK_SIZE = 1024 * 1024
+
+
+class _ChunkStreamReader(io.RawIOBase):
+    """Read-only file object over an iterator of byte chunks.
+
+    Lets tarfile consume a Docker archive stream directly, without spooling
+    it to a temporary file first.
+    """
+
+    def __init__(self, chunks: Iterable[bytes]):
+        self._chunks = iter(chunks)
+        self._pending = memoryview(b"")
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        while not self._pending:
+            try:
+                self._pending = memoryview(next(self._chunks))
+            except StopIteration:
+                return 0
+        size = min(len(buffer), len(self._pending))
+        buffer[:size] = self._pending[:size]
+        self._pending = self._pending[size:]
+        return size
+
+
+def _open_tar_stream(chunks: Iterable[bytes]) -> tarfile.TarFile:
+    """Opens a Docker archive stream for sequential tar reading."""
+    reader = io.BufferedReader(_ChunkStreamReader(chunks), STREAM_CHUNK_SIZE)
+    return tarfile.open(fileobj=reader, mode="r|")
+
+
+def _iter_tar(entries: Iterable[Tuple[str, str]]) -> Iterator[bytes]:
+    """Produces a tar archive of host files as a stream of chunks.
+
+    Headers and file contents are yielded as they are read, so archives of
+    any size are sent with constant memory and without temporary files.
+
+    Args:
+        entries: (host path, archive name) pairs.
+
+    Yields:
+        Consecutive chunks of the tar archive.
+    """
+    tar_info_factory = tarfile.TarFile(fileobj=io.BytesIO(), mode="w")
+    for host_path, arcname in entries:
+        info = tar_info_factory.gettarinfo(host_path, arcname)
+        yield info.tobuf(tarfile.PAX_FORMAT, "utf-8", "surrogateescape")
+        if not info.isreg():
+            continue
+
+        remaining = info.size
+        with open(host_path, "rb") as f:
+            while remaining > 0:
+                chunk = f.read(min(STREAM_CHUNK_SIZE, remaining))
+                if not chunk:
+                    # File shrank while reading; pad to the announced size
+                    chunk = b"\0" * remaining
+                remaining -= len(chunk)
+                yield chunk
+
+        padding = -info.size % tarfile.BLOCKSIZE
+        if padding:
+            yield b"\0" * padding
+
+    # End-of-archive marker: two empty blocks
+    yield b"\0" * (tarfile.BLOCKSIZE * 2)
+
+
 class DockerSandbox:
     """Docker sandbox environment.
 
@@ -272,46 +346,52 @@ class DockerSandbox:
             # Get file stream
             resolved_src = self._safe_resolve_path(src_path)
             stream, stat = await asyncio.to_thread(
-                self.container.get_archive, resolved_src
+                self.container.get_archive, resolved_src, STREAM_CHUNK_SIZE
             )
 
-            # Create temporary directory to extract file
-            with tempfile.TemporaryDirectory() as tmp_dir:
-                # Write stream to temporary file
-                tar_path = os.path.join(tmp_dir, "temp.tar")
-                with open(tar_path, "wb") as f:
-                    for chunk in stream:
-                        f.write(chunk)
-
-                # Extract file
-                with tarfile.open(tar_path) as tar:
-                    members = tar.getmembers()
-                    if not members:
-                        raise FileNotFoundError(f"Source file is empty: {src_path}")
-
-                    # If destination is a directory, we should preserve relative path structure
-                    if os.path.isdir(dst_path):
-                        tar.extractall(dst_path)
-                    else:
-                        # If destination is a file, we only extract the source file's content
-                        if len(members) > 1:
-                            raise RuntimeError(
-                                f"Source path is a directory but destination is a file: {src_path}"
-                            )
-
-                        with open(dst_path, "wb") as dst:
-                            src_file = tar.extractfile(members[0])
-                            if src_file is None:
-                                raise RuntimeError(
-                                    f"Failed to extract file: {src_path}"
-                                )
-                            dst.write(src_file.read())
+            # Extract straight from the stream into the destination
+            await asyncio.to_thread(self._extract_stream, stream, src_path, dst_path)
 
         except docker.errors.NotFound:
             raise FileNotFoundError(f"Source file not found: {src_path}")
         except Exception as e:
             raise RuntimeError(f"Failed to copy file: {e}")
 
+    @staticmethod
+    def _extract_stream(stream: Iterable[bytes], src_path: str, dst_path: str) -> None:
+        """Extracts a Docker archive stream to a host path.
+
+        Args:
+            stream: Archive chunks returned by get_archive.
+            src_path: Source path in the container (for error messages).
+            dst_path: Host destination file or existing directory.
+
+        Raises:
+            FileNotFoundError: If the archive is empty.
+            RuntimeError: If a directory would be written to a file path.
+        """
+        with _open_tar_stream(stream) as tar:
+            # If destination is a directory, we should preserve relative path structure
+            if os.path.isdir(dst_path):
+                tar.extractall(dst_path)
+                return
+
+            member = tar.next()
+            if member is None:
+                raise FileNotFoundError(f"Source file is empty: {src_path}")
+
+            # If destination is a file, we only extract the source file's content
+            if member.isdir():
+                raise RuntimeError(
+                    f"Source path is a directory but destination is a file: {src_path}"
+                )
+
+            src_file = tar.extractfile(member)
+            if src_file is None:
+                raise RuntimeError(f"Failed to extract file: {src_path}")
+            with open(dst_path, "wb") as dst:
+                shutil.copyfileobj(src_file, dst, STREAM_CHUNK_SIZE)
+
     async def copy_to(self, src_path: str, dst_path: str) -> None:
         """Copies a file to the container.
 
@@ -333,47 +413,93 @@ class DockerSandbox:
             if container_dir:
                 await self.run_command(f"mkdir -p {container_dir}")
 
-            # Create tar file to upload
-            with tempfile.TemporaryDirectory() as tmp_dir:
-                tar_path = os.path.join(tmp_dir, "temp.tar")
-                with tarfile.open(tar_path, "w") as tar:
-                    # Handle directory source path
-                    if os.path.isdir(src_path):
-                        os.path.basename(src_path.rstrip("/"))
-                        for root, _, files in os.walk(src_path):
-                            for file in files:
-                                file_path = os.path.join(root, file)
-                                arcname = os.path.join(
-                                    os.path.basename(dst_path),
-                                    os.path.relpath(file_path, src_path),
-                                )
-                                tar.add(file_path, arcname=arcname)
-                    else:
-                        # Add single file to tar
-                        tar.add(src_path, arcname=os.path.basename(dst_path))
-
-                # Read tar file content
-                with open(tar_path, "rb") as f:
-                    data = f.read()
-
-                # Upload to container
-                await asyncio.to_thread(
-                    self.container.put_archive,
-                    os.path.dirname(resolved_dst) or "/",
-                    data,
-                )
+            # Stream the archive to the container as it is produced
+            entries = self._archive_entries(src_path, os.path.basename(dst_path))
+            await asyncio.to_thread(
+                self.container.put_archive,
+                os.path.dirname(resolved_dst) or "/",
+                _iter_tar(entries),
+            )
 
-                # Verify file was created successfully
-                try:
-                    await self.run_command(f"test -e {resolved_dst}")
-                except Exception:
-                    raise RuntimeError(f"Failed to verify file creation: {dst_path}")
+            # Verify file was created successfully
+            try:
+                await self.run_command(f"test -e {resolved_dst}")
+            except Exception:
+                raise RuntimeError(f"Failed to verify file creation: {dst_path}")
 
         except FileNotFoundError:
             raise
         except Exception as e:
             raise RuntimeError(f"Failed to copy file: {e}")
 
+    @staticmethod
+    def _archive_entries(src_path: str, arcname: str) -> List[Tuple[str, str]]:
+        """Lists the (host path, archive name) pairs to upload for a source.
+
+        Args:
+            src_path: Host file or directory.
+            arcname: Name of the source inside the archive.
+
+        Returns:
+            Files to archive, with directories expanded recursively.
+        """
+        if not os.path.isdir(src_path):
+            return [(src_path, arcname)]
+
+        entries = []
+        for root, _, files in os.walk(src_path):
+            for file in files:
+                file_path = os.path.join(root, file)
+                entries.append(
+                    (
+                        file_path,
+                        os.path.join(arcname, os.path.relpath(file_path, src_path)),
+                    )
+                )
+        return entries
+
+    async def copy_many(self, files: Dict[str, str], to_container: bool = True) -> None:
+        """Copies a batch of files in one go.
+
+        Uploads are sent as a single streamed archive with one put_archive
+        call; downloads are streamed concurrently.
+
+        Args:
+            files: Mapping of source path to destination path.
+            to_container: Copy from host to container if True, else the reverse.
+
+        Raises:
+            FileNotFoundError: If a source file does not exist.
+            RuntimeError: If copy operation fails.
+        """
+        if not files:
+            return
+
+        if not to_container:
+            await asyncio.gather(
+                *(self.copy_from(src, dst) for src, dst in files.items())
+            )
+            return
+
+        try:
+            entries = []
+            for src_path, dst_path in files.items():
+                if not os.path.exists(src_path):
+                    raise FileNotFoundError(f"Source file not found: {src_path}")
+                # Archive names are absolute container paths, extracted at "/"
+                arcname = self._safe_resolve_path(dst_path).lstrip("/")
+                entries.extend(self._archive_entries(src_path, arcname))
+
+            parent_dirs = sorted({os.path.dirname("/" + name) for _, name in entries})
+            await self.run_command(f"mkdir -p {' '.join(parent_dirs)}")
+
+            await asyncio.to_thread(self.container.put_archive, "/", _iter_tar(entries))
+
+        except FileNotFoundError:
+            raise
+        except Exception as e:
+            raise RuntimeError(f"Failed to copy files: {e}")
+
     @staticmethod
     async def _create_tar_stream(name: str, content: bytes) -> io.BytesIO:
         """Creates a tar file stream.
@@ -406,12 +532,9 @@ class DockerSandbox:
         Raises:
             RuntimeError: If read operation fails.
         """
-        with tempfile.NamedTemporaryFile() as tmp:
-            for chunk in tar_stream:
-                tmp.write(chunk)
-            tmp.seek(0)
 
-            with tarfile.open(fileobj=tmp) as tar:
+        def read_first_member() -> bytes:
+            with _open_tar_stream(tar_stream) as tar:
                 member = tar.next()
                 if not member:
                     raise RuntimeError("Empty tar archive")
@@ -422,6 +545,8 @@ class DockerSandbox:
 
                 return file_content.read()
 
+        return await asyncio.to_thread(read_first_member)
+
     async def cleanup(self) -> None:
         """Cleans up sandbox resources."""
         errors = []
@@ -6,8 +6,8 @@ allowing interactive command execution with timeout control.
 """
 
 import asyncio
-import re
 import socket
+import uuid
 from typing import Dict, Optional, Tuple, Union
 
 import docker
@@ -17,6 +17,9 @@ from docker.models.containers import Container
 
 
 class DockerSession:
+    # Printed after every command, followed by a per-command token and exit code
+    MARKER_PREFIX = "__OPENMANUS_CMD_DONE_"
+
     def __init__(self, container_id: str) -> None:
         """Initializes a Docker session.
 
@@ -27,6 +30,8 @@ class DockerSession:
         self.container_id = container_id
         self.exec_id = None
         self.socket = None
+        self.last_exit_code: Optional[int] = None
+        self._buffer = bytearray()
 
     async def create(self, working_dir: str, env_vars: Dict[str, str]) -> None:
         """Creates an interactive session with the container.
@@ -70,7 +75,9 @@ class DockerSession:
         else:
             raise RuntimeError("Failed to get socket connection")
 
-        await self._read_until_prompt()
+        # Turn off terminal echo and prompts so the stream only carries output
+        await self._send("stty -echo 2>/dev/null; PS1=''; PS2=''\n")
+        await self._read_until_marker(await self._send_marker())
 
     async def close(self) -> None:
         """Cleans up session resources.
@@ -114,37 +121,93 @@ class DockerSession:
             # Log error but don't raise, ensure cleanup continues
             print(f"Warning: Error during session cleanup: {e}")
 
-    async def _read_until_prompt(self) -> str:
-        """Reads output until prompt is found.
+    async def _send(self, data: str) -> None:
+        """Writes to the session socket once it is writable.
+
+        Args:
+            data: Text to send to the shell.
+        """
+        await asyncio.get_running_loop().sock_sendall(self.socket, data.encode())
+
+    async def _send_marker(self) -> str:
+        """Asks the shell to print a unique end marker with the last exit code.
+
+        The marker is passed to printf in two quoted halves, so the command
+        text itself can never be mistaken for the marker.
 
         Returns:
-            String containing output up to the prompt.
+            The token identifying this marker.
+        """
+        token = uuid.uuid4().hex
+        await self._send(
+            f"printf '\\n%s%s:%s\\n' '{self.MARKER_PREFIX}' '{token}' \"$?\"\n"
+        )
+        return token
+
+    async def _read_until_marker(self, token: str) -> Tuple[str, int]:
+        """Reads output until the end marker with the given token arrives.
+
+        Waits on socket readiness through the event loop and keeps all data in
+        a single buffer, scanning only the newly received bytes.
+
+        Args:
+            token: Token of the marker to wait for.
+
+        Returns:
+            Tuple of (output, exit_code).
 
         Raises:
-            socket.error: If socket communication fails.
+            RuntimeError: If the session closes before the marker arrives.
         """
-        buffer = b""
-        while b"$ " not in buffer:
-            try:
-                chunk = self.socket.recv(4096)
-                if chunk:
-                    buffer += chunk
-            except socket.error as e:
-                if e.errno == socket.EWOULDBLOCK:
-                    await asyncio.sleep(0.1)
-                    continue
-                raise
-        return buffer.decode("utf-8")
+        loop = asyncio.get_running_loop()
+        prefix = self.MARKER_PREFIX.encode()
+        marker = prefix + token.encode() + b":"
+        buffer = self._buffer
+        scan_from = 0
+
+        while True:
+            index = buffer.find(marker, scan_from)
+            if index != -1:
+                line_end = buffer.find(b"\n", index + len(marker))
+                if line_end != -1:
+                    break
+                scan_from = index
+            else:
+                scan_from = max(0, len(buffer) - len(marker) + 1)
+
+            chunk = await loop.sock_recv(self.socket, 65536)
+            if not chunk:
+                raise RuntimeError("Session closed before command completed")
+            buffer += chunk
+
+        try:
+            exit_code = int(buffer[index + len(marker) : line_end].strip())
+        except ValueError:
+            exit_code = -1
+        output = bytes(buffer[:index])
+        del buffer[: line_end + 1]
+
+        # Drop late output of earlier commands (e.g. ones that timed out)
+        stale = output.rfind(prefix)
+        if stale != -1:
+            output = output[output.find(b"\n", stale) + 1 :]
+
+        output = output.replace(b"\r\n", b"\n")
+        if output.endswith(b"\n"):
+            output = output[:-1]  # Newline printed ahead of the marker
+        return output.decode("utf-8", errors="replace"), exit_code
 
     async def execute(self, command: str, timeout: Optional[int] = None) -> str:
         """Executes a command and returns cleaned output.
 
+        The command's exit code is kept in `last_exit_code`.
+
         Args:
             command: Shell command to execute.
             timeout: Maximum execution time in seconds.
 
         Returns:
-            Command output as string with prompt markers removed.
+            Command output as string.
 
         Raises:
             RuntimeError: If session not initialized or execution fails.
@@ -156,59 +219,18 @@ class DockerSession:
         try:
             # Sanitize command to prevent shell injection
             sanitized_command = self._sanitize_command(command)
-            full_command = f"{sanitized_command}\necho $?\n"
-            self.socket.sendall(full_command.encode())
-
-            async def read_output() -> str:
-                buffer = b""
-                result_lines = []
-                command_sent = False
-
-                while True:
-                    try:
-                        chunk = self.socket.recv(4096)
-                        if not chunk:
-                            break
-
-                        buffer += chunk
-                        lines = buffer.split(b"\n")
-
-                        buffer = lines[-1]
-                        lines = lines[:-1]
-
-                        for line in lines:
-                            line = line.rstrip(b"\r")
-
-                            if not command_sent:
-                                command_sent = True
-                                continue
-
-                            if line.strip() == b"echo $?" or line.strip().isdigit():
-                                continue
-
-                            if line.strip():
-                                result_lines.append(line)
-
-                        if buffer.endswith(b"$ "):
-                            break
-
-                    except socket.error as e:
-                        if e.errno == socket.EWOULDBLOCK:
-                            await asyncio.sleep(0.1)
-                            continue
-                        raise
-
-                output = b"\n".join(result_lines).decode("utf-8")
-                output = re.sub(r"\n\$ echo \$\$?.*$", "", output)
-
-                return output
+            await self._send(f"{sanitized_command}\n")
+            token = await self._send_marker()
 
             if timeout:
-                result = await asyncio.wait_for(read_output(), timeout)
+                output, exit_code = await asyncio.wait_for(
+                    self._read_until_marker(token), timeout
+                )
             else:
-                result = await read_output()
+                output, exit_code = await self._read_until_marker(token)
 
-            return result.strip()
+            self.last_exit_code = exit_code
+            return output.strip()
 
         except asyncio.TimeoutError:
             raise TimeoutError(f"Command execution timed out after {timeout} seconds")
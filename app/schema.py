@@ -1,7 +1,28 @@
+import asyncio
+import base64
+import hashlib
+import itertools
+import tempfile
+from collections import deque
 from enum import Enum
-from typing import Any, List, Literal, Optional, Union
-
-from pydantic import BaseModel, Field
+from pathlib import Path
+from typing import (
+    Any,
+    Awaitable,
+    Callable,
+    Deque,
+    Dict,
+    Hashable,
+    List,
+    Literal,
+    Optional,
+    Tuple,
+    Union,
+)
+
+from pydantic import BaseModel, Field, PrivateAttr
+
+from app.logger import logger
 
 
 class Role(str, Enum):
@@ -16,6 +37,9 @@ class Role(str, Enum):
 ROLE_VALUES = tuple(role.value for role in Role)
 ROLE_TYPE = Literal[ROLE_VALUES]  # type: ignore
 
+# Marks the message that stands in for compacted conversation history
+SUMMARY_PREFIX = "Summary of the earlier conversation:\n"
+
 
 class ToolChoice(str, Enum):
     """Tool choice options"""
@@ -60,6 +84,31 @@ class Message(BaseModel):
     name: Optional[str] = Field(default=None)
     tool_call_id: Optional[str] = Field(default=None)
     base64_image: Optional[str] = Field(default=None)
+    # (width, height) of base64_image, used for accurate token accounting
+    image_dimensions: Optional[Tuple[int, int]] = Field(default=None)
+
+    # Token counts keyed by (tokenizer, formatting mode), filled lazily by the LLM
+    _token_counts: Dict[Hashable, int] = PrivateAttr(default_factory=dict)
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        """Invalidate cached token counts whenever a field is reassigned"""
+        super().__setattr__(name, value)
+        if name in type(self).model_fields:
+            self._token_counts = {}
+
+    def model_copy(self, *, update: Optional[dict] = None, deep: bool = False):
+        """Copy the message without sharing (or, on update, keeping) token counts"""
+        copied = super().model_copy(update=update, deep=deep)
+        copied._token_counts = {} if update else dict(self._token_counts)
+        return copied
+
+    def get_token_count(self, key: Hashable) -> Optional[int]:
+        """Get the cached token count for the given counting key, if any"""
+        return self._token_counts.get(key)
+
+    def set_token_count(self, key: Hashable, count: int) -> None:
+        """Cache the token count for the given counting key"""
+        self._token_counts[key] = count
 
     def __add__(self, other) -> List["Message"]:
         """支持 Message + list 或 Message + Message 的操作"""
@@ -94,14 +143,24 @@ class Message(BaseModel):
             message["tool_call_id"] = self.tool_call_id
         if self.base64_image is not None:
             message["base64_image"] = self.base64_image
+            if self.image_dimensions is not None:
+                message["image_dimensions"] = self.image_dimensions
         return message
 
     @classmethod
     def user_message(
-        cls, content: str, base64_image: Optional[str] = None
+        cls,
+        content: str,
+        base64_image: Optional[str] = None,
+        image_dimensions: Optional[Tuple[int, int]] = None,
     ) -> "Message":
         """Create a user message"""
-        return cls(role=Role.USER, content=content, base64_image=base64_image)
+        return cls(
+            role=Role.USER,
+            content=content,
+            base64_image=base64_image,
+            image_dimensions=image_dimensions,
+        )
 
     @classmethod
     def system_message(cls, content: str) -> "Message":
@@ -157,27 +216,281 @@ class Message(BaseModel):
 
 
 class Memory(BaseModel):
-    messages: List[Message] = Field(default_factory=list)
+    """Conversation memory bounded by message count, token and image budgets.
+
+    Messages live in a deque so appends and evictions from the front are O(1).
+    Over budget, the oldest turns are evicted whole: an assistant message is
+    never separated from the tool results of its tool calls, and system
+    messages are kept. Once a token counter and summarizer are bound (see
+    `bind`), older turns are summarized in a background task as memory fills
+    up, before hard eviction has to drop them.
+    """
+
+    messages: Deque[Message] = Field(default_factory=deque)
     max_messages: int = Field(default=100)
+    max_tokens: Optional[int] = Field(
+        default=None, description="Token budget for all messages (None disables it)"
+    )
+    compact_threshold: float = Field(
+        default=0.75, description="Share of max_tokens at which compaction starts"
+    )
+    keep_recent: int = Field(
+        default=6, description="Number of most recent messages never summarized"
+    )
+    max_images: int = Field(
+        default=3, description="Number of most recent images kept inline"
+    )
+    max_image_bytes: int = Field(
+        default=4 * 1024 * 1024,
+        description="Budget for inline base64 image data across all messages",
+    )
+    image_dir: Optional[Path] = Field(
+        default=None, description="Where offloaded images are stored"
+    )
+
+    # Messages still carrying an inline image, oldest first, with image digests
+    _inline_images: List[Tuple[Message, str]] = PrivateAttr(default_factory=list)
+    _inline_image_bytes: int = PrivateAttr(default=0)
+
+    # Token accounting, keyed by message identity
+    _token_counter: Optional[Callable[[Message], int]] = PrivateAttr(default=None)
+    _summarizer: Optional[Callable[[List[Message]], Awaitable[str]]] = PrivateAttr(
+        default=None
+    )
+    _token_counts: Dict[int, int] = PrivateAttr(default_factory=dict)
+    _total_tokens: int = PrivateAttr(default=0)
+    _compaction: Optional[asyncio.Task] = PrivateAttr(default=None)
+
+    def model_post_init(self, __context: Any) -> None:
+        self._reindex()
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        """Keep messages a deque and re-index them when they are replaced"""
+        if name == "messages" and not isinstance(value, deque):
+            value = deque(value)
+        super().__setattr__(name, value)
+        if name == "messages":
+            self._reindex()
+
+    def bind(
+        self,
+        token_counter: Optional[Callable[[Message], int]] = None,
+        summarizer: Optional[Callable[[List[Message]], Awaitable[str]]] = None,
+    ) -> None:
+        """Attach the token counter and summarizer used for the token budget."""
+        self._token_counter = token_counter
+        self._summarizer = summarizer
+        self._reindex()
+
+    @property
+    def total_tokens(self) -> int:
+        """Tokens of all messages, as counted by the bound token counter"""
+        return self._total_tokens
 
     def add_message(self, message: Message) -> None:
         """Add a message to memory"""
-        self.messages.append(message)
-        # Optional: Implement message limit
-        if len(self.messages) > self.max_messages:
-            self.messages = self.messages[-self.max_messages :]
+        self._append(message)
+        self._enforce_limits()
 
     def add_messages(self, messages: List[Message]) -> None:
         """Add multiple messages to memory"""
-        self.messages.extend(messages)
+        for message in messages:
+            self._append(message)
+        self._enforce_limits()
+
+    def _append(self, message: Message) -> None:
+        self.messages.append(message)
+        self._count_in(message)
+        if message.base64_image:
+            self._retain_image(message)
+
+    def _count_in(self, message: Message) -> None:
+        if self._token_counter is not None:
+            tokens = self._token_counter(message)
+            self._token_counts[id(message)] = tokens
+            self._total_tokens += tokens
+
+    def _forget(self, message: Message) -> None:
+        """Drop the accounting of a message that left memory."""
+        self._total_tokens -= self._token_counts.pop(id(message), 0)
+        if message.base64_image:
+            self._inline_images = [
+                entry for entry in self._inline_images if entry[0] is not message
+            ]
+            self._inline_image_bytes -= len(message.base64_image)
+
+    def _reindex(self) -> None:
+        """Rebuild token and image accounting from the current messages."""
+        self._token_counts = {}
+        self._total_tokens = 0
+        self._inline_images = []
+        self._inline_image_bytes = 0
+        for message in self.messages:
+            self._count_in(message)
+            if message.base64_image:
+                self._retain_image(message)
+
+    def _enforce_limits(self) -> None:
+        while len(self.messages) > self.max_messages and self._evict_oldest_turn():
+            pass
+
+        if self.max_tokens is None or self._token_counter is None:
+            return
+        if self._total_tokens > self.max_tokens * self.compact_threshold:
+            self._schedule_compaction()
+        while self._total_tokens > self.max_tokens and self._evict_oldest_turn():
+            pass
+
+    def _evict_oldest_turn(self) -> bool:
+        """
+        Evict the oldest non-system turn, keeping at least one later message.
+
+        A turn is a message with the tool results that follow it, so a tool
+        call is never separated from its results. Returns False if nothing
+        could be evicted.
+        """
+        pinned = []
+        while self.messages and self.messages[0].role == Role.SYSTEM:
+            pinned.append(self.messages.popleft())
+
+        size = 1
+        while size < len(self.messages) and self.messages[size].role == Role.TOOL:
+            size += 1
+        evicted = size < len(self.messages)
+        if evicted:
+            for _ in range(size):
+                self._forget(self.messages.popleft())
+
+        self.messages.extendleft(reversed(pinned))
+        return evicted
+
+    def _schedule_compaction(self) -> None:
+        if self._summarizer is None or (
+            self._compaction is not None and not self._compaction.done()
+        ):
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        self._compaction = loop.create_task(self.compact())
+
+    def _compactable_messages(self) -> List[Message]:
+        """Oldest non-system messages, up to a turn boundary before the tail."""
+        items = list(self.messages)
+        end = len(items) - self.keep_recent
+        while 0 < end < len(items) and items[end].role == Role.TOOL:
+            end -= 1
+        return [
+            message for message in items[: max(end, 0)] if message.role != Role.SYSTEM
+        ]
+
+    async def compact(self) -> bool:
+        """
+        Replace older turns with an LLM-written summary.
+
+        Runs in the background once memory passes `compact_threshold`; new
+        messages may be added meanwhile and are left untouched.
+
+        Returns:
+            bool: Whether a summary was inserted.
+        """
+        segment = self._compactable_messages()
+        if self._summarizer is None or len(segment) < 2:
+            return False
+        try:
+            summary = await self._summarizer(segment)
+        except Exception as e:
+            logger.warning(f"Memory compaction failed: {e}")
+            return False
+        if not summary:
+            return False
+
+        # Some of the segment may have been evicted while summarizing
+        summary_message = Message.user_message(f"{SUMMARY_PREFIX}{summary}")
+        summarized = {id(message) for message in segment}
+        compacted = []
+        placed = False
+        for message in self.messages:
+            if id(message) in summarized:
+                if not placed:
+                    compacted.append(summary_message)
+                    placed = True
+                self._forget(message)
+            else:
+                compacted.append(message)
+        if not placed:
+            pinned = 0
+            while pinned < len(compacted) and compacted[pinned].role == Role.SYSTEM:
+                pinned += 1
+            compacted.insert(pinned, summary_message)
+
+        self.messages.clear()
+        self.messages.extend(compacted)
+        self._count_in(summary_message)
+        logger.info(
+            f"Compacted {len(segment)} messages into a summary "
+            f"({self._total_tokens} tokens in memory)"
+        )
+        return True
+
+    def _retain_image(self, message: Message) -> None:
+        """Track a new inline image and offload older ones over budget."""
+        digest = hashlib.sha256(message.base64_image.encode()).hexdigest()
+
+        # An identical image is only kept inline once, on its newest message
+        for older, older_digest in list(self._inline_images):
+            if older_digest == digest:
+                self._offload_image(older, older_digest)
+
+        self._inline_images.append((message, digest))
+        self._inline_image_bytes += len(message.base64_image)
+
+        # The newest image always stays inline, even on its own over budget
+        while len(self._inline_images) > 1 and (
+            len(self._inline_images) > self.max_images
+            or self._inline_image_bytes > self.max_image_bytes
+        ):
+            self._offload_image(*self._inline_images[0])
+
+    def _offload_image(self, message: Message, digest: str) -> None:
+        """Replace a message's inline image with a reference to a file on disk."""
+        self._inline_images = [
+            entry for entry in self._inline_images if entry[0] is not message
+        ]
+        if not message.base64_image:
+            return
+        self._inline_image_bytes -= len(message.base64_image)
+
+        path = self._store_image(digest, message.base64_image)
+        placeholder = f"[Image removed from context, saved to {path}]"
+        message.content = (
+            f"{message.content}\n{placeholder}" if message.content else placeholder
+        )
+        message.base64_image = None
+        message.image_dimensions = None
+        if id(message) in self._token_counts:
+            self._total_tokens -= self._token_counts.pop(id(message))
+            self._count_in(message)
+
+    def _store_image(self, digest: str, base64_image: str) -> Path:
+        """Write an image to disk once per digest and return its path."""
+        image_dir = self.image_dir or Path(tempfile.gettempdir()) / "openmanus-images"
+        path = image_dir / f"{digest[:32]}.jpg"
+        if not path.exists():
+            image_dir.mkdir(parents=True, exist_ok=True)
+            path.write_bytes(base64.b64decode(base64_image))
+        return path
 
     def clear(self) -> None:
         """Clear all messages"""
         self.messages.clear()
+        self._reindex()
 
     def get_recent_messages(self, n: int) -> List[Message]:
         """Get n most recent messages"""
-        return self.messages[-n:]
+        start = max(len(self.messages) - n, 0)
+        return list(itertools.islice(self.messages, start, None))
 
     def to_dict_list(self) -> List[dict]:
         """Convert messages to list of dicts"""
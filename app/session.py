@@ -0,0 +1,254 @@
+"""
+Append-only session log for resuming agent and flow runs.
+
+Every agent step appends the messages added since the last step, plus the
+agent's step counter, to a JSONL file; flows append plan snapshots. Images
+are written once per content hash next to the log instead of inline.
+Loading a log replays these records to rebuild the state without calling
+the LLM again, so a crashed run can continue where it stopped.
+"""
+
+import base64
+import hashlib
+import json
+import os
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from pydantic import BaseModel, Field
+
+from app.logger import logger
+from app.schema import AgentState, Message
+
+
+SESSION_LOG_VERSION = 1
+
+
+class AgentSnapshot(BaseModel):
+    """The replayed state of one agent"""
+
+    messages: List[Message] = Field(default_factory=list)
+    current_step: int = 0
+    state: AgentState = AgentState.IDLE
+
+
+class SessionState(BaseModel):
+    """The replayed state of a session"""
+
+    agents: Dict[str, AgentSnapshot] = Field(default_factory=dict)
+    plans: Dict[str, dict] = Field(default_factory=dict)
+    active_plan_id: Optional[str] = None
+    current_step_index: Optional[int] = None
+
+
+class SessionLog:
+    """
+    An append-only JSONL log of agent and flow state.
+
+    Records are one compact JSON object per line, keyed by a type `t`:
+    - `msg`: a message appended to an agent's memory, with a sequence number
+    - `drop`: the oldest messages were evicted from an agent's memory
+    - `mem`: an agent's memory was rewritten (e.g. compacted), as sequences
+    - `agent`: an agent's step counter and state
+    - `plan`: a snapshot of a plan
+    - `flow`: flow progress (active plan and step)
+    """
+
+    def __init__(self, path: os.PathLike):
+        self.path = Path(path)
+        self.image_dir = self.path.with_name(self.path.stem + "_images")
+        self._next_seq = 0
+        # Per agent, the messages last written in memory order, with sequences
+        self._logged: Dict[str, List[Tuple[Message, int]]] = {}
+        self._file = None
+
+    @classmethod
+    def create(cls, directory: Optional[os.PathLike] = None) -> "SessionLog":
+        """Create a log with a fresh, timestamped file name."""
+        from app.config import config
+
+        directory = Path(directory or config.workspace_root / "sessions")
+        return cls(directory / f"session_{time.strftime('%Y%m%d_%H%M%S')}.jsonl")
+
+    def _write(self, records: List[dict]) -> None:
+        if not records:
+            return
+        if self._file is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            new = not self.path.exists() or self.path.stat().st_size == 0
+            self._file = open(self.path, "a", encoding="utf-8")
+            if new:
+                records = [
+                    {"t": "session", "v": SESSION_LOG_VERSION, "ts": time.time()}
+                ] + records
+        self._file.write(
+            "".join(
+                json.dumps(record, ensure_ascii=False, separators=(",", ":")) + "\n"
+                for record in records
+            )
+        )
+        # One flush per step keeps the log durable at a negligible cost
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+    def close(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def record_agent(self, key: str, agent: Any) -> None:
+        """Append what changed in an agent's memory and its step counter."""
+        previous = self._logged.get(key, [])
+        seqs = {id(message): seq for message, seq in previous}
+
+        records = []
+        current: List[Tuple[Message, int]] = []
+        for message in agent.memory.messages:
+            seq = seqs.get(id(message))
+            if seq is None:
+                seq = self._next_seq
+                self._next_seq += 1
+                records.append(
+                    {"t": "msg", "a": key, "s": seq, **self._encode(message)}
+                )
+            current.append((message, seq))
+
+        # Memory usually only grew, or lost its oldest messages to eviction
+        old_seqs = [seq for _, seq in previous]
+        new_seqs = [record["s"] for record in records]
+        current_seqs = [seq for _, seq in current]
+        expected = old_seqs + new_seqs
+        dropped = len(expected) - len(current_seqs)
+        if dropped > 0 and expected[dropped:] == current_seqs:
+            records.append({"t": "drop", "a": key, "n": dropped})
+        elif expected != current_seqs:
+            records.append({"t": "mem", "a": key, "s": current_seqs})
+
+        records.append(
+            {
+                "t": "agent",
+                "a": key,
+                "step": agent.current_step,
+                "state": agent.state.value,
+            }
+        )
+        self._write(records)
+        self._logged[key] = current
+
+    def record_plan(self, plan_id: str, plan: dict) -> None:
+        """Append a snapshot of a plan."""
+        self._write([{"t": "plan", "id": plan_id, "p": plan}])
+
+    def record_flow(
+        self, active_plan_id: Optional[str], current_step_index: Optional[int]
+    ) -> None:
+        """Append the progress of a flow."""
+        self._write([{"t": "flow", "plan": active_plan_id, "step": current_step_index}])
+
+    def _encode(self, message: Message) -> dict:
+        """Encode a message compactly, storing its image out of line."""
+        encoded: Dict[str, Any] = {"r": message.role}
+        if message.content is not None:
+            encoded["c"] = message.content
+        if message.tool_calls:
+            encoded["tc"] = [
+                [call.id, call.function.name, call.function.arguments]
+                for call in message.tool_calls
+            ]
+        if message.name is not None:
+            encoded["n"] = message.name
+        if message.tool_call_id is not None:
+            encoded["id"] = message.tool_call_id
+        if message.base64_image:
+            encoded["img"] = self._store_image(message.base64_image)
+            if message.image_dimensions:
+                encoded["dim"] = list(message.image_dimensions)
+        return encoded
+
+    def _decode(self, record: dict) -> Message:
+        message = Message(
+            role=record["r"],
+            content=record.get("c"),
+            name=record.get("n"),
+            tool_call_id=record.get("id"),
+            tool_calls=(
+                [
+                    {"id": id_, "function": {"name": name, "arguments": arguments}}
+                    for id_, name, arguments in record["tc"]
+                ]
+                if "tc" in record
+                else None
+            ),
+        )
+        if "img" in record:
+            image_path = self.image_dir / f"{record['img']}.jpg"
+            if image_path.exists():
+                message.base64_image = base64.b64encode(image_path.read_bytes()).decode(
+                    "utf-8"
+                )
+                if "dim" in record:
+                    message.image_dimensions = tuple(record["dim"])
+        return message
+
+    def _store_image(self, base64_image: str) -> str:
+        digest = hashlib.sha256(base64_image.encode()).hexdigest()[:32]
+        path = self.image_dir / f"{digest}.jpg"
+        if not path.exists():
+            self.image_dir.mkdir(parents=True, exist_ok=True)
+            path.write_bytes(base64.b64decode(base64_image))
+        return digest
+
+    def load(self) -> SessionState:
+        """
+        Replay the log into a session state.
+
+        The replayed messages are remembered as already written, so restoring
+        them into agents and continuing appends only what is new. A torn last
+        line, left by a crash in the middle of a write, is ignored.
+        """
+        state = SessionState()
+        messages: Dict[str, List[Tuple[Message, int]]] = {}
+        if not self.path.exists():
+            return state
+
+        with open(self.path, encoding="utf-8") as f:
+            lines = f.readlines()
+        for number, line in enumerate(lines, 1):
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                if number == len(lines):
+                    logger.warning(f"Ignoring incomplete last record in {self.path}")
+                    break
+                raise
+
+            kind = record.get("t")
+            if kind == "msg":
+                message = self._decode(record)
+                messages.setdefault(record["a"], []).append((message, record["s"]))
+                self._next_seq = max(self._next_seq, record["s"] + 1)
+            elif kind == "drop":
+                del messages.setdefault(record["a"], [])[: record["n"]]
+            elif kind == "mem":
+                by_seq = {
+                    seq: message for message, seq in messages.get(record["a"], [])
+                }
+                messages[record["a"]] = [
+                    (by_seq[seq], seq) for seq in record["s"] if seq in by_seq
+                ]
+            elif kind == "agent":
+                snapshot = state.agents.setdefault(record["a"], AgentSnapshot())
+                snapshot.current_step = record["step"]
+                snapshot.state = AgentState(record["state"])
+            elif kind == "plan":
+                state.plans[record["id"]] = record["p"]
+            elif kind == "flow":
+                state.active_plan_id = record["plan"]
+                state.current_step_index = record["step"]
+
+        for key, entries in messages.items():
+            snapshot = state.agents.setdefault(key, AgentSnapshot())
+            snapshot.messages = [message for message, _ in entries]
+        self._logged = {key: list(entries) for key, entries in messages.items()}
+        return state
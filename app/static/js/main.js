@@ -364,8 +364,134 @@ function handleSendMessage() {
         context: []  // We'll populate this later with proper conversation history
     };
 
-    // Send to API
-    fetch('/api/chat', {
+    // Stream the reply; fall back to the plain JSON endpoint when the
+    // server doesn't provide streaming (e.g. Flask development server)
+    streamChat(requestData)
+        .then(streamed => {
+            if (!streamed) {
+                return sendChatRequest(requestData);
+            }
+        })
+        .catch(error => {
+            console.error('Error calling chat API:', error);
+            removeThinkingIndicator();
+            addAIMessage(`I encountered an error processing your request: ${error.message}`);
+            showToast(`Error: ${error.message}`, 'error');
+            scrollConversationToBottom();
+        });
+}
+
+// Stream chat events from the server as they arrive.
+// Resolves to false if the streaming endpoint is not available.
+async function streamChat(requestData) {
+    const response = await fetch('/api/chat/stream', {
+        method: 'POST',
+        headers: {
+            'Content-Type': 'application/json'
+        },
+        body: JSON.stringify(requestData)
+    });
+
+    if (response.status === 404 || response.status === 405) {
+        return false;
+    }
+    if (!response.ok) {
+        throw new Error(`Server responded with ${response.status}: ${response.statusText}`);
+    }
+
+    const reader = response.body.getReader();
+    const decoder = new TextDecoder();
+    let buffer = '';
+
+    while (true) {
+        const { value, done } = await reader.read();
+        if (done) break;
+        buffer += decoder.decode(value, { stream: true });
+
+        // SSE frames are separated by a blank line
+        let boundary;
+        while ((boundary = buffer.indexOf('\n\n')) !== -1) {
+            const frame = buffer.slice(0, boundary);
+            buffer = buffer.slice(boundary + 2);
+            const data = frame.split('\n')
+                .filter(line => line.startsWith('data: '))
+                .map(line => line.slice(6))
+                .join('\n');
+            if (data) {
+                handleChatEvent(JSON.parse(data));
+            }
+        }
+    }
+
+    removeThinkingIndicator();
+    return true;
+}
+
+// Render a single chat stream event
+function handleChatEvent(event) {
+    switch (event.type) {
+        case 'thought':
+        case 'message':
+            removeThinkingIndicator();
+            addAIMessage(event.content);
+            if (event.type === 'thought') {
+                showThinkingIndicator();
+            }
+            break;
+        case 'token':
+            appendStreamingText(event.content);
+            break;
+        case 'reset':
+            clearStreamingText();
+            break;
+        case 'tool_call':
+            showToast(`Using tool: ${event.name}`, 'info');
+            break;
+        case 'tool_result':
+            removeThinkingIndicator();
+            addAIMessage(`Tool \`${event.name}\` result:\n${event.content || ''}`);
+            showThinkingIndicator();
+            break;
+        case 'error':
+            removeThinkingIndicator();
+            addAIMessage(`Error: ${event.error}`);
+            showToast(event.error, 'error');
+            break;
+        case 'done':
+            removeThinkingIndicator();
+            break;
+    }
+    scrollConversationToBottom();
+}
+
+// Show response text live in the thinking indicator until the message lands
+function appendStreamingText(text) {
+    let thinkingIndicator = document.querySelector('.message.thinking');
+    if (!thinkingIndicator) {
+        showThinkingIndicator();
+        thinkingIndicator = document.querySelector('.message.thinking');
+    }
+    const messageText = thinkingIndicator.querySelector('.message-text');
+    let draft = messageText.querySelector('.streaming-text');
+    if (!draft) {
+        draft = document.createElement('p');
+        draft.className = 'streaming-text';
+        messageText.replaceChildren(draft);
+    }
+    draft.textContent += text;
+}
+
+// Drop streamed text of a response that failed and is being retried
+function clearStreamingText() {
+    const draft = document.querySelector('.message.thinking .streaming-text');
+    if (draft) {
+        draft.textContent = '';
+    }
+}
+
+// Send a chat message to the non-streaming endpoint
+function sendChatRequest(requestData) {
+    return fetch('/api/chat', {
         method: 'POST',
         headers: {
             'Content-Type': 'application/json'
@@ -395,13 +521,6 @@ function handleSendMessage() {
 
             // Scroll to bottom of conversation
             scrollConversationToBottom();
-        })
-        .catch(error => {
-            console.error('Error calling chat API:', error);
-            removeThinkingIndicator();
-            addAIMessage(`I encountered an error processing your request: ${error.message}`);
-            showToast(`Error: ${error.message}`, 'error');
-            scrollConversationToBottom();
         });
 }
 
@@ -0,0 +1,111 @@
+"""
+Background sampler for the dashboard's system resource stats.
+
+A daemon thread gathers CPU, memory, disk and process metrics on a fixed
+cadence into a ring buffer, so requests are served from the latest snapshot
+instead of blocking on psutil's measurement intervals.
+"""
+
+import os
+import threading
+import time
+from collections import deque
+from typing import Deque, Dict, List, Optional
+
+import psutil
+
+
+class SystemStatsSampler:
+    """Samples system stats on a fixed interval into a bounded history"""
+
+    def __init__(self, interval: float = 2.0, history_size: int = 150):
+        self.interval = interval
+        self._samples: Deque[Dict] = deque(maxlen=history_size)
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._process = psutil.Process(os.getpid())
+        self._boot_time = psutil.boot_time()
+
+        # Prime the CPU counters: non-blocking percentages are relative to
+        # the previous call, so the first sample has a baseline
+        psutil.cpu_percent(interval=None, percpu=True)
+        self._process.cpu_percent(interval=None)
+
+    def sample(self) -> Dict:
+        """Take one snapshot without blocking and add it to the history"""
+        per_core = psutil.cpu_percent(interval=None, percpu=True)
+        memory = psutil.virtual_memory()
+        disk = psutil.disk_usage("/")
+        frequency = psutil.cpu_freq()
+        now = time.time()
+
+        snapshot = {
+            "cpu": {
+                "percent": round(sum(per_core) / len(per_core), 1) if per_core else 0.0,
+                "cores": psutil.cpu_count(logical=True),
+                "per_core": per_core,
+                "frequency": frequency.current if frequency else None,
+            },
+            "memory": {
+                "total": memory.total,
+                "available": memory.available,
+                "used": memory.used,
+                "percent": memory.percent,
+            },
+            "disk": {
+                "total": disk.total,
+                "used": disk.used,
+                "free": disk.free,
+                "percent": disk.percent,
+            },
+            "process": {
+                "memory_percent": self._process.memory_percent(),
+                "cpu_percent": self._process.cpu_percent(interval=None),
+            },
+            "system": {
+                "time": now,
+                "uptime": now - self._boot_time,
+            },
+        }
+        with self._lock:
+            self._samples.append(snapshot)
+        return snapshot
+
+    def latest(self) -> Dict:
+        """Get the most recent snapshot, sampling once if there is none yet"""
+        with self._lock:
+            if self._samples:
+                return self._samples[-1]
+        return self.sample()
+
+    def history(self, limit: Optional[int] = None) -> List[Dict]:
+        """Get up to `limit` most recent snapshots, oldest first"""
+        with self._lock:
+            samples = list(self._samples)
+        return samples[-limit:] if limit else samples
+
+    def start(self) -> None:
+        """Start the background sampling thread if it isn't running"""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._run, name="system-stats-sampler", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop the background sampling thread"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(self.interval + 1)
+            self._thread = None
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            try:
+                self.sample()
+            except Exception:
+                # Keep sampling; a failed snapshot just leaves a gap
+                continue
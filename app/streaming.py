@@ -0,0 +1,134 @@
+"""
+Sinks for the text of streamed LLM responses.
+
+Streaming requests hand each text chunk to a `StreamSink` as it arrives and
+tell it when the response is complete, instead of printing to stdout. When a
+stream fails part way, the sink is told to discard what it got, since the
+request is retried from the start; cached responses are sent in one chunk. The
+sink of a call is the one passed to it, or else the one installed for the
+running context with `stream_to`, which tasks started inside inherit. Without
+a sink chunks are only collected, so servers pay nothing for streaming. The
+CLI entry points install a `ConsoleSink`; the web app forwards chunks to the
+browser through a `QueueSink`.
+"""
+
+import asyncio
+import sys
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Iterator, Optional, TextIO
+
+from app.logger import logger
+
+
+class StreamSink:
+    """Receives the text of streamed LLM responses."""
+
+    async def on_token(self, text: str) -> None:
+        """Called with each non-empty chunk of text, in order."""
+
+    async def on_end(self, text: str) -> None:
+        """Called once a response is complete, with its full text."""
+
+    async def on_reset(self) -> None:
+        """Called when a stream failed; the text received so far is void."""
+
+
+class ConsoleSink(StreamSink):
+    """Writes responses to a terminal as they are generated."""
+
+    def __init__(self, stream: Optional[TextIO] = None):
+        self.stream = stream
+
+    async def on_token(self, text: str) -> None:
+        stream = self.stream or sys.stdout
+        stream.write(text)
+        stream.flush()
+
+    async def on_end(self, text: str) -> None:
+        stream = self.stream or sys.stdout
+        stream.write("\n")
+        stream.flush()
+
+    async def on_reset(self) -> None:
+        stream = self.stream or sys.stdout
+        stream.write("\n[stream interrupted, retrying]\n")
+        stream.flush()
+
+
+class LogSink(StreamSink):
+    """Logs each complete response, without following individual chunks."""
+
+    def __init__(self, level: str = "DEBUG"):
+        self.level = level
+
+    async def on_end(self, text: str) -> None:
+        logger.log(self.level, f"Streamed response: {text}")
+
+
+class QueueSink(StreamSink):
+    """
+    Puts stream events on a queue for a consumer such as a web response.
+
+    Each chunk becomes `make_event("token", text)`, the end of a response
+    `make_event("end", text)` and a failed stream `make_event("reset", "")`;
+    by default, `{"type": ..., "content": ...}`.
+    """
+
+    def __init__(
+        self,
+        queue: asyncio.Queue,
+        make_event: Optional[Callable[[str, str], Any]] = None,
+    ):
+        self.queue = queue
+        self.make_event = make_event or (
+            lambda kind, text: {"type": kind, "content": text}
+        )
+
+    async def on_token(self, text: str) -> None:
+        self.queue.put_nowait(self.make_event("token", text))
+
+    async def on_end(self, text: str) -> None:
+        self.queue.put_nowait(self.make_event("end", text))
+
+    async def on_reset(self) -> None:
+        self.queue.put_nowait(self.make_event("reset", ""))
+
+
+class MultiSink(StreamSink):
+    """Forwards responses to several sinks, e.g. the console and a log."""
+
+    def __init__(self, *sinks: StreamSink):
+        self.sinks = sinks
+
+    async def on_token(self, text: str) -> None:
+        for sink in self.sinks:
+            await sink.on_token(text)
+
+    async def on_end(self, text: str) -> None:
+        for sink in self.sinks:
+            await sink.on_end(text)
+
+    async def on_reset(self) -> None:
+        for sink in self.sinks:
+            await sink.on_reset()
+
+
+_current_sink: ContextVar[Optional[StreamSink]] = ContextVar(
+    "stream_sink", default=None
+)
+
+
+def get_stream_sink() -> Optional[StreamSink]:
+    """Get the sink installed for the running context, if any."""
+    return _current_sink.get()
+
+
+@contextmanager
+def stream_to(sink: Optional[StreamSink]) -> Iterator[Optional[StreamSink]]:
+    """Send streamed responses inside the block to `sink` (None: nowhere)."""
+    token = _current_sink.set(sink)
+    try:
+        yield sink
+    finally:
+        _current_sink.reset(token)
@@ -8,6 +8,9 @@ class BaseTool(ABC, BaseModel):
     name: str
     description: str
     parameters: Optional[dict] = None
+    # Whether calls may run concurrently with other parallel-safe tool calls;
+    # exclusive tools (shared sessions, browsers) always run on their own
+    parallel_safe: bool = True
 
     class Config:
         arbitrary_types_allowed = True
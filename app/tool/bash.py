@@ -128,6 +128,7 @@ class Bash(BaseTool):
         },
         "required": ["command"],
     }
+    parallel_safe: bool = False
 
     _session: Optional[_BashSession] = None
 
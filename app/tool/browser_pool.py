@@ -0,0 +1,381 @@
+"""
+Process-wide browser pool.
+
+Launching Chromium takes seconds, so browsers are kept alive for the life of
+the process and `BrowserUseTool` instances lease isolated browser contexts
+from them instead. Released contexts are reset and reused; a context is
+recycled after serving a number of pages, and a browser is retired once the
+browser processes grow past a memory limit.
+"""
+
+import asyncio
+import weakref
+from typing import List, Optional, Set
+
+import psutil
+from browser_use import Browser as BrowserUseBrowser
+from browser_use import BrowserConfig
+from browser_use.browser.context import BrowserContext, BrowserContextConfig
+
+from app.config import config
+from app.logger import logger
+
+
+def build_browser_config() -> BrowserConfig:
+    """Build the browser-use configuration from the `[browser]` settings."""
+    browser_config_kwargs = {"headless": False, "disable_security": True}
+
+    if config.browser_config:
+        from browser_use.browser.browser import ProxySettings
+
+        # handle proxy settings.
+        if config.browser_config.proxy and config.browser_config.proxy.server:
+            browser_config_kwargs["proxy"] = ProxySettings(
+                server=config.browser_config.proxy.server,
+                username=config.browser_config.proxy.username,
+                password=config.browser_config.proxy.password,
+            )
+
+        browser_attrs = [
+            "headless",
+            "disable_security",
+            "extra_chromium_args",
+            "chrome_instance_path",
+            "wss_url",
+            "cdp_url",
+        ]
+
+        for attr in browser_attrs:
+            value = getattr(config.browser_config, attr, None)
+            if value is not None:
+                if not isinstance(value, list) or value:
+                    browser_config_kwargs[attr] = value
+
+    return BrowserConfig(**browser_config_kwargs)
+
+
+def build_context_config() -> BrowserContextConfig:
+    """Build the context configuration, if one is set in the config."""
+    if (
+        config.browser_config
+        and hasattr(config.browser_config, "new_context_config")
+        and config.browser_config.new_context_config
+    ):
+        return config.browser_config.new_context_config
+    return BrowserContextConfig()
+
+
+def _browser_root_pids(browser: BrowserUseBrowser) -> List[int]:
+    """PIDs of the processes a browser-use browser started, once launched."""
+    roots = []
+    chrome = getattr(browser, "_chrome_subprocess", None)
+    if chrome is not None:
+        roots.append(chrome.pid)
+    try:
+        # Playwright does not expose its driver process publicly
+        driver = browser.playwright._impl_obj._connection._transport._proc
+        roots.append(driver.pid)
+    except AttributeError:
+        pass
+    return roots
+
+
+class _PooledBrowser:
+    """A long-lived browser and the contexts created on it."""
+
+    def __init__(self, browser: BrowserUseBrowser):
+        self.browser = browser
+        self.active = 0
+        self.idle: List["_PooledContext"] = []
+        self.retired = False
+
+
+class _PooledContext:
+    """A browser context with the number of pages it has served."""
+
+    def __init__(self, owner: _PooledBrowser, context: BrowserContext):
+        self.owner = owner
+        self.context = context
+        self.pages = 0
+
+
+class BrowserLease:
+    """A browser context leased from the pool to a single tool instance."""
+
+    def __init__(self, pool: "BrowserPool", pooled: _PooledContext):
+        self.pool = pool
+        self._pooled = pooled
+        self.released = False
+
+    @property
+    def browser(self) -> BrowserUseBrowser:
+        return self._pooled.owner.browser
+
+    @property
+    def context(self) -> BrowserContext:
+        return self._pooled.context
+
+    @property
+    def pages(self) -> int:
+        return self._pooled.pages
+
+    def record_page(self, count: int = 1) -> None:
+        """Count page loads towards the context's recycling limit."""
+        self._pooled.pages += count
+
+    async def release(self, discard: bool = False) -> None:
+        """Return the context to the pool; `discard` closes it instead."""
+        await self.pool.release(self, discard=discard)
+
+
+class BrowserPool:
+    """Leases isolated browser contexts from a few long-lived browsers.
+
+    A pool is bound to the event loop it is used on, as browsers are.
+
+    Args:
+        max_browsers: Number of browser processes to spread contexts over.
+        max_contexts: Maximum number of contexts leased at once; further
+            `acquire` calls wait for a release.
+        context_max_pages: Pages a context may serve before it is closed
+            rather than reused.
+        max_memory_mb: Total RSS of the browser processes above which
+            browsers are retired and relaunched once their leases end.
+        reuse_contexts: Whether released contexts are reset and reused.
+    """
+
+    def __init__(
+        self,
+        max_browsers: int = 1,
+        max_contexts: int = 4,
+        context_max_pages: int = 50,
+        max_memory_mb: Optional[int] = None,
+        reuse_contexts: bool = True,
+    ):
+        self.max_browsers = max(1, max_browsers)
+        self.max_contexts = max(1, max_contexts)
+        self.context_max_pages = context_max_pages
+        self.max_memory_mb = max_memory_mb
+        self.reuse_contexts = reuse_contexts
+
+        self._browsers: List[_PooledBrowser] = []
+        self._slots = asyncio.Semaphore(self.max_contexts)
+        self._lock = asyncio.Lock()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+        self.browsers_launched = 0
+        self.contexts_created = 0
+        self.contexts_reused = 0
+
+    def _new_browser(self) -> BrowserUseBrowser:
+        # Chromium itself is only launched when the first context opens a page
+        return BrowserUseBrowser(build_browser_config())
+
+    async def acquire(self) -> BrowserLease:
+        """Lease a context, waiting while `max_contexts` are in use."""
+        self._loop = asyncio.get_running_loop()
+        await self._slots.acquire()
+        try:
+            async with self._lock:
+                pooled = self._take_idle_context()
+                if pooled is None:
+                    owner = self._pick_browser()
+                    context = await owner.browser.new_context(build_context_config())
+                    pooled = _PooledContext(owner, context)
+                    self.contexts_created += 1
+                else:
+                    self.contexts_reused += 1
+                pooled.owner.active += 1
+            return BrowserLease(self, pooled)
+        except BaseException:
+            self._slots.release()
+            raise
+
+    def _take_idle_context(self) -> Optional[_PooledContext]:
+        for owner in self._browsers:
+            if not owner.retired and owner.idle:
+                return owner.idle.pop()
+        return None
+
+    def _pick_browser(self) -> _PooledBrowser:
+        live = [owner for owner in self._browsers if not owner.retired]
+        least_loaded = min(live, key=lambda owner: owner.active, default=None)
+        # Launch another browser only once the running ones have a fair share
+        share = -(-self.max_contexts // self.max_browsers)
+        if least_loaded is not None and (
+            least_loaded.active < share or len(live) >= self.max_browsers
+        ):
+            return least_loaded
+        owner = _PooledBrowser(self._new_browser())
+        self._browsers.append(owner)
+        self.browsers_launched += 1
+        return owner
+
+    async def release(self, lease: BrowserLease, discard: bool = False) -> None:
+        """Return a leased context, resetting it for reuse or closing it."""
+        if lease.released:
+            return
+        lease.released = True
+        pooled = lease._pooled
+        owner = pooled.owner
+        try:
+            # Reset outside the lock; the context is not visible to others yet
+            keep = (
+                self.reuse_contexts
+                and not discard
+                and not owner.retired
+                and pooled.pages < self.context_max_pages
+                and await self._reset_context(pooled.context)
+            )
+            async with self._lock:
+                if owner not in self._browsers:
+                    # The pool was closed while the context was leased
+                    await self._close_context(pooled.context)
+                    return
+                owner.active -= 1
+                if self._memory_exceeded():
+                    self._retire_all()
+                if keep and not owner.retired:
+                    owner.idle.append(pooled)
+                else:
+                    await self._close_context(pooled.context)
+                await self._close_retired_browsers()
+        finally:
+            self._slots.release()
+
+    def release_threadsafe(self, lease: BrowserLease) -> None:
+        """Release a lease from outside the pool's event loop."""
+        loop = self._loop
+        if lease.released or loop is None or loop.is_closed():
+            return
+        try:
+            loop.call_soon_threadsafe(
+                lambda: loop.create_task(self.release(lease, discard=True))
+            )
+        except RuntimeError:
+            pass
+
+    @staticmethod
+    async def _reset_context(context: BrowserContext) -> bool:
+        """Clear state left by the previous lease; False if it is unusable."""
+        session = context.session
+        if session is None:
+            return True
+        try:
+            pages = session.context.pages
+            for page in pages[1:]:
+                await page.close()
+            await session.context.clear_cookies()
+            if pages:
+                await pages[0].goto("about:blank")
+            session.cached_state = None
+            return True
+        except Exception as e:
+            logger.debug(f"Discarding browser context that failed to reset: {e}")
+            return False
+
+    @staticmethod
+    async def _close_context(context: BrowserContext) -> None:
+        try:
+            await context.close()
+        except Exception as e:
+            logger.debug(f"Failed to close browser context: {e}")
+
+    def _memory_exceeded(self) -> bool:
+        if not self.max_memory_mb:
+            return False
+        return self.memory_usage_mb() > self.max_memory_mb
+
+    def memory_usage_mb(self) -> float:
+        """Total RSS of the pool's browser processes and their descendants."""
+        total = 0
+        for pid in self._browser_pids():
+            try:
+                total += psutil.Process(pid).memory_info().rss
+            except psutil.Error:
+                continue
+        return total / (1024 * 1024)
+
+    def _browser_pids(self) -> Set[int]:
+        """
+        PIDs of the pool's browser process trees.
+
+        A tree is rooted at the browser's Playwright driver, which launches
+        Chromium, or at a Chrome instance browser-use started itself. Other
+        children of this process, such as Python workers or shells, are not
+        counted.
+        """
+        pids: Set[int] = set()
+        for owner in self._browsers:
+            for root in _browser_root_pids(owner.browser):
+                try:
+                    process = psutil.Process(root)
+                    pids.add(root)
+                    pids.update(child.pid for child in process.children(recursive=True))
+                except psutil.Error:
+                    continue
+        return pids
+
+    def _retire_all(self) -> None:
+        logger.info(f"Browser memory above {self.max_memory_mb}MB, recycling browsers")
+        for owner in self._browsers:
+            owner.retired = True
+
+    async def _close_retired_browsers(self) -> None:
+        for owner in [o for o in self._browsers if o.retired and o.active == 0]:
+            self._browsers.remove(owner)
+            for pooled in owner.idle:
+                await self._close_context(pooled.context)
+            owner.idle.clear()
+            try:
+                await owner.browser.close()
+            except Exception as e:
+                logger.debug(f"Failed to close browser: {e}")
+
+    async def close(self) -> None:
+        """Close every context and browser; active leases are cut off."""
+        async with self._lock:
+            for owner in self._browsers:
+                owner.retired = True
+                owner.active = 0
+            await self._close_retired_browsers()
+
+    def get_stats(self) -> dict:
+        return {
+            "browsers": len(self._browsers),
+            "active_contexts": sum(owner.active for owner in self._browsers),
+            "idle_contexts": sum(len(owner.idle) for owner in self._browsers),
+            "max_contexts": self.max_contexts,
+            "browsers_launched": self.browsers_launched,
+            "contexts_created": self.contexts_created,
+            "contexts_reused": self.contexts_reused,
+        }
+
+
+_pools: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, BrowserPool]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def get_browser_pool() -> BrowserPool:
+    """Get the browser pool of the running event loop, creating it from config."""
+    loop = asyncio.get_running_loop()
+    pool = _pools.get(loop)
+    if pool is None:
+        settings = config.browser_config
+        pool = BrowserPool(
+            max_browsers=getattr(settings, "max_browsers", 1),
+            max_contexts=getattr(settings, "max_contexts", 4),
+            context_max_pages=getattr(settings, "context_max_pages", 50),
+            max_memory_mb=getattr(settings, "max_memory_mb", None),
+            reuse_contexts=getattr(settings, "reuse_contexts", True),
+        )
+        _pools[loop] = pool
+    return pool
+
+
+async def close_browser_pool() -> None:
+    """Close the browser pool of the running event loop, if any."""
+    pool = _pools.pop(asyncio.get_running_loop(), None)
+    if pool is not None:
+        await pool.close()
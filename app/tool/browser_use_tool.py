@@ -4,15 +4,17 @@ import json
 from typing import Generic, Optional, TypeVar
 
 from browser_use import Browser as BrowserUseBrowser
-from browser_use import BrowserConfig
-from browser_use.browser.context import BrowserContext, BrowserContextConfig
+from browser_use.browser.context import BrowserContext
 from browser_use.dom.service import DomService
+from PIL import Image
 from pydantic import Field, field_validator
 from pydantic_core.core_schema import ValidationInfo
 
-from app.config import config
+from app.config import BrowserSettings, config
 from app.llm import LLM
 from app.tool.base import BaseTool, ToolResult
+from app.tool.browser_pool import BrowserLease, get_browser_pool
+from app.tool.screenshot import changed_pixels, compress_screenshot
 from app.tool.web_search import WebSearch
 
 
@@ -134,10 +136,15 @@ class BrowserUseTool(BaseTool, Generic[Context]):
         },
     }
 
+    parallel_safe: bool = False
+
     lock: asyncio.Lock = Field(default_factory=asyncio.Lock)
     browser: Optional[BrowserUseBrowser] = Field(default=None, exclude=True)
     context: Optional[BrowserContext] = Field(default=None, exclude=True)
     dom_service: Optional[DomService] = Field(default=None, exclude=True)
+    lease: Optional[BrowserLease] = Field(default=None, exclude=True)
+    # Fingerprint of the last screenshot sent to the model
+    last_screenshot: Optional[Image.Image] = Field(default=None, exclude=True)
     web_search_tool: WebSearch = Field(default_factory=WebSearch, exclude=True)
 
     # Context for generic functionality
@@ -152,51 +159,17 @@ class BrowserUseTool(BaseTool, Generic[Context]):
         return v
 
     async def _ensure_browser_initialized(self) -> BrowserContext:
-        """Ensure browser and context are initialized."""
-        if self.browser is None:
-            browser_config_kwargs = {"headless": False, "disable_security": True}
-
-            if config.browser_config:
-                from browser_use.browser.browser import ProxySettings
-
-                # handle proxy settings.
-                if config.browser_config.proxy and config.browser_config.proxy.server:
-                    browser_config_kwargs["proxy"] = ProxySettings(
-                        server=config.browser_config.proxy.server,
-                        username=config.browser_config.proxy.username,
-                        password=config.browser_config.proxy.password,
-                    )
-
-                browser_attrs = [
-                    "headless",
-                    "disable_security",
-                    "extra_chromium_args",
-                    "chrome_instance_path",
-                    "wss_url",
-                    "cdp_url",
-                ]
-
-                for attr in browser_attrs:
-                    value = getattr(config.browser_config, attr, None)
-                    if value is not None:
-                        if not isinstance(value, list) or value:
-                            browser_config_kwargs[attr] = value
-
-            self.browser = BrowserUseBrowser(BrowserConfig(**browser_config_kwargs))
-
+        """Ensure a browser context is leased from the shared browser pool."""
         if self.context is None:
-            context_config = BrowserContextConfig()
-
-            # if there is context config in the config, use it.
-            if (
-                config.browser_config
-                and hasattr(config.browser_config, "new_context_config")
-                and config.browser_config.new_context_config
-            ):
-                context_config = config.browser_config.new_context_config
-
-            self.context = await self.browser.new_context(context_config)
-            self.dom_service = DomService(await self.context.get_current_page())
+            lease = await get_browser_pool().acquire()
+            try:
+                self.dom_service = DomService(await lease.context.get_current_page())
+            except Exception:
+                await lease.release(discard=True)
+                raise
+            self.lease = lease
+            self.browser = lease.browser
+            self.context = lease.context
 
         return self.context
 
@@ -251,6 +224,7 @@ class BrowserUseTool(BaseTool, Generic[Context]):
                     page = await context.get_current_page()
                     await page.goto(url)
                     await page.wait_for_load_state()
+                    self.lease.record_page()
                     return ToolResult(output=f"Navigated to {url}")
 
                 elif action == "go_back":
@@ -283,6 +257,7 @@ class BrowserUseTool(BaseTool, Generic[Context]):
                         page = await context.get_current_page()
                         await page.goto(url_to_navigate)
                         await page.wait_for_load_state()
+                        self.lease.record_page()
 
                         return ToolResult(
                             output=f"Searched for '{query}' and navigated to first result: {url_to_navigate}\nAll results:"
@@ -512,6 +487,7 @@ Page content:
                     if not url:
                         return ToolResult(error="URL is required for 'open_tab' action")
                     await context.create_new_tab(url)
+                    self.lease.record_page()
                     return ToolResult(output=f"Opened new tab with {url}")
 
                 elif action == "close_tab":
@@ -558,11 +534,33 @@ Page content:
             await page.bring_to_front()
             await page.wait_for_load_state()
 
-            screenshot = await page.screenshot(
-                full_page=True, animations="disabled", type="jpeg", quality=100
+            settings = config.browser_config or BrowserSettings()
+            raw = await page.screenshot(
+                full_page=settings.screenshot_full_page,
+                animations="disabled",
+                type="jpeg",
+                quality=settings.screenshot_quality,
+            )
+            shot = await asyncio.to_thread(
+                compress_screenshot,
+                raw,
+                settings.screenshot_max_dimension,
+                settings.screenshot_quality,
             )
 
-            screenshot = base64.b64encode(screenshot).decode("utf-8")
+            # Skip the image when the page looks the same as the last one sent;
+            # compare against that one, so small changes cannot add up unseen
+            threshold = settings.screenshot_change_threshold
+            changed = (
+                threshold is None
+                or self.last_screenshot is None
+                or changed_pixels(shot.fingerprint, self.last_screenshot) > threshold
+            )
+            if changed:
+                self.last_screenshot = shot.fingerprint
+            screenshot = (
+                base64.b64encode(shot.data).decode("utf-8") if changed else None
+            )
 
             # Build the state info with all required fields
             state_info = {
@@ -583,6 +581,11 @@ Page content:
                     + viewport_height,
                 },
                 "viewport_height": viewport_height,
+                "screenshot": {
+                    "width": shot.width,
+                    "height": shot.height,
+                    "changed": changed,
+                },
             }
 
             return ToolResult(
@@ -593,25 +596,21 @@ Page content:
             return ToolResult(error=f"Failed to get browser state: {str(e)}")
 
     async def cleanup(self):
-        """Clean up browser resources."""
+        """Return the browser context to the shared browser pool."""
         async with self.lock:
-            if self.context is not None:
-                await self.context.close()
-                self.context = None
-                self.dom_service = None
-            if self.browser is not None:
-                await self.browser.close()
-                self.browser = None
+            lease, self.lease = self.lease, None
+            self.context = None
+            self.browser = None
+            self.dom_service = None
+            self.last_screenshot = None
+            if lease is not None:
+                await lease.release()
 
     def __del__(self):
-        """Ensure cleanup when object is destroyed."""
-        if self.browser is not None or self.context is not None:
-            try:
-                asyncio.run(self.cleanup())
-            except RuntimeError:
-                loop = asyncio.new_event_loop()
-                loop.run_until_complete(self.cleanup())
-                loop.close()
+        """Ensure the leased context is returned when object is destroyed."""
+        lease = getattr(self, "lease", None)
+        if lease is not None:
+            lease.pool.release_threadsafe(lease)
 
     @classmethod
     def create_with_context(cls, context: Context) -> "BrowserUseTool[Context]":
@@ -6,7 +6,8 @@ from typing import Optional, Protocol, Tuple, Union, runtime_checkable
 
 from app.config import SandboxSettings
 from app.exceptions import ToolError
-from app.sandbox.client import SANDBOX_CLIENT
+from app.runtime import get_runtime
+from app.sandbox.client import LocalSandboxClient
 
 
 PathLike = Union[str, Path]
@@ -96,8 +97,10 @@ class LocalFileOperator(FileOperator):
 class SandboxFileOperator(FileOperator):
     """File operations implementation for sandbox environment."""
 
-    def __init__(self):
-        self.sandbox_client = SANDBOX_CLIENT
+    @property
+    def sandbox_client(self) -> LocalSandboxClient:
+        """The sandbox of the running session."""
+        return get_runtime().sandbox
 
     async def _ensure_sandbox_initialized(self):
         """Ensure sandbox is initialized."""
@@ -1,5 +1,8 @@
 # tool/planning.py
-from typing import Dict, List, Literal, Optional
+import threading
+from typing import Dict, Iterator, List, Literal, Mapping, MutableMapping, Optional
+
+from pydantic import Field, field_validator
 
 from app.exceptions import ToolError
 from app.tool.base import BaseTool, ToolResult
@@ -11,6 +14,112 @@ The tool provides functionality for creating plans, updating plan steps, and tra
 """
 
 
+_ACTIVE_STATUSES = ("not_started", "in_progress")
+
+
+class PlanStore(MutableMapping[str, Dict]):
+    """
+    Plans by ID, each guarded by its own lock.
+
+    A plan keeps its steps, statuses and notes in parallel lists. The store
+    also indexes each plan's current step, the first one not yet completed
+    or blocked, and keeps that index up to date as steps are marked, so
+    finding it takes constant time.
+
+    Plans must be changed through the store: `mark_step` for statuses, or
+    `reindex` after editing a plan's steps under its lock.
+    """
+
+    def __init__(self, plans: Optional[Mapping[str, Dict]] = None):
+        self._plans: Dict[str, Dict] = {}
+        self._current: Dict[str, int] = {}
+        self._locks: Dict[str, threading.RLock] = {}
+        self._locks_guard = threading.Lock()
+        if plans:
+            self.update(plans)
+
+    def lock(self, plan_id: str) -> threading.RLock:
+        """Get the lock that serializes changes to a plan."""
+        with self._locks_guard:
+            return self._locks.setdefault(plan_id, threading.RLock())
+
+    def __getitem__(self, plan_id: str) -> Dict:
+        return self._plans[plan_id]
+
+    def __setitem__(self, plan_id: str, plan: Dict) -> None:
+        with self.lock(plan_id):
+            self._plans[plan_id] = plan
+            self.reindex(plan_id)
+
+    def __delitem__(self, plan_id: str) -> None:
+        with self.lock(plan_id):
+            del self._plans[plan_id]
+            self._current.pop(plan_id, None)
+        with self._locks_guard:
+            self._locks.pop(plan_id, None)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(list(self._plans))
+
+    def __len__(self) -> int:
+        return len(self._plans)
+
+    def reindex(self, plan_id: str) -> None:
+        """Align a plan's lists with its steps and find its current step."""
+        with self.lock(plan_id):
+            plan = self._plans[plan_id]
+            step_count = len(plan["steps"])
+            for key, default in (("step_statuses", "not_started"), ("step_notes", "")):
+                values = plan.setdefault(key, [])
+                del values[step_count:]
+                values.extend([default] * (step_count - len(values)))
+            self._current[plan_id] = self._next_active(plan, 0)
+
+    @staticmethod
+    def _next_active(plan: Dict, start: int) -> int:
+        statuses = plan["step_statuses"]
+        index = start
+        while index < len(statuses) and statuses[index] not in _ACTIVE_STATUSES:
+            index += 1
+        return index
+
+    def mark_step(
+        self,
+        plan_id: str,
+        step_index: int,
+        step_status: Optional[str] = None,
+        step_notes: Optional[str] = None,
+    ) -> str:
+        """Atomically set a step's status and notes; returns the old status."""
+        with self.lock(plan_id):
+            plan = self._plans[plan_id]
+            statuses = plan["step_statuses"]
+            previous = statuses[step_index]
+            if step_status:
+                statuses[step_index] = step_status
+                current = self._current[plan_id]
+                if step_status in _ACTIVE_STATUSES:
+                    self._current[plan_id] = min(current, step_index)
+                elif step_index == current:
+                    self._current[plan_id] = self._next_active(plan, current + 1)
+            if step_notes:
+                plan["step_notes"][step_index] = step_notes
+            return previous
+
+    def current_step(self, plan_id: str) -> Optional[int]:
+        """Index of the plan's first step not completed or blocked, if any."""
+        current = self._current[plan_id]
+        return current if current < len(self._plans[plan_id]["steps"]) else None
+
+    def start_current_step(self, plan_id: str) -> Optional[int]:
+        """Atomically find the current step and mark it in progress."""
+        with self.lock(plan_id):
+            step_index = self.current_step(plan_id)
+            if step_index is not None:
+                self.mark_step(plan_id, step_index, "in_progress")
+            return step_index
+
+
 class PlanningTool(BaseTool):
     """
     A planning tool that allows the agent to create and manage plans for solving complex tasks.
@@ -61,14 +170,24 @@ class PlanningTool(BaseTool):
                 "description": "Additional notes for a step. Optional for mark_step command.",
                 "type": "string",
             },
+            "step_dependencies": {
+                "description": "For each step, the indices (0-based) of the steps it depends on. Steps whose dependencies are completed can run in parallel; an empty list means the step can start right away. Optional for create and update commands; without it, steps run one after another.",
+                "type": "array",
+                "items": {"type": "array", "items": {"type": "integer"}},
+            },
         },
         "required": ["command"],
         "additionalProperties": False,
     }
 
-    plans: dict = {}  # Dictionary to store plans by plan_id
+    plans: PlanStore = Field(default_factory=PlanStore)  # Plans by plan_id
     _current_plan_id: Optional[str] = None  # Track the current active plan
 
+    @field_validator("plans", mode="before")
+    @classmethod
+    def _to_plan_store(cls, plans):
+        return plans if isinstance(plans, PlanStore) else PlanStore(plans)
+
     async def execute(
         self,
         *,
@@ -83,6 +202,7 @@ class PlanningTool(BaseTool):
             Literal["not_started", "in_progress", "completed", "blocked"]
         ] = None,
         step_notes: Optional[str] = None,
+        step_dependencies: Optional[List[List[int]]] = None,
         **kwargs,
     ):
         """
@@ -96,12 +216,13 @@ class PlanningTool(BaseTool):
         - step_index: Index of the step to update (used with mark_step command)
         - step_status: Status to set for a step (used with mark_step command)
         - step_notes: Additional notes for a step (used with mark_step command)
+        - step_dependencies: Indices of the steps each step depends on (used with create and update commands)
         """
 
         if command == "create":
-            return self._create_plan(plan_id, title, steps)
+            return self._create_plan(plan_id, title, steps, step_dependencies)
         elif command == "update":
-            return self._update_plan(plan_id, title, steps)
+            return self._update_plan(plan_id, title, steps, step_dependencies)
         elif command == "list":
             return self._list_plans()
         elif command == "get":
@@ -118,7 +239,11 @@ class PlanningTool(BaseTool):
             )
 
     def _create_plan(
-        self, plan_id: Optional[str], title: Optional[str], steps: Optional[List[str]]
+        self,
+        plan_id: Optional[str],
+        title: Optional[str],
+        steps: Optional[List[str]],
+        step_dependencies: Optional[List[List[int]]] = None,
     ) -> ToolResult:
         """Create a new plan with the given ID, title, and steps."""
         if not plan_id:
@@ -149,8 +274,18 @@ class PlanningTool(BaseTool):
             "step_statuses": ["not_started"] * len(steps),
             "step_notes": [""] * len(steps),
         }
+        if step_dependencies is not None:
+            plan["step_dependencies"] = self._validate_dependencies(
+                step_dependencies, len(steps)
+            )
 
-        self.plans[plan_id] = plan
+        with self.plans.lock(plan_id):
+            # Checked again under the lock, as another caller may have won
+            if plan_id in self.plans:
+                raise ToolError(
+                    f"A plan with ID '{plan_id}' already exists. Use 'update' to modify existing plans."
+                )
+            self.plans[plan_id] = plan
         self._current_plan_id = plan_id  # Set as active plan
 
         return ToolResult(
@@ -158,7 +293,11 @@ class PlanningTool(BaseTool):
         )
 
     def _update_plan(
-        self, plan_id: Optional[str], title: Optional[str], steps: Optional[List[str]]
+        self,
+        plan_id: Optional[str],
+        title: Optional[str],
+        steps: Optional[List[str]],
+        step_dependencies: Optional[List[List[int]]] = None,
     ) -> ToolResult:
         """Update an existing plan with new title or steps."""
         if not plan_id:
@@ -167,44 +306,130 @@ class PlanningTool(BaseTool):
         if plan_id not in self.plans:
             raise ToolError(f"No plan found with ID: {plan_id}")
 
-        plan = self.plans[plan_id]
+        if steps and (
+            not isinstance(steps, list)
+            or not all(isinstance(step, str) for step in steps)
+        ):
+            raise ToolError(
+                "Parameter `steps` must be a list of strings for command: update"
+            )
 
-        if title:
-            plan["title"] = title
+        with self.plans.lock(plan_id):
+            plan = self.plans[plan_id]
 
-        if steps:
-            if not isinstance(steps, list) or not all(
-                isinstance(step, str) for step in steps
-            ):
-                raise ToolError(
-                    "Parameter `steps` must be a list of strings for command: update"
+            # Validate before changing anything, so a failed update has no effect
+            if step_dependencies is not None:
+                step_dependencies = self._validate_dependencies(
+                    step_dependencies, len(steps or plan["steps"])
                 )
 
-            # Preserve existing step statuses for unchanged steps
-            old_steps = plan["steps"]
-            old_statuses = plan["step_statuses"]
-            old_notes = plan["step_notes"]
-
-            # Create new step statuses and notes
-            new_statuses = []
-            new_notes = []
+            if title:
+                plan["title"] = title
+
+            if steps:
+                # Preserve existing step statuses for unchanged steps
+                old_steps = plan["steps"]
+                old_statuses = plan["step_statuses"]
+                old_notes = plan["step_notes"]
+
+                # Create new step statuses and notes
+                new_statuses = []
+                new_notes = []
+
+                for i, step in enumerate(steps):
+                    # If the step exists at the same position in old steps, preserve status and notes
+                    if i < len(old_steps) and step == old_steps[i]:
+                        new_statuses.append(old_statuses[i])
+                        new_notes.append(old_notes[i])
+                    else:
+                        new_statuses.append("not_started")
+                        new_notes.append("")
+
+                plan["steps"] = steps
+                plan["step_statuses"] = new_statuses
+                plan["step_notes"] = new_notes
+
+                # Dependencies refer to step positions, so stale ones are dropped
+                if step_dependencies is None and "step_dependencies" in plan:
+                    old_dependencies = plan["step_dependencies"]
+                    plan["step_dependencies"] = [
+                        (
+                            [d for d in old_dependencies[i] if d < len(steps)]
+                            if i < len(old_steps) and step == old_steps[i]
+                            else []
+                        )
+                        for i, step in enumerate(steps)
+                    ]
+
+            if step_dependencies is not None:
+                plan["step_dependencies"] = step_dependencies
+
+            self.plans.reindex(plan_id)
+            return ToolResult(
+                output=f"Plan updated successfully: {plan_id}\n\n{self._format_plan(plan)}"
+            )
 
-            for i, step in enumerate(steps):
-                # If the step exists at the same position in old steps, preserve status and notes
-                if i < len(old_steps) and step == old_steps[i]:
-                    new_statuses.append(old_statuses[i])
-                    new_notes.append(old_notes[i])
-                else:
-                    new_statuses.append("not_started")
-                    new_notes.append("")
+    @staticmethod
+    def _validate_dependencies(
+        step_dependencies: List[List[int]], step_count: int
+    ) -> List[List[int]]:
+        """Check that dependencies reference existing steps and form no cycle."""
+        if (
+            not isinstance(step_dependencies, list)
+            or len(step_dependencies) > step_count
+        ):
+            raise ToolError(
+                "Parameter `step_dependencies` must be a list with one list of step indices per step"
+            )
 
-            plan["steps"] = steps
-            plan["step_statuses"] = new_statuses
-            plan["step_notes"] = new_notes
+        for i, deps in enumerate(step_dependencies):
+            for dep in deps or []:
+                if not isinstance(dep, int) or not 0 <= dep < step_count or dep == i:
+                    raise ToolError(
+                        f"Invalid dependency {dep} for step {i}. Dependencies must be indices of other steps."
+                    )
+        dependencies = [sorted(set(deps or [])) for deps in step_dependencies]
+        dependencies += [[] for _ in range(step_count - len(dependencies))]
+
+        # Kahn's algorithm: every step must become ready at some point
+        remaining = {i: set(deps) for i, deps in enumerate(dependencies)}
+        while remaining:
+            ready = [i for i, deps in remaining.items() if not deps]
+            if not ready:
+                raise ToolError(
+                    f"Step dependencies contain a cycle between steps: {sorted(remaining)}"
+                )
+            for i in ready:
+                del remaining[i]
+            for deps in remaining.values():
+                deps.difference_update(ready)
+
+        return dependencies
+
+    @staticmethod
+    def get_step_dependencies(plan: Dict) -> List[List[int]]:
+        """Get each step's dependencies; plans without any run sequentially."""
+        dependencies = plan.get("step_dependencies")
+        if dependencies is None:
+            return [[i - 1] if i else [] for i in range(len(plan["steps"]))]
+        return dependencies
+
+    def get_ready_steps(self, plan_id: str) -> List[int]:
+        """
+        Get the steps of a plan that can run now.
 
-        return ToolResult(
-            output=f"Plan updated successfully: {plan_id}\n\n{self._format_plan(plan)}"
-        )
+        A step is ready when it is not started (or was left in progress) and
+        all of its dependencies are completed.
+        """
+        with self.plans.lock(plan_id):
+            plan = self.plans[plan_id]
+            statuses = plan["step_statuses"]
+            return [
+                i
+                for i, deps in enumerate(self.get_step_dependencies(plan))
+                if statuses[i] in _ACTIVE_STATUSES
+                and all(statuses[dep] == "completed" for dep in deps)
+            ]
 
     def _list_plans(self) -> ToolResult:
         """List all available plans."""
@@ -238,8 +463,8 @@ class PlanningTool(BaseTool):
         if plan_id not in self.plans:
             raise ToolError(f"No plan found with ID: {plan_id}")
 
-        plan = self.plans[plan_id]
-        return ToolResult(output=self._format_plan(plan))
+        with self.plans.lock(plan_id):
+            return ToolResult(output=self._format_plan(self.plans[plan_id]))
 
     def _set_active_plan(self, plan_id: Optional[str]) -> ToolResult:
         """Set a plan as the active plan."""
@@ -293,15 +518,11 @@ class PlanningTool(BaseTool):
                 f"Invalid step_status: {step_status}. Valid statuses are: not_started, in_progress, completed, blocked"
             )
 
-        if step_status:
-            plan["step_statuses"][step_index] = step_status
-
-        if step_notes:
-            plan["step_notes"][step_index] = step_notes
-
-        return ToolResult(
-            output=f"Step {step_index} updated in plan '{plan_id}'.\n\n{self._format_plan(plan)}"
-        )
+        with self.plans.lock(plan_id):
+            self.plans.mark_step(plan_id, step_index, step_status, step_notes)
+            return ToolResult(
+                output=f"Step {step_index} updated in plan '{plan_id}'.\n\n{self._format_plan(plan)}"
+            )
 
     def _delete_plan(self, plan_id: Optional[str]) -> ToolResult:
         """Delete a plan."""
@@ -356,7 +577,11 @@ class PlanningTool(BaseTool):
                 "blocked": "[!]",
             }.get(status, "[ ]")
 
-            output += f"{i}. {status_symbol} {step}\n"
+            output += f"{i}. {status_symbol} {step}"
+            if plan.get("step_dependencies") and plan["step_dependencies"][i]:
+                after = ", ".join(str(dep) for dep in plan["step_dependencies"][i])
+                output += f" (after {after})"
+            output += "\n"
             if notes:
                 output += f"   Notes: {notes}\n"
 
@@ -1,11 +1,217 @@
+import asyncio
+import atexit
 import multiprocessing
 import sys
+import weakref
 from io import StringIO
-from typing import Dict
+from multiprocessing.connection import Connection
+from typing import Dict, List, Optional
+
+from pydantic import PrivateAttr
 
 from app.tool.base import BaseTool
 
 
+_TRUNCATED_NOTICE = "\n... [output truncated]"
+
+
+class _BoundedStringIO(StringIO):
+    """StringIO that stops storing output once a size limit is reached."""
+
+    def __init__(self, limit: int):
+        super().__init__()
+        self.limit = limit
+        self.size = 0
+        self.truncated = False
+
+    def write(self, s: str) -> int:
+        if self.size < self.limit:
+            super().write(s[: self.limit - self.size])
+        if self.size + len(s) > self.limit:
+            self.truncated = True
+        self.size += len(s)
+        return len(s)
+
+    def getvalue(self) -> str:
+        value = super().getvalue()
+        return value + _TRUNCATED_NOTICE if self.truncated else value
+
+
+def _fresh_globals() -> dict:
+    if isinstance(__builtins__, dict):
+        return {"__builtins__": __builtins__}
+    return {"__builtins__": __builtins__.__dict__.copy()}
+
+
+def _run_code(code: str, safe_globals: dict, max_output: int) -> Dict:
+    original_stdout = sys.stdout
+    output_buffer = _BoundedStringIO(max_output)
+    try:
+        sys.stdout = output_buffer
+        exec(code, safe_globals, safe_globals)
+        return {"observation": output_buffer.getvalue(), "success": True}
+    except (Exception, SystemExit) as e:
+        return {"observation": str(e), "success": False}
+    finally:
+        sys.stdout = original_stdout
+
+
+def _worker_main(conn: Connection) -> None:
+    """Worker loop: runs code snippets received over the pipe until told to stop."""
+    session_globals = _fresh_globals()
+    while True:
+        try:
+            request = conn.recv()
+        except EOFError:
+            break
+        if request is None:
+            break
+        if request["reset"]:
+            session_globals = _fresh_globals()
+        conn.send(_run_code(request["code"], session_globals, request["max_output"]))
+
+
+class PythonWorker:
+    """A long-lived interpreter process that executes code sent over a pipe."""
+
+    _all_workers: "weakref.WeakSet[PythonWorker]" = weakref.WeakSet()
+
+    def __init__(self):
+        parent_conn, child_conn = multiprocessing.Pipe()
+        self.process = multiprocessing.Process(target=_worker_main, args=(child_conn,))
+        self.process.start()
+        child_conn.close()
+        self.conn = parent_conn
+        self.executions = 0
+        PythonWorker._all_workers.add(self)
+
+    @property
+    def alive(self) -> bool:
+        return self.process.is_alive()
+
+    async def run(self, code: str, timeout: int, reset: bool, max_output: int) -> Dict:
+        """
+        Run code in the worker.
+
+        Raises:
+            asyncio.TimeoutError: If no result arrives within the timeout.
+            EOFError: If the worker died while running the code.
+        """
+        self.executions += 1
+        self.conn.send({"code": code, "reset": reset, "max_output": max_output})
+        await asyncio.wait_for(self._wait_readable(), timeout)
+        return self.conn.recv()
+
+    async def _wait_readable(self) -> None:
+        """Wait until the result pipe is readable without blocking the loop."""
+        loop = asyncio.get_running_loop()
+        try:
+            future = loop.create_future()
+            fd = self.conn.fileno()
+            loop.add_reader(fd, lambda: future.done() or future.set_result(None))
+        except NotImplementedError:
+            # Event loops without reader support (e.g. Windows proactor)
+            while not await loop.run_in_executor(None, self.conn.poll, 0.1):
+                pass
+            return
+        try:
+            await future
+        finally:
+            loop.remove_reader(fd)
+
+    def kill(self) -> None:
+        """Stop the worker immediately."""
+        if self.process.is_alive():
+            self.process.kill()
+        self.process.join(1)
+        self.conn.close()
+
+    def close(self) -> None:
+        """Ask the worker to exit, killing it if it doesn't."""
+        try:
+            self.conn.send(None)
+        except (OSError, ValueError):
+            pass
+        self.process.join(1)
+        self.kill()
+
+    @classmethod
+    def kill_all(cls) -> None:
+        for worker in list(cls._all_workers):
+            worker.kill()
+
+
+atexit.register(PythonWorker.kill_all)
+
+
+class PythonWorkerPool:
+    """
+    Pool of pre-started interpreter workers shared by PythonExecute tools.
+
+    Workers are recycled after `max_executions` runs and replaced when killed
+    on timeout, so a fresh worker is always ready for the next snippet.
+    """
+
+    def __init__(self, size: int = 2, max_executions: int = 50):
+        self.size = size
+        self.max_executions = max_executions
+        self._idle: List[PythonWorker] = []
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def _get_semaphore(self) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._semaphore = asyncio.Semaphore(self.size)
+            self._loop = loop
+        return self._semaphore
+
+    def start(self) -> None:
+        """Pre-start workers until the pool is full."""
+        self._idle = [worker for worker in self._idle if worker.alive]
+        while len(self._idle) < self.size:
+            self._idle.append(PythonWorker())
+
+    async def run(self, code: str, timeout: int, max_output: int) -> Dict:
+        """Run code on a pooled worker with fresh globals."""
+        async with self._get_semaphore():
+            if not self._idle:
+                self.start()
+            worker = self._idle.pop()
+            finished = False
+            try:
+                result = await worker.run(code, timeout, True, max_output)
+                finished = True
+                return result
+            finally:
+                if not finished:
+                    # Timed out or died mid-run: the worker state is unknown
+                    worker.kill()
+                    self._idle.append(PythonWorker())
+                elif worker.executions >= self.max_executions:
+                    worker.close()
+                    self._idle.append(PythonWorker())
+                else:
+                    self._idle.append(worker)
+
+    def shutdown(self) -> None:
+        """Stop all idle workers."""
+        for worker in self._idle:
+            worker.close()
+        self._idle.clear()
+
+
+_default_pool: Optional[PythonWorkerPool] = None
+
+
+def get_worker_pool() -> PythonWorkerPool:
+    """Get the process-wide Python worker pool."""
+    global _default_pool
+    if _default_pool is None:
+        _default_pool = PythonWorkerPool()
+    return _default_pool
+
+
 class PythonExecute(BaseTool):
     """A tool for executing Python code with timeout and safety restrictions."""
 
@@ -22,19 +228,13 @@ class PythonExecute(BaseTool):
         "required": ["code"],
     }
 
-    def _run_code(self, code: str, result_dict: dict, safe_globals: dict) -> None:
-        original_stdout = sys.stdout
-        try:
-            output_buffer = StringIO()
-            sys.stdout = output_buffer
-            exec(code, safe_globals, safe_globals)
-            result_dict["observation"] = output_buffer.getvalue()
-            result_dict["success"] = True
-        except Exception as e:
-            result_dict["observation"] = str(e)
-            result_dict["success"] = False
-        finally:
-            sys.stdout = original_stdout
+    # Keep globals (imports, variables) between calls on a dedicated worker
+    session_mode: bool = False
+    max_output: int = 100000
+
+    _session_worker: Optional[PythonWorker] = None
+    # The session worker runs one job at a time over its pipe
+    _session_lock: asyncio.Lock = PrivateAttr(default_factory=asyncio.Lock)
 
     async def execute(
         self,
@@ -51,25 +251,37 @@ class PythonExecute(BaseTool):
         Returns:
             Dict: Contains 'output' with execution output or error message and 'success' status.
         """
+        try:
+            if self.session_mode:
+                return await self._run_in_session(code, timeout)
+            return await get_worker_pool().run(code, timeout, self.max_output)
+        except asyncio.TimeoutError:
+            return {
+                "observation": f"Execution timeout after {timeout} seconds",
+                "success": False,
+            }
+        except (EOFError, OSError) as e:
+            return {
+                "observation": f"Python worker exited unexpectedly: {e}",
+                "success": False,
+            }
+
+    async def _run_in_session(self, code: str, timeout: int) -> Dict:
+        async with self._session_lock:
+            if self._session_worker is None or not self._session_worker.alive:
+                self._session_worker = PythonWorker()
+            try:
+                return await self._session_worker.run(
+                    code, timeout, False, self.max_output
+                )
+            except (asyncio.TimeoutError, EOFError, OSError):
+                # The session state is lost; the next call starts a new session
+                self._session_worker.kill()
+                self._session_worker = None
+                raise
 
-        with multiprocessing.Manager() as manager:
-            result = manager.dict({"observation": "", "success": False})
-            if isinstance(__builtins__, dict):
-                safe_globals = {"__builtins__": __builtins__}
-            else:
-                safe_globals = {"__builtins__": __builtins__.__dict__.copy()}
-            proc = multiprocessing.Process(
-                target=self._run_code, args=(code, result, safe_globals)
-            )
-            proc.start()
-            proc.join(timeout)
-
-            # timeout process
-            if proc.is_alive():
-                proc.terminate()
-                proc.join(1)
-                return {
-                    "observation": f"Execution timeout after {timeout} seconds",
-                    "success": False,
-                }
-            return dict(result)
+    async def cleanup(self) -> None:
+        """Stop the session worker, if any."""
+        if self._session_worker is not None:
+            self._session_worker.close()
+            self._session_worker = None
@@ -0,0 +1,78 @@
+"""
+Screenshot post-processing for browser state capture.
+
+Screenshots are downscaled and re-encoded before they are sent to the model,
+and fingerprinted with a small grayscale thumbnail, so an unchanged page can
+be skipped while small changes such as typed text still count.
+"""
+
+import io
+from typing import NamedTuple
+
+from PIL import Image, ImageChops
+
+
+# Longest side of the thumbnail screenshots are compared by
+FINGERPRINT_SIZE = 320
+# Gray level difference of a thumbnail pixel that counts as a change; JPEG
+# re-encoding noise averages out well below it
+PIXEL_TOLERANCE = 24
+
+
+class Screenshot(NamedTuple):
+    """A processed screenshot with its size and fingerprint."""
+
+    data: bytes
+    width: int
+    height: int
+    fingerprint: Image.Image
+
+
+def fingerprint(image: Image.Image) -> Image.Image:
+    """
+    Reduce an image to a grayscale thumbnail for change detection.
+
+    Each thumbnail pixel averages a few pixels of the page, so a typed
+    character, a toggled checkbox or a one-line message still shifts it
+    clearly, while compression noise does not.
+    """
+    thumbnail = image.convert("L")
+    thumbnail.thumbnail((FINGERPRINT_SIZE, FINGERPRINT_SIZE), Image.Resampling.BOX)
+    return thumbnail
+
+
+def changed_pixels(a: Image.Image, b: Image.Image) -> int:
+    """Number of differing pixels between two fingerprints."""
+    if a.size != b.size:
+        return a.width * a.height
+    difference = ImageChops.difference(a, b)
+    return sum(difference.histogram()[PIXEL_TOLERANCE + 1 :])
+
+
+def compress_screenshot(
+    data: bytes, max_dimension: int = 1280, quality: int = 75
+) -> Screenshot:
+    """
+    Downscale a screenshot to fit `max_dimension` and re-encode it as JPEG.
+
+    Args:
+        data: The encoded screenshot as returned by the browser.
+        max_dimension: Maximum width and height in pixels; 0 keeps the size.
+        quality: JPEG quality (1-100) of the re-encoded image.
+
+    Returns:
+        Screenshot: The JPEG bytes, final dimensions and fingerprint.
+    """
+    with Image.open(io.BytesIO(data)) as image:
+        image = image.convert("RGB")
+        if max_dimension and max(image.size) > max_dimension:
+            image.thumbnail((max_dimension, max_dimension), Image.Resampling.LANCZOS)
+
+        buffer = io.BytesIO()
+        image.save(buffer, format="JPEG", quality=quality, optimize=True)
+        return Screenshot(
+            data=buffer.getvalue(),
+            width=image.width,
+            height=image.height,
+            fingerprint=fingerprint(image),
+        )
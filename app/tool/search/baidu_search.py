@@ -1,9 +1,94 @@
-from baidusearch.baidusearch import search
+import math
+from typing import List
+
+from baidusearch.baidusearch import ABSTRACT_MAX_LENGTH, HEADERS, search
+from bs4 import BeautifulSoup
 
 from app.tool.search.base import WebSearchEngine
+from app.tool.search.http_client import fetch_pages, get_http_client
+
+
+BAIDU_HOST_URL = "https://www.baidu.com"
+BAIDU_PAGE_SIZE = 10
 
 
 class BaiduSearchEngine(WebSearchEngine):
+    host_url: str = BAIDU_HOST_URL
+
     def perform_search(self, query, num_results=10, *args, **kwargs):
         """Baidu search engine."""
         return search(query, num_results=num_results)
+
+    async def perform_search_async(self, query, num_results=10, *args, **kwargs):
+        """Baidu search engine over the shared async HTTP connection pool."""
+        if not query:
+            return []
+
+        pages = max(1, math.ceil(num_results / BAIDU_PAGE_SIZE))
+        htmls = await fetch_pages(
+            "Baidu",
+            [self._fetch_page(query, page * BAIDU_PAGE_SIZE) for page in range(pages)],
+        )
+
+        results: List[dict] = []
+        for html in htmls:
+            if html is None:
+                continue
+            data, has_next = self._parse_results(html, rank_start=len(results))
+            results.extend(data)
+            if not has_next:
+                break
+        return results[:num_results]
+
+    async def _fetch_page(self, query: str, offset: int) -> str:
+        """Fetch one results page over the shared connection pool."""
+        response = await get_http_client().get(
+            self.host_url + "/s",
+            params={"ie": "utf-8", "tn": "baidu", "wd": query, "pn": offset},
+            headers=HEADERS,
+        )
+        response.raise_for_status()
+        return response.text
+
+    @staticmethod
+    def _parse_results(html: str, rank_start: int = 0) -> tuple:
+        """
+        Extract results from a Baidu results page in the `baidusearch` format.
+
+        Args:
+            html (str): The HTML of a Baidu search results page.
+            rank_start (int, optional): The starting rank for numbering the search results. Defaults to 0.
+        Returns:
+            tuple: A tuple containing:
+                - list: A list of dictionaries with keys 'title', 'abstract', 'url', and 'rank' for each result.
+                - bool: Whether there is a next results page.
+        """
+        root = BeautifulSoup(html, "lxml")
+        content = root.find("div", id="content_left")
+        if content is None:
+            return [], False
+
+        list_data = []
+        for div in content.find_all("div", class_="c-container", recursive=False):
+            link = div.h3.a if div.h3 and div.h3.a else div.a
+            if link is None or not link.get("href"):
+                continue
+            title = (div.h3 or link).text.strip()
+            abstract_div = div.find("div", class_="c-abstract") or div.div
+            abstract = abstract_div.text.strip() if abstract_div else ""
+            if ABSTRACT_MAX_LENGTH and len(abstract) > ABSTRACT_MAX_LENGTH:
+                abstract = abstract[:ABSTRACT_MAX_LENGTH]
+
+            rank_start += 1
+            list_data.append(
+                {
+                    "title": title,
+                    "abstract": abstract,
+                    "url": link["href"].strip(),
+                    "rank": rank_start,
+                }
+            )
+
+        next_btn = root.find_all("a", class_="n")
+        has_next = bool(next_btn) and "上一页" not in next_btn[-1].text
+        return list_data, has_next
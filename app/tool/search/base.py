@@ -1,3 +1,7 @@
+import asyncio
+import inspect
+
+
 class WebSearchEngine(object):
     def perform_search(
         self, query: str, num_results: int = 10, *args, **kwargs
@@ -15,3 +19,29 @@ class WebSearchEngine(object):
             List: A list of dict matching the search query.
         """
         raise NotImplementedError
+
+    async def perform_search_async(
+        self, query: str, num_results: int = 10, *args, **kwargs
+    ) -> list:
+        """
+        Perform a web search without blocking the event loop.
+
+        Engines with a native async HTTP implementation override this; the
+        default runs the blocking `perform_search` in the default executor.
+
+        Args:
+            query (str): The search query to submit to the search engine.
+            num_results (int, optional): The number of search results to return. Default is 10.
+            args: Additional arguments.
+            kwargs: Additional keyword arguments.
+
+        Returns:
+            List: The search results.
+        """
+        loop = asyncio.get_running_loop()
+        results = await loop.run_in_executor(
+            None, lambda: self.perform_search(query, num_results, *args, **kwargs)
+        )
+        if inspect.isawaitable(results):
+            results = await results
+        return list(results or [])
@@ -1,10 +1,13 @@
-from typing import List
+import math
+from typing import List, Union
 
 import requests
 from bs4 import BeautifulSoup
+from lxml import etree
 
 from app.logger import logger
 from app.tool.search.base import WebSearchEngine
+from app.tool.search.http_client import fetch_pages, get_http_client
 
 
 ABSTRACT_MAX_LENGTH = 300
@@ -33,10 +36,14 @@ HEADERS = {
 
 BING_HOST_URL = "https://www.bing.com"
 BING_SEARCH_URL = "https://www.bing.com/search?q="
+BING_PAGE_SIZE = 10
+# Bytes fed to the streaming parser at a time
+PARSE_CHUNK_SIZE = 64 * 1024
 
 
 class BingSearchEngine(WebSearchEngine):
     session: requests.Session = None
+    host_url: str = BING_HOST_URL
 
     def __init__(self, **data):
         """Initialize the BingSearch tool with a requests session."""
@@ -94,53 +101,203 @@ class BingSearchEngine(WebSearchEngine):
         """
         try:
             res = self.session.get(url=url)
-            res.encoding = "utf-8"
-            root = BeautifulSoup(res.text, "lxml")
+            return self._parse_results(res.content, rank_start)
+        except Exception as e:
+            logger.warning(f"Error parsing HTML: {e}")
+            return [], None
+
+    def _parse_results(self, html: Union[str, bytes], rank_start: int = 0) -> tuple:
+        """
+        Extract search results and the next page URL from a Bing results page.
+
+        Uses the streaming parser, falling back to BeautifulSoup if it fails.
+
+        Args:
+            html (str | bytes): The raw HTML of a Bing search results page.
+            rank_start (int, optional): The starting rank for numbering the search results. Defaults to 0.
+        Returns:
+            tuple: A tuple containing:
+                - list: A list of dictionaries with keys 'title', 'abstract', 'url', and 'rank' for each result.
+                - str or None: The URL of the next results page, or None if there is no next page.
+        """
+        try:
+            return self._parse_results_fast(html, rank_start)
+        except Exception as e:
+            logger.debug(f"Fast Bing parsing failed, using BeautifulSoup: {e}")
+            return self._parse_results_soup(html, rank_start)
+
+    def _parse_results_fast(
+        self, html: Union[str, bytes], rank_start: int = 0
+    ) -> tuple:
+        """
+        Streaming extraction of Bing results with lxml's pull parser.
+
+        Only `li` and `a` end events are handled. lxml still builds a tree
+        as it parses, but each result item is cleared once it has been read,
+        so the tree stays small, and no BeautifulSoup objects are built.
+        """
+        parser = etree.HTMLPullParser(events=("end",), tag=("li", "a"))
+        list_data = []
+        next_url = None
+        in_results = False
 
-            list_data = []
-            ol_results = root.find("ol", id="b_results")
-            if not ol_results:
-                return [], None
+        for offset in range(0, len(html), PARSE_CHUNK_SIZE):
+            parser.feed(html[offset : offset + PARSE_CHUNK_SIZE])
+            for _, element in parser.read_events():
+                if element.tag == "a":
+                    if (
+                        next_url is None
+                        and element.get("title") == "Next page"
+                        and element.get("href")
+                    ):
+                        next_url = self.host_url + element.get("href")
+                    continue
+
+                if "b_algo" not in (element.get("class") or "").split():
+                    continue
+                if not any(
+                    ol.get("id") == "b_results" for ol in element.iterancestors("ol")
+                ):
+                    continue
+                in_results = True
 
-            for li in ol_results.find_all("li", class_="b_algo"):
                 title = ""
                 url = ""
-                abstract = ""
-                try:
-                    h2 = li.find("h2")
-                    if h2:
-                        title = h2.text.strip()
-                        url = h2.a["href"].strip()
-
-                    p = li.find("p")
-                    if p:
-                        abstract = p.text.strip()
-
-                    if ABSTRACT_MAX_LENGTH and len(abstract) > ABSTRACT_MAX_LENGTH:
-                        abstract = abstract[:ABSTRACT_MAX_LENGTH]
-
-                    rank_start += 1
-                    list_data.append(
-                        {
-                            "title": title,
-                            "abstract": abstract,
-                            "url": url,
-                            "rank": rank_start,
-                        }
-                    )
-                except Exception:
-                    continue
+                h2 = element.find(".//h2")
+                if h2 is not None:
+                    link = h2.find(".//a")
+                    if link is None or link.get("href") is None:
+                        element.clear(keep_tail=True)
+                        continue
+                    title = "".join(h2.itertext()).strip()
+                    url = link.get("href").strip()
 
-            next_btn = root.find("a", title="Next page")
-            if not next_btn:
-                return list_data, None
+                p = element.find(".//p")
+                abstract = "".join(p.itertext()).strip() if p is not None else ""
+                if ABSTRACT_MAX_LENGTH and len(abstract) > ABSTRACT_MAX_LENGTH:
+                    abstract = abstract[:ABSTRACT_MAX_LENGTH]
 
-            next_url = BING_HOST_URL + next_btn["href"]
-            return list_data, next_url
-        except Exception as e:
-            logger.warning(f"Error parsing HTML: {e}")
+                rank_start += 1
+                list_data.append(
+                    {
+                        "title": title,
+                        "abstract": abstract,
+                        "url": url,
+                        "rank": rank_start,
+                    }
+                )
+                element.clear(keep_tail=True)
+        root = parser.close()
+
+        if not in_results and root.find(".//ol[@id='b_results']") is None:
             return [], None
+        return list_data, next_url
+
+    def _parse_results_soup(
+        self, html: Union[str, bytes], rank_start: int = 0
+    ) -> tuple:
+        """Extract Bing results by building a full BeautifulSoup tree."""
+        root = BeautifulSoup(html, "lxml")
+
+        list_data = []
+        ol_results = root.find("ol", id="b_results")
+        if not ol_results:
+            return [], None
+
+        for li in ol_results.find_all("li", class_="b_algo"):
+            title = ""
+            url = ""
+            abstract = ""
+            try:
+                h2 = li.find("h2")
+                if h2:
+                    title = h2.text.strip()
+                    url = h2.a["href"].strip()
+
+                p = li.find("p")
+                if p:
+                    abstract = p.text.strip()
+
+                if ABSTRACT_MAX_LENGTH and len(abstract) > ABSTRACT_MAX_LENGTH:
+                    abstract = abstract[:ABSTRACT_MAX_LENGTH]
+
+                rank_start += 1
+                list_data.append(
+                    {
+                        "title": title,
+                        "abstract": abstract,
+                        "url": url,
+                        "rank": rank_start,
+                    }
+                )
+            except Exception:
+                continue
+
+        next_btn = root.find("a", title="Next page")
+        if not next_btn:
+            return list_data, None
+
+        next_url = self.host_url + next_btn["href"]
+        return list_data, next_url
+
+    async def _fetch_page(self, query: str, first: int) -> bytes:
+        """Fetch one results page over the shared connection pool."""
+        response = await get_http_client().get(
+            self.host_url + "/search",
+            params={"q": query, "first": first},
+            headers=HEADERS,
+        )
+        response.raise_for_status()
+        return response.content
+
+    async def _search_async(self, query: str, num_results: int = 10) -> List[str]:
+        """
+        Asynchronous Bing search that fetches all needed result pages concurrently.
+
+        Pages are requested by offset up front instead of following "Next page"
+        links one at a time; results past the last real page are de-duplicated.
+
+        Args:
+            query (str): The search query to submit to Bing. Must not be empty.
+            num_results (int, optional): The maximum number of URLs to return. Defaults to 10.
+
+        Returns:
+            List[str]: A list of URLs from the search results, capped at `num_results`.
+
+        Raises:
+            httpx.HTTPError: If every result page failed to load.
+        """
+        if not query:
+            return []
+
+        pages = max(1, math.ceil(num_results / BING_PAGE_SIZE))
+        htmls = await fetch_pages(
+            "Bing",
+            [
+                self._fetch_page(query, first=1 + page * BING_PAGE_SIZE)
+                for page in range(pages)
+            ],
+        )
+
+        list_result: List[str] = []
+        seen = set()
+        for html in htmls:
+            if html is None:
+                continue
+            data, next_url = self._parse_results(html, rank_start=len(list_result))
+            for item in data:
+                if item["url"] and item["url"] not in seen:
+                    seen.add(item["url"])
+                    list_result.append(item["url"])
+            if not next_url:
+                break
+
+        return list_result[:num_results]
 
     def perform_search(self, query, num_results=10, *args, **kwargs):
         """Bing search engine."""
         return self._search_sync(query, num_results=num_results)
+
+    async def perform_search_async(self, query, num_results=10, *args, **kwargs):
+        """Bing search engine over the shared async HTTP connection pool."""
+        return await self._search_async(query, num_results=num_results)
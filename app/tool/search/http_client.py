@@ -0,0 +1,64 @@
+import asyncio
+import weakref
+from typing import Awaitable, List, Optional, TypeVar
+
+import httpx
+
+from app.logger import logger
+
+
+T = TypeVar("T")
+
+
+# Keep-alive pool shared by all search engines; sized for a few concurrent
+# searches each fetching several result pages
+HTTP_LIMITS = httpx.Limits(
+    max_connections=50, max_keepalive_connections=20, keepalive_expiry=30
+)
+HTTP_TIMEOUT = httpx.Timeout(10.0, connect=5.0)
+
+_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, httpx.AsyncClient]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """
+    Get the shared async HTTP client for the running event loop.
+
+    Connections are pooled and kept alive across searches; a client is bound
+    to the loop it was created on, so each loop gets its own.
+    """
+    loop = asyncio.get_running_loop()
+    client = _clients.get(loop)
+    if client is None or client.is_closed:
+        client = httpx.AsyncClient(
+            limits=HTTP_LIMITS, timeout=HTTP_TIMEOUT, follow_redirects=True
+        )
+        _clients[loop] = client
+    return client
+
+
+async def close_http_client() -> None:
+    """Close the shared HTTP client of the running event loop, if any."""
+    client = _clients.pop(asyncio.get_running_loop(), None)
+    if client is not None:
+        await client.aclose()
+
+
+async def fetch_pages(engine: str, fetches: List[Awaitable[T]]) -> List[Optional[T]]:
+    """
+    Fetch result pages concurrently, tolerating only partial failure.
+
+    A page that fails comes back as None. When every page fails, the first
+    error is raised, so an outage is reported as a failure rather than as a
+    search without results.
+    """
+    pages = await asyncio.gather(*fetches, return_exceptions=True)
+    errors = [page for page in pages if isinstance(page, BaseException)]
+    if errors and len(errors) == len(pages):
+        raise errors[0]
+    for number, page in enumerate(pages, 1):
+        if isinstance(page, BaseException):
+            logger.warning(f"Error fetching {engine} results page {number}: {page}")
+    return [None if isinstance(page, BaseException) else page for page in pages]
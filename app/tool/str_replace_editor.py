@@ -1,11 +1,11 @@
 """File and directory manipulation tool with sandbox support."""
 
-from collections import defaultdict
 from pathlib import Path
 from typing import Any, DefaultDict, List, Literal, Optional, get_args
 
 from app.config import config
 from app.exceptions import ToolError
+from app.runtime import get_runtime
 from app.tool import BaseTool
 from app.tool.base import CLIResult, ToolResult
 from app.tool.file_operators import (
@@ -98,10 +98,16 @@ class StrReplaceEditor(BaseTool):
         },
         "required": ["command", "path"],
     }
-    _file_history: DefaultDict[PathLike, List[str]] = defaultdict(list)
+    # Edits read, modify and write whole files, so they must not interleave
+    parallel_safe: bool = False
     _local_operator: LocalFileOperator = LocalFileOperator()
     _sandbox_operator: SandboxFileOperator = SandboxFileOperator()
 
+    @property
+    def file_history(self) -> DefaultDict[PathLike, List[str]]:
+        """Undo history of the running session, by file path."""
+        return get_runtime().file_history
+
     # def _get_operator(self, use_sandbox: bool) -> FileOperator:
     def _get_operator(self) -> FileOperator:
         """Get the appropriate file operator based on execution mode."""
@@ -137,7 +143,7 @@ class StrReplaceEditor(BaseTool):
             if file_text is None:
                 raise ToolError("Parameter `file_text` is required for command: create")
             await operator.write_file(path, file_text)
-            self._file_history[path].append(file_text)
+            self.file_history[path].append(file_text)
             result = ToolResult(output=f"File created successfully at: {path}")
         elif command == "str_replace":
             if old_str is None:
@@ -320,7 +326,7 @@ class StrReplaceEditor(BaseTool):
         await operator.write_file(path, new_file_content)
 
         # Save the original content to history
-        self._file_history[path].append(file_content)
+        self.file_history[path].append(file_content)
 
         # Create a snippet of the edited section
         replacement_line = file_content.split(old_str)[0].count("\n")
@@ -378,7 +384,7 @@ class StrReplaceEditor(BaseTool):
         snippet = "\n".join(snippet_lines)
 
         await operator.write_file(path, new_file_text)
-        self._file_history[path].append(file_text)
+        self.file_history[path].append(file_text)
 
         # Prepare success message
         success_msg = f"The file {path} has been edited. "
@@ -395,10 +401,10 @@ class StrReplaceEditor(BaseTool):
         self, path: PathLike, operator: FileOperator = None
     ) -> CLIResult:
         """Revert the last edit made to a file."""
-        if not self._file_history[path]:
+        if not self.file_history[path]:
             raise ToolError(f"No edit history found for {path}.")
 
-        old_text = self._file_history[path].pop()
+        old_text = self.file_history[path].pop()
         await operator.write_file(path, old_text)
 
         return CLIResult(
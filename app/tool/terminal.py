@@ -25,6 +25,7 @@ Note: You MUST append a `sleep 0.05` to the end of the command for commands that
         },
         "required": ["command"],
     }
+    parallel_safe: bool = False
     process: Optional[asyncio.subprocess.Process] = None
     current_path: str = os.getcwd()
     lock: asyncio.Lock = asyncio.Lock()
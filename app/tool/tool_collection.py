@@ -1,5 +1,5 @@
 """Collection classes for managing multiple tools."""
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Tuple
 
 from app.exceptions import ToolError
 from app.tool.base import BaseTool, ToolFailure, ToolResult
@@ -14,6 +14,8 @@ class ToolCollection:
     def __init__(self, *tools: BaseTool):
         self.tools = tools
         self.tool_map = {tool.name: tool for tool in tools}
+        # Schema token counts keyed by (tool name, tokenizer name)
+        self._param_tokens: Dict[Tuple[str, str], Tuple[BaseTool, int]] = {}
 
     def __iter__(self):
         return iter(self.tools)
@@ -21,6 +23,24 @@ class ToolCollection:
     def to_params(self) -> List[Dict[str, Any]]:
         return [tool.to_param() for tool in self.tools]
 
+    def count_param_tokens(self, token_counter) -> int:
+        """Count the tokens of all tool schemas, tokenizing each tool only once.
+
+        Args:
+            token_counter: The LLM's TokenCounter used to tokenize the schemas.
+        """
+        tokenizer_name = token_counter.tokenizer.name
+        total = 0
+        for tool in self.tools:
+            key = (tool.name, tokenizer_name)
+            cached = self._param_tokens.get(key)
+            # Tools may be replaced under the same name (e.g. MCP reconnects)
+            if cached is None or cached[0] is not tool:
+                cached = (tool, token_counter.count_text(str(tool.to_param())))
+                self._param_tokens[key] = cached
+            total += cached[1]
+        return total
+
     async def execute(
         self, *, name: str, tool_input: Dict[str, Any] = None
     ) -> ToolResult:
@@ -1,5 +1,14 @@
 import asyncio
-from typing import List
+import json
+import math
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, ClassVar, Dict, List, Optional, Tuple, Union
 
 from tenacity import retry, stop_after_attempt, wait_exponential
 
@@ -15,6 +24,210 @@ from app.tool.search import (
 )
 
 
+class EngineStats:
+    """Exponentially weighted latency and success rate of a search engine."""
+
+    # Seconds a failed search costs in retries and falling back to another engine
+    FAILURE_PENALTY = 10.0
+
+    def __init__(self, alpha: float = 0.3):
+        self.alpha = alpha
+        self.latency: Optional[float] = None
+        self.success_rate = 1.0
+        self.searches = 0
+        self.errors = 0
+
+    def record(self, latency: float, success: bool) -> None:
+        self.searches += 1
+        self.errors += 0 if success else 1
+        if self.latency is None:
+            self.latency = latency
+        else:
+            self.latency += self.alpha * (latency - self.latency)
+        self.success_rate += self.alpha * (float(success) - self.success_rate)
+
+    @property
+    def expected_cost(self) -> float:
+        """Latency plus a penalty per expected failure; unmeasured engines rank last."""
+        if self.latency is None:
+            return math.inf
+        return self.latency + (1 - self.success_rate) * self.FAILURE_PENALTY
+
+
+class SearchCache:
+    """Two-tier cache of search results keyed on engine, normalized query and size.
+
+    Lookups hit an in-memory LRU first, then an optional SQLite file shared
+    across runs. Failed searches are cached briefly as negative entries so
+    an engine that just failed for a query is skipped instead of retried.
+    """
+
+    _PUNCTUATION = re.compile(r"[^\w\s]+")
+
+    def __init__(
+        self,
+        ttl: int = 3600,
+        negative_ttl: int = 60,
+        max_entries: int = 1000,
+        path: Optional[Union[str, Path]] = None,
+    ):
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        # key -> (expires_at, results); results of None marks a failed search
+        self._entries: "OrderedDict[str, Tuple[float, Optional[List[Any]]]]" = (
+            OrderedDict()
+        )
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        if path is not None:
+            path = Path(path)
+            path.parent.mkdir(parents=True, exist_ok=True)
+            self._conn = sqlite3.connect(str(path), check_same_thread=False)
+            with self._lock, self._conn:
+                self._conn.execute("PRAGMA journal_mode=WAL")
+                self._conn.execute(
+                    "CREATE TABLE IF NOT EXISTS searches ("
+                    "key TEXT PRIMARY KEY, results TEXT, expires_at REAL NOT NULL)"
+                )
+
+    @classmethod
+    def normalize_query(cls, query: str) -> str:
+        """Fold case, punctuation and whitespace so trivial variants share a key"""
+        query = unicodedata.normalize("NFKC", query).casefold()
+        return " ".join(cls._PUNCTUATION.sub(" ", query).split())
+
+    @classmethod
+    def make_key(cls, engine: str, query: str, num_results: int) -> str:
+        return f"{engine.lower()}:{num_results}:{cls.normalize_query(query)}"
+
+    def _lookup(self, key: str) -> Optional[Tuple[float, Optional[List[Any]]]]:
+        """Find a live entry in memory, falling back to (and promoting from) SQLite"""
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry[0] > now:
+                    self._entries.move_to_end(key)
+                    return entry
+                del self._entries[key]
+            if self._conn is None:
+                return None
+            row = self._conn.execute(
+                "SELECT results, expires_at FROM searches WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None or row[1] <= now:
+                return None
+            entry = (row[1], json.loads(row[0]) if row[0] is not None else None)
+            self._store_memory(key, entry)
+            return entry
+
+    def _store_memory(self, key: str, entry: Tuple[float, Optional[List[Any]]]):
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def _store(self, key: str, results: Optional[List[Any]], ttl: int) -> None:
+        entry = (time.time() + ttl, results)
+        with self._lock:
+            self._store_memory(key, entry)
+            if self._conn is None:
+                return
+            with self._conn:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO searches VALUES (?, ?, ?)",
+                    (
+                        key,
+                        json.dumps(results, default=str)
+                        if results is not None
+                        else None,
+                        entry[0],
+                    ),
+                )
+                self._conn.execute(
+                    "DELETE FROM searches WHERE expires_at <= ?", (time.time(),)
+                )
+                self._conn.execute(
+                    "DELETE FROM searches WHERE key IN ("
+                    "SELECT key FROM searches ORDER BY expires_at DESC "
+                    "LIMIT -1 OFFSET ?)",
+                    (self.max_entries,),
+                )
+
+    def get(self, engine: str, query: str, num_results: int) -> Optional[List[Any]]:
+        """Get cached results, or None on a miss or a negative entry"""
+        cached = self.get_first([engine], query, num_results)
+        return cached[1] if cached is not None else None
+
+    def get_first(
+        self, engines: List[str], query: str, num_results: int
+    ) -> Optional[Tuple[str, List[Any]]]:
+        """Get (engine, results) of the first engine with cached results.
+
+        The lookup counts as one hit or miss, however many engines it checks.
+        """
+        for engine in engines:
+            entry = self._lookup(self.make_key(engine, query, num_results))
+            if entry is not None and entry[1] is not None:
+                self.hits += 1
+                return engine, entry[1]
+        self.misses += 1
+        return None
+
+    def is_failing(self, engine: str, query: str, num_results: int) -> bool:
+        """Whether the engine recently failed for this query"""
+        entry = self._lookup(self.make_key(engine, query, num_results))
+        return entry is not None and entry[1] is None
+
+    def set(
+        self, engine: str, query: str, num_results: int, results: List[Any]
+    ) -> None:
+        """Cache results, or a negative entry when there are none"""
+        key = self.make_key(engine, query, num_results)
+        if results:
+            self._store(key, list(results), self.ttl)
+        else:
+            self._store(key, None, self.negative_ttl)
+
+    def set_failed(self, engine: str, query: str, num_results: int) -> None:
+        """Cache a negative entry for an engine that failed"""
+        self._store(self.make_key(engine, query, num_results), None, self.negative_ttl)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get cache statistics"""
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self),
+            "persistent": self._conn is not None,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+
+    def clear(self) -> None:
+        """Remove all entries from both tiers and reset counters"""
+        self.hits = 0
+        self.misses = 0
+        with self._lock:
+            self._entries.clear()
+            if self._conn is not None:
+                with self._conn:
+                    self._conn.execute("DELETE FROM searches")
+
+    def close(self) -> None:
+        """Close the SQLite tier, if any"""
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
 class WebSearch(BaseTool):
     name: str = "web_search"
     description: str = """Perform a web search and return a list of relevant links.
@@ -41,6 +254,10 @@ class WebSearch(BaseTool):
         "duckduckgo": DuckDuckGoSearchEngine(),
         "bing": BingSearchEngine(),
     }
+    # Shared by all instances so every agent benefits from what others observed
+    engine_stats: ClassVar[Dict[str, EngineStats]] = {}
+    # Created from the search config on first use; False when caching is disabled
+    search_cache: ClassVar[Union[SearchCache, bool, None]] = None
 
     async def execute(self, query: str, num_results: int = 10) -> List[str]:
         """
@@ -63,11 +280,22 @@ class WebSearch(BaseTool):
             retry_delay = getattr(config.search_config, "retry_delay", 60)
             max_retries = getattr(config.search_config, "max_retries", 3)
 
+        cache = self._get_search_cache()
+        if cache is not None:
+            cached = cache.get_first(self._get_engine_order(), query, num_results)
+            if cached is not None:
+                engine_name, links = cached
+                logger.info(f"🔎 Using cached {engine_name.capitalize()} results")
+                return links
+
         # Try searching with retries when all engines fail
         for retry_count in range(
             max_retries + 1
         ):  # +1 because first try is not a retry
-            links = await self._try_all_engines(query, num_results)
+            if config.search_config and config.search_config.hedged:
+                links = await self._hedged_search(query, num_results)
+            else:
+                links = await self._try_all_engines(query, num_results)
             if links:
                 return links
 
@@ -95,16 +323,22 @@ class WebSearch(BaseTool):
         Returns:
             List[str]: A list of URLs matching the search query, or empty list if all engines fail.
         """
-        engine_order = self._get_engine_order()
+        engine_order = self._get_available_engines(query, num_results)
         failed_engines = []
 
         for engine_name in engine_order:
             engine = self._search_engine[engine_name]
             try:
                 logger.info(f"🔎 Attempting search with {engine_name.capitalize()}...")
-                links = await self._perform_search_with_engine(
-                    engine, query, num_results
-                )
+                start = time.monotonic()
+                try:
+                    links = await self._perform_search_with_engine(
+                        engine, query, num_results
+                    )
+                except Exception:
+                    self._record_search(engine_name, query, num_results, start, None)
+                    raise
+                self._record_search(engine_name, query, num_results, start, links)
                 if links:
                     if failed_engines:
                         logger.info(
@@ -158,8 +392,151 @@ class WebSearch(BaseTool):
             if fallback in self._search_engine and fallback not in engine_order:
                 engine_order.append(fallback)
 
+        if config.search_config is None or config.search_config.adaptive_order:
+            # Stable sort: engines without measurements keep the configured order
+            engine_order.sort(
+                key=lambda name: self._get_engine_stats(name).expected_cost
+            )
+
         return engine_order
 
+    async def _hedged_search(self, query: str, num_results: int) -> List[str]:
+        """
+        Race engines: start the first engine, then start the next one whenever
+        the hedge delay passes or a running engine fails or returns nothing.
+        The first non-empty result wins and the remaining searches are cancelled.
+
+        Args:
+            query (str): The search query to submit to the search engine.
+            num_results (int): The number of search results to return.
+
+        Returns:
+            List[str]: A list of URLs matching the search query, or empty list if all engines fail.
+        """
+        engine_order = self._get_available_engines(query, num_results)
+        hedge_delay = config.search_config.hedge_delay if config.search_config else 2.0
+        running: Dict[asyncio.Task, str] = {}
+        failed_engines = []
+
+        def launch_next() -> None:
+            engine_name = engine_order[len(running) + len(failed_engines)]
+            logger.info(f"🔎 Attempting search with {engine_name.capitalize()}...")
+            task = asyncio.create_task(
+                self._timed_search(engine_name, query, num_results)
+            )
+            running[task] = engine_name
+
+        def has_more() -> bool:
+            return len(running) + len(failed_engines) < len(engine_order)
+
+        if not engine_order:
+            return []
+        launch_next()
+        try:
+            while running:
+                done, _ = await asyncio.wait(
+                    running,
+                    timeout=hedge_delay if has_more() else None,
+                    return_when=asyncio.FIRST_COMPLETED,
+                )
+                if not done:
+                    # Hedge delay passed without a result: add the next engine
+                    launch_next()
+                    continue
+                for task in done:
+                    engine_name = running.pop(task)
+                    if task.exception() is None and task.result():
+                        if failed_engines:
+                            logger.info(
+                                f"Search successful with {engine_name.capitalize()} after trying: {', '.join(failed_engines)}"
+                            )
+                        return task.result()
+                    failed_engines.append(engine_name.capitalize())
+                    if task.exception() is not None:
+                        logger.warning(
+                            f"⚠️ {engine_name.capitalize()} search failed with error: {task.exception()}"
+                        )
+                    if has_more():
+                        launch_next()
+        finally:
+            for task in running:
+                task.cancel()
+
+        logger.error(f"All search engines failed: {', '.join(failed_engines)}")
+        return []
+
+    async def _timed_search(
+        self, engine_name: str, query: str, num_results: int
+    ) -> List[str]:
+        """Run a single search attempt and record its latency and outcome."""
+        start = time.monotonic()
+        try:
+            links = await self._search_with_engine(
+                self._search_engine[engine_name], query, num_results
+            )
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            self._record_search(engine_name, query, num_results, start, None)
+            raise
+        self._record_search(engine_name, query, num_results, start, links)
+        return links
+
+    @classmethod
+    def _get_engine_stats(cls, engine_name: str) -> EngineStats:
+        if engine_name not in cls.engine_stats:
+            cls.engine_stats[engine_name] = EngineStats()
+        return cls.engine_stats[engine_name]
+
+    def _record_search(
+        self,
+        engine_name: str,
+        query: str,
+        num_results: int,
+        start: float,
+        links: Optional[List[str]],
+    ) -> None:
+        """Record an engine's latency and outcome, and cache its results."""
+        self._get_engine_stats(engine_name).record(
+            time.monotonic() - start, bool(links)
+        )
+        cache = self._get_search_cache()
+        if cache is not None:
+            cache.set(engine_name, query, num_results, links or [])
+
+    def _get_available_engines(self, query: str, num_results: int) -> List[str]:
+        """
+        Engine order without engines that just failed for this query.
+
+        When every engine failed recently, all of them are tried again, so a
+        retry after waiting out an outage is not a no-op.
+        """
+        engine_order = self._get_engine_order()
+        cache = self._get_search_cache()
+        if cache is None:
+            return engine_order
+        available = [
+            engine_name
+            for engine_name in engine_order
+            if not cache.is_failing(engine_name, query, num_results)
+        ]
+        return available or engine_order
+
+    @classmethod
+    def _get_search_cache(cls) -> Optional[SearchCache]:
+        if cls.search_cache is None:
+            settings = config.search_config
+            if settings is None or not settings.cache_enabled:
+                cls.search_cache = False
+            else:
+                cls.search_cache = SearchCache(
+                    ttl=settings.cache_ttl if settings else 3600,
+                    negative_ttl=settings.negative_cache_ttl if settings else 60,
+                    max_entries=settings.cache_max_entries if settings else 1000,
+                    path=settings.cache_path if settings else None,
+                )
+        return cls.search_cache if cls.search_cache is not False else None
+
     @retry(
         stop=stop_after_attempt(3),
         wait=wait_exponential(multiplier=1, min=1, max=10),
@@ -170,7 +547,13 @@ class WebSearch(BaseTool):
         query: str,
         num_results: int,
     ) -> List[str]:
-        loop = asyncio.get_event_loop()
-        return await loop.run_in_executor(
-            None, lambda: list(engine.perform_search(query, num_results=num_results))
-        )
+        return await self._search_with_engine(engine, query, num_results)
+
+    async def _search_with_engine(
+        self,
+        engine: WebSearchEngine,
+        query: str,
+        num_results: int,
+    ) -> List[str]:
+        # Engines with native async HTTP don't occupy a default-executor thread
+        return await engine.perform_search_async(query, num_results=num_results)
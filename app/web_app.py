@@ -1,8 +1,7 @@
-from flask import Flask, render_template, request, jsonify
+from flask import Flask, g, render_template, request, jsonify
 import os
 import asyncio
-from concurrent.futures import ThreadPoolExecutor
-import psutil
+import threading
 import json
 import tomli_w
 from pathlib import Path
@@ -11,6 +10,10 @@ import gc
 from werkzeug.utils import secure_filename
 import logging
 import importlib.util
+from typing import AsyncIterator, List, Optional
+
+from app.admission import AdmissionController, AdmissionRejected
+from app.stats_sampler import SystemStatsSampler
 
 # Try to import logger
 try:
@@ -27,8 +30,10 @@ app = Flask(__name__)
 app.config["SECRET_KEY"] = os.environ.get("SECRET_KEY") or "dev-key-for-openmanus"
 app.config["MAX_CONTENT_LENGTH"] = 10 * 1024 * 1024  # Limit uploads to 10MB
 
-# Thread pool for running async code
-executor = ThreadPoolExecutor(max_workers=4)
+# Shared event loop that runs agent and LLM coroutines for every request.
+# The ASGI server registers its own loop; otherwise a background thread is used.
+_event_loop: Optional[asyncio.AbstractEventLoop] = None
+_event_loop_lock = threading.Lock()
 
 # Load config
 try:
@@ -95,6 +100,14 @@ def get_config_value(section, key, default=None):
 try:
     memory_limit = int(get_config_value("system", "max_tokens_limit", 8192))
     max_concurrent = int(get_config_value("system", "max_concurrent_requests", 2))
+    max_queued = int(get_config_value("system", "max_queued_requests", 16))
+    queue_timeout = float(get_config_value("system", "queue_timeout", 30.0))
+    # Streaming chats wait on the LLM and hold no worker thread, so many more
+    # of them can be open at once than blocking requests
+    max_concurrent_streams = int(
+        get_config_value("system", "max_concurrent_streams", 64)
+    )
+    max_queued_streams = int(get_config_value("system", "max_queued_streams", 64))
     lightweight_mode = get_config_value("system", "lightweight_mode", False)
 
     logger.info(
@@ -105,10 +118,32 @@ except Exception as e:
     print(f"Error configuring memory management: {e}")
     memory_limit = 8192
     max_concurrent = 2
+    max_queued = 16
+    queue_timeout = 30.0
+    max_concurrent_streams = 64
+    max_queued_streams = 64
     lightweight_mode = False
 
 last_gc_time = time.time()
-active_requests = 0
+
+# Heavy routes (by endpoint) go through a bounded FIFO admission queue per
+# route class; all other routes, including static files, bypass it
+ROUTE_CLASSES = {
+    "chat": "chat",
+    "upload_file": "upload",
+}
+admission = AdmissionController()
+for route_class in set(ROUTE_CLASSES.values()):
+    admission.add_queue(route_class, max_concurrent, max_queued, queue_timeout)
+# The streaming chat endpoint (app/web_server.py) has its own, larger limit
+admission.add_queue(
+    "chat_stream", max_concurrent_streams, max_queued_streams, queue_timeout
+)
+
+# System stats are sampled in the background and served from memory
+stats_sampler = SystemStatsSampler(
+    interval=float(get_config_value("system", "stats_interval", 2.0))
+)
 
 
 # Helper function to check if a module can be imported
@@ -121,31 +156,43 @@ def is_module_available(module_name):
         return False
 
 
+def admission_rejected_response(error: AdmissionRejected):
+    """Build the JSON body, status and headers for a rejected request"""
+    if error.reason == "queue_full":
+        message, status = "Too many concurrent requests, please try again later", 429
+    else:
+        message, status = "Request timed out waiting in queue, please try again", 503
+    return {"error": message}, status, {"Retry-After": "1"}
+
+
 # Set up request limiter
 @app.before_request
 def before_request():
-    global active_requests, last_gc_time
+    global last_gc_time
 
     # Check if we need to run garbage collection (every 60 seconds)
     if time.time() - last_gc_time > 60:
         gc.collect()
         last_gc_time = time.time()
 
-    # Limit concurrent requests
-    if active_requests >= max_concurrent and request.endpoint != "static":
-        return (
-            jsonify({"error": "Too many concurrent requests, please try again later"}),
-            429,
-        )
-
-    active_requests += 1
+    # Queue heavy routes for admission
+    queue = admission.get_queue(ROUTE_CLASSES.get(request.endpoint, ""))
+    if queue is None:
+        return None
+    try:
+        queue.acquire()
+    except AdmissionRejected as e:
+        body, status, headers = admission_rejected_response(e)
+        return jsonify(body), status, headers
+    g.admission_queue = queue
 
 
-@app.after_request
-def after_request(response):
-    global active_requests
-    active_requests -= 1
-    return response
+@app.teardown_request
+def teardown_request(error=None):
+    # Runs even when the handler raises, so slots are always given back
+    queue = g.pop("admission_queue", None)
+    if queue is not None:
+        queue.release()
 
 
 # Initialize LLM lazily
@@ -166,6 +213,31 @@ def init_llm():
     return llm
 
 
+def set_event_loop(loop: asyncio.AbstractEventLoop) -> None:
+    """Register the event loop that runs agent and LLM coroutines (ASGI server loop)"""
+    global _event_loop
+    with _event_loop_lock:
+        _event_loop = loop
+
+
+def get_event_loop() -> asyncio.AbstractEventLoop:
+    """Get the shared event loop, starting a background loop thread if needed"""
+    global _event_loop
+    with _event_loop_lock:
+        if _event_loop is None or _event_loop.is_closed():
+            loop = asyncio.new_event_loop()
+            threading.Thread(
+                target=loop.run_forever, name="web-event-loop", daemon=True
+            ).start()
+            _event_loop = loop
+        return _event_loop
+
+
+def run_async(coro, timeout: Optional[float] = None):
+    """Run a coroutine on the shared event loop from a request thread"""
+    return asyncio.run_coroutine_threadsafe(coro, get_event_loop()).result(timeout)
+
+
 # Routes
 @app.route("/")
 def index():
@@ -186,12 +258,17 @@ def chat():
         user_message = data["message"]
         logger.info(f"Received chat message: {user_message[:50]}...")
 
-        # In a real implementation, process with the AI backend
-        # For now, return a placeholder response
-        response = "I've received your message. The OpenManus AI backend would process this in a real implementation."
+        # Run on the shared event loop; streaming clients use /api/chat/stream
+        response = run_async(
+            generate_response(
+                user_message, data.get("model", "default"), data.get("context")
+            )
+        )
 
         # Return the response
-        return jsonify({"response": response, "timestamp": time.time()})
+        return jsonify(
+            {"status": "success", "response": response, "timestamp": time.time()}
+        )
     except Exception as e:
         logger.error(f"Error processing chat message: {e}")
         return jsonify({"error": str(e)}), 500
@@ -568,54 +645,20 @@ def manage_config():
 
 @app.route("/api/system/stats", methods=["GET"])
 def system_stats():
-    """API endpoint for system resource usage statistics"""
+    """
+    API endpoint for system resource usage statistics.
+
+    Serves the latest snapshot from the background sampler. Pass
+    `?history=N` to also get the last N snapshots.
+    """
     try:
-        # Get CPU info
-        cpu_percent = psutil.cpu_percent(interval=0.5)
-        cpu_count = psutil.cpu_count(logical=True)
-
-        # Get per-core CPU usage
-        per_core = psutil.cpu_percent(interval=0.1, percpu=True)
-
-        # Get memory info
-        memory = psutil.virtual_memory()
-
-        # Get disk info
-        disk = psutil.disk_usage("/")
-
-        stats = {
-            "cpu": {
-                "percent": cpu_percent,
-                "cores": cpu_count,
-                "per_core": per_core,
-                "frequency": psutil.cpu_freq().current if psutil.cpu_freq() else None,
-            },
-            "memory": {
-                "total": memory.total,
-                "available": memory.available,
-                "used": memory.used,
-                "percent": memory.percent,
-            },
-            "disk": {
-                "total": disk.total,
-                "used": disk.used,
-                "free": disk.free,
-                "percent": disk.percent,
-            },
-            "process": {
-                "memory_percent": psutil.Process(os.getpid()).memory_percent(),
-                "cpu_percent": psutil.Process(os.getpid()).cpu_percent(interval=0.1),
-            },
-            "system": {
-                "lightweight_mode": lightweight_mode,
-                "time": time.time(),
-                "uptime": (
-                    time.time() - psutil.boot_time()
-                    if hasattr(psutil, "boot_time")
-                    else 0
-                ),
-            },
-        }
+        stats_sampler.start()
+        stats = dict(stats_sampler.latest())
+        stats["system"] = {**stats["system"], "lightweight_mode": lightweight_mode}
+
+        history = request.args.get("history", type=int)
+        if history:
+            stats["history"] = stats_sampler.history(history)
 
         return jsonify(stats)
     except Exception as e:
@@ -623,6 +666,12 @@ def system_stats():
         return jsonify({"error": str(e)}), 500
 
 
+@app.route("/api/system/admission", methods=["GET"])
+def system_admission():
+    """API endpoint for admission queue depth and wait times per route class"""
+    return jsonify(admission.get_stats())
+
+
 @app.route("/api/system/dependencies", methods=["GET"])
 def system_dependencies():
     """API endpoint for checking system dependencies"""
@@ -763,6 +812,123 @@ async def generate_response(message, model_id="default", context=None):
         return f"I encountered an error while processing your request: {str(e)}"
 
 
+def format_sse(event: dict) -> str:
+    """Format a chat event as a Server-Sent Events frame"""
+    return f"event: {event['type']}\ndata: {json.dumps(event)}\n\n"
+
+
+def message_events(message) -> List[dict]:
+    """Convert an agent memory message into chat stream events"""
+    events = []
+    if message.role == "assistant":
+        if message.content:
+            events.append(
+                {
+                    "type": "thought" if message.tool_calls else "message",
+                    "content": message.content,
+                }
+            )
+        for tool_call in message.tool_calls or []:
+            events.append(
+                {
+                    "type": "tool_call",
+                    "id": tool_call.id,
+                    "name": tool_call.function.name,
+                    "arguments": tool_call.function.arguments,
+                }
+            )
+    elif message.role == "tool":
+        events.append(
+            {
+                "type": "tool_result",
+                "id": message.tool_call_id,
+                "name": message.name,
+                "content": message.content,
+                "has_image": message.base64_image is not None,
+            }
+        )
+    return events
+
+
+def _event_memory(queue: asyncio.Queue):
+    """Create an agent Memory that also publishes every added message to a queue"""
+    from app.schema import Memory
+
+    class EventMemory(Memory):
+        def add_message(self, message) -> None:
+            super().add_message(message)
+            queue.put_nowait(message)
+
+        def add_messages(self, messages) -> None:
+            super().add_messages(messages)
+            for message in messages:
+                queue.put_nowait(message)
+
+    return EventMemory()
+
+
+async def stream_chat_events(
+    message, model_id="default", context=None, mode="agent"
+) -> AsyncIterator[dict]:
+    """
+    Run a chat turn and yield its events as they happen.
+
+    In "agent" mode a Manus agent handles the message and every thought, tool
+    call and tool result is yielded as soon as it lands in the agent's memory,
+    preceded by "token" events carrying the response text while it streams
+    ("reset" discards that text when a failed stream is retried).
+    In "chat" mode (or when AI features are unavailable) a single LLM answer
+    is yielded. The stream always ends with a "done" or "error" event.
+    """
+    if mode != "agent" or lightweight_mode or init_llm() is None:
+        response = await generate_response(message, model_id, context)
+        yield {"type": "message", "content": response}
+        yield {"type": "done", "result": response, "timestamp": time.time()}
+        return
+
+    from app.agent.manus import Manus
+    from app.runtime import session_runtime
+    from app.streaming import QueueSink, stream_to
+
+    queue: asyncio.Queue = asyncio.Queue()
+    agent = Manus(memory=_event_memory(queue))
+
+    async def run_agent() -> str:
+        try:
+            # Each chat gets its own sandbox, edit history and token counters,
+            # and its response text is forwarded to the browser as it streams
+            async with session_runtime():
+                with stream_to(QueueSink(queue)):
+                    return await agent.run(message)
+        finally:
+            queue.put_nowait(None)
+
+    task = asyncio.create_task(run_agent())
+    try:
+        while (item := await queue.get()) is not None:
+            if isinstance(item, dict):
+                # The complete text arrives with the message itself
+                if item["type"] in ("token", "reset"):
+                    yield item
+                continue
+            for event in message_events(item):
+                yield event
+        result = await task
+        yield {"type": "done", "result": result, "timestamp": time.time()}
+    except Exception as e:
+        logger.error(f"Error running agent for chat stream: {e}")
+        yield {"type": "error", "error": str(e)}
+    finally:
+        # Runs on client disconnect as well: stop the agent and release its tools
+        task.cancel()
+        for tool in agent.available_tools:
+            if hasattr(tool, "cleanup"):
+                try:
+                    await tool.cleanup()
+                except Exception as e:
+                    logger.warning(f"Error cleaning up tool {tool.name}: {e}")
+
+
 # Run the app
 if __name__ == "__main__":
     port = int(config.get("web", {}).get("port", 5000))
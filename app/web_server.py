@@ -0,0 +1,85 @@
+"""
+ASGI entry point for the OpenManus Web UI Dashboard.
+
+The streaming chat endpoint is served natively on the event loop, so an open
+chat holds no worker thread; every other route is handled by the Flask app.
+"""
+
+import asyncio
+import weakref
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI, Request
+from fastapi.middleware.wsgi import WSGIMiddleware
+from fastapi.responses import JSONResponse, StreamingResponse
+
+from app import web_app
+from app.admission import AdmissionRejected
+from app.llm import close_response_caches
+from app.llm_client import close_llm_clients
+from app.tool.browser_pool import close_browser_pool
+
+
+@asynccontextmanager
+async def lifespan(_app: FastAPI):
+    # Flask routes submit their coroutines to the server loop as well
+    web_app.set_event_loop(asyncio.get_running_loop())
+    yield
+    await close_browser_pool()
+    await close_llm_clients()
+    close_response_caches()
+
+
+asgi_app = FastAPI(title="OpenManus Web UI", lifespan=lifespan)
+
+
+@asgi_app.post("/api/chat/stream")
+async def chat_stream(request: Request):
+    """Stream chat events for a message as Server-Sent Events"""
+    try:
+        data = await request.json()
+    except ValueError:
+        data = None
+    if not isinstance(data, dict) or "message" not in data:
+        return JSONResponse({"error": "Invalid request: missing message"}, 400)
+
+    web_app.logger.info(f"Received streaming chat message: {data['message'][:50]}...")
+
+    queue = web_app.admission.get_queue("chat_stream")
+    try:
+        await queue.acquire_async()
+    except AdmissionRejected as e:
+        body, status, headers = web_app.admission_rejected_response(e)
+        return JSONResponse(body, status, headers)
+
+    released = False
+
+    def release():
+        nonlocal released
+        if not released:
+            released = True
+            queue.release()
+
+    async def events():
+        try:
+            async for event in web_app.stream_chat_events(
+                data["message"],
+                data.get("model", "default"),
+                data.get("context"),
+                data.get("mode", "agent"),
+            ):
+                yield web_app.format_sse(event)
+        finally:
+            release()
+
+    body = events()
+    # Also release if the client disconnects before the stream is started
+    weakref.finalize(body, release)
+    return StreamingResponse(
+        body,
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+asgi_app.mount("/", WSGIMiddleware(web_app.app))
@@ -2,6 +2,7 @@ import asyncio
 
 from app.agent.manus import Manus
 from app.logger import logger
+from app.streaming import ConsoleSink, stream_to
 
 
 async def main():
@@ -13,7 +14,8 @@ async def main():
             return
 
         logger.warning("Processing your request...")
-        await agent.run(prompt)
+        with stream_to(ConsoleSink()):
+            await agent.run(prompt)
         logger.info("Request processing completed.")
     except KeyboardInterrupt:
         logger.warning("Operation interrupted.")
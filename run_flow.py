@@ -1,3 +1,4 @@
+import argparse
 import asyncio
 import time
 
@@ -5,32 +6,69 @@ from app.agent.manus import Manus
 from app.flow.base import FlowType
 from app.flow.flow_factory import FlowFactory
 from app.logger import logger
+from app.session import SessionLog
+from app.streaming import ConsoleSink, stream_to
+
+
+def parse_args() -> argparse.Namespace:
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(description="Run the planning flow")
+    parser.add_argument(
+        "--resume",
+        metavar="SESSION",
+        help="Resume an interrupted run from its session log",
+    )
+    parser.add_argument(
+        "--session",
+        metavar="SESSION",
+        help="Session log to write (default: a new file in workspace/sessions)",
+    )
+    parser.add_argument(
+        "--parallel",
+        type=int,
+        default=1,
+        metavar="N",
+        help="Run up to N independent plan steps at once, each with its own agent",
+    )
+    return parser.parse_args()
 
 
 async def run_flow():
+    args = parse_args()
     agents = {
         "manus": Manus(),
     }
+    for i in range(1, args.parallel):
+        agents[f"manus_{i}"] = Manus()
 
     try:
-        prompt = input("Enter your prompt: ")
+        if args.resume:
+            session = SessionLog(args.resume)
+            prompt = None
+        else:
+            prompt = input("Enter your prompt: ")
 
-        if prompt.strip().isspace() or not prompt:
-            logger.warning("Empty prompt provided.")
-            return
+            if prompt.strip().isspace() or not prompt:
+                logger.warning("Empty prompt provided.")
+                return
+            session = SessionLog(args.session) if args.session else SessionLog.create()
 
         flow = FlowFactory.create_flow(
             flow_type=FlowType.PLANNING,
             agents=agents,
+            session=session,
+            max_parallel_steps=args.parallel,
         )
         logger.warning("Processing your request...")
+        logger.info(f"Session log: {session.path}")
 
         try:
             start_time = time.time()
-            result = await asyncio.wait_for(
-                flow.execute(prompt),
-                timeout=3600,  # 60 minute timeout for the entire execution
-            )
+            with stream_to(ConsoleSink()):
+                result = await asyncio.wait_for(
+                    flow.resume() if prompt is None else flow.execute(prompt),
+                    timeout=3600,  # 60 minute timeout for the entire execution
+                )
             elapsed_time = time.time() - start_time
             logger.info(f"Request processed in {elapsed_time:.2f} seconds")
             logger.info(result)
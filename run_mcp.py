@@ -6,6 +6,7 @@ import sys
 from app.agent.mcp import MCPAgent
 from app.config import config
 from app.logger import logger
+from app.streaming import ConsoleSink, stream_to
 
 
 class MCPRunner:
@@ -87,12 +88,13 @@ async def run_mcp() -> None:
     try:
         await runner.initialize(args.connection, args.server_url)
 
-        if args.prompt:
-            await runner.run_single_prompt(args.prompt)
-        elif args.interactive:
-            await runner.run_interactive()
-        else:
-            await runner.run_default()
+        with stream_to(ConsoleSink()):
+            if args.prompt:
+                await runner.run_single_prompt(args.prompt)
+            elif args.interactive:
+                await runner.run_interactive()
+            else:
+                await runner.run_default()
 
     except KeyboardInterrupt:
         logger.info("Program interrupted by user")
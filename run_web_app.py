@@ -119,8 +119,20 @@ def main():
         logger.info(f"Starting OpenManus Web UI Dashboard on port {port}")
         logger.info(f"Debug mode: {debug}")
 
-        # Start the Flask app
-        app.run(host="0.0.0.0", port=port, debug=debug)
+        # Prefer the ASGI server so streaming chats don't hold worker threads
+        try:
+            import uvicorn
+
+            from app.web_server import asgi_app
+        except ImportError as e:
+            logger.warning(f"ASGI server unavailable ({e}), using Flask server")
+            uvicorn = None
+
+        if uvicorn is not None and not debug:
+            uvicorn.run(asgi_app, host="0.0.0.0", port=port)
+        else:
+            # Start the Flask app
+            app.run(host="0.0.0.0", port=port, debug=debug)
     except Exception as e:
         logger.exception(f"Error starting OpenManus Web UI Dashboard: {e}")
         sys.exit(1)
@@ -0,0 +1,164 @@
+import asyncio
+import base64
+
+import pytest
+
+from app.agent.toolcall import ToolCallAgent
+from app.schema import SUMMARY_PREFIX, Function, Memory, Message, ToolCall
+
+
+def image(tag: str, size: int = 30) -> str:
+    return base64.b64encode(tag.encode() * size).decode()
+
+
+def inline_images(memory: Memory) -> list:
+    return [m.base64_image for m in memory.messages if m.base64_image]
+
+
+def test_only_recent_images_kept_inline(tmp_path):
+    """Tests that older images are offloaded to disk with a placeholder."""
+    memory = Memory(max_images=2, image_dir=tmp_path)
+    images = [image(str(i)) for i in range(4)]
+    for i, data in enumerate(images):
+        memory.add_message(Message.user_message(f"shot {i}", base64_image=data))
+
+    assert inline_images(memory) == images[2:]
+
+    first = memory.messages[0]
+    assert first.base64_image is None
+    assert first.content.startswith("shot 0\n[Image removed from context")
+    saved = next(tmp_path.iterdir()).read_bytes()
+    assert saved in {base64.b64decode(data) for data in images[:2]}
+    assert len(list(tmp_path.iterdir())) == 2
+
+
+def test_identical_images_kept_inline_once(tmp_path):
+    """Tests that a repeated image only stays on its newest message."""
+    memory = Memory(max_images=5, image_dir=tmp_path)
+    memory.add_message(Message.user_message("before", base64_image=image("a")))
+    memory.add_message(Message.user_message("other", base64_image=image("b")))
+    memory.add_message(Message.user_message("after", base64_image=image("a")))
+
+    assert inline_images(memory) == [image("b"), image("a")]
+    assert memory.messages[0].base64_image is None
+
+
+def test_image_byte_budget(tmp_path):
+    """Tests that the byte budget offloads images but keeps the newest."""
+    big = image("x", size=300)
+    memory = Memory(max_images=10, max_image_bytes=len(big) + 10, image_dir=tmp_path)
+    memory.add_message(Message.user_message("one", base64_image=image("small")))
+    memory.add_message(Message.user_message("two", base64_image=big))
+
+    assert inline_images(memory) == [big]
+
+    bigger = image("y", size=400)
+    memory.add_message(Message.user_message("three", base64_image=bigger))
+    assert inline_images(memory) == [bigger]
+
+
+def test_trimmed_messages_release_image_budget(tmp_path):
+    """Tests that images trimmed by max_messages no longer count."""
+    memory = Memory(max_messages=2, max_images=2, image_dir=tmp_path)
+    memory.add_message(Message.user_message("old", base64_image=image("a")))
+    memory.add_message(Message.user_message("text"))
+    memory.add_message(Message.user_message("text"))
+    memory.add_message(Message.user_message("new", base64_image=image("b")))
+
+    assert inline_images(memory) == [image("b")]
+    assert not list(tmp_path.iterdir())
+
+
+def word_count(message: Message) -> int:
+    return len((message.content or "").split())
+
+
+def tool_turn(index: int) -> list:
+    call = ToolCall(id=f"call_{index}", function=Function(name="tool", arguments="{}"))
+    return [
+        Message.from_tool_calls([call], content=f"calling {index}"),
+        Message.tool_message(f"result {index}", name="tool", tool_call_id=call.id),
+    ]
+
+
+def test_eviction_keeps_tool_call_pairs_and_system_messages():
+    """Tests that trimming drops whole turns and never system messages."""
+    memory = Memory(max_messages=4)
+    memory.add_message(Message.system_message("rules"))
+    memory.add_messages(tool_turn(1))
+    memory.add_messages(tool_turn(2))
+
+    assert [m.content for m in memory.messages] == [
+        "rules",
+        "calling 2",
+        "result 2",
+    ]
+
+
+def test_token_budget_evicts_oldest_turns():
+    """Tests that the token budget is enforced with the bound counter."""
+    memory = Memory(max_tokens=10)
+    memory.bind(token_counter=word_count)
+    for i in range(5):
+        memory.add_message(Message.user_message(f"message number {i}"))
+
+    assert memory.total_tokens <= 10
+    assert [m.content for m in memory.messages] == [
+        "message number 2",
+        "message number 3",
+        "message number 4",
+    ]
+
+
+@pytest.mark.asyncio
+async def test_compaction_summarizes_older_turns_in_background():
+    """Tests that older turns are replaced by a summary off the add path."""
+    summarized = []
+    release = asyncio.Event()
+
+    async def summarizer(messages):
+        summarized.extend(messages)
+        await release.wait()
+        return "the story so far"
+
+    memory = Memory(max_tokens=100, compact_threshold=0.1, keep_recent=3)
+    memory.bind(token_counter=word_count, summarizer=summarizer)
+    memory.add_message(Message.system_message("rules"))
+    for i in range(4):
+        memory.add_messages(tool_turn(i))
+
+    # Compaction runs in the background; adding messages is not blocked
+    await asyncio.sleep(0)
+    memory.add_message(Message.user_message("still adding"))
+    release.set()
+    await memory._compaction
+
+    contents = [m.content for m in memory.messages]
+    assert contents[0] == "rules"
+    assert contents[1] == SUMMARY_PREFIX + "the story so far"
+    # The tail starts at a turn boundary, keeping the tool call with its result
+    assert contents[2:] == [
+        "calling 2",
+        "result 2",
+        "calling 3",
+        "result 3",
+        "still adding",
+    ]
+    assert [m.content for m in summarized] == [
+        "calling 0",
+        "result 0",
+        "calling 1",
+        "result 1",
+    ]
+    assert memory.total_tokens == sum(word_count(m) for m in memory.messages)
+
+
+def test_agent_budgets_memory_by_context_window(llm):
+    """Tests that agents derive the memory budget from the model context."""
+    llm.context_window = 10000
+    llm.max_tokens = 2000
+    agent = ToolCallAgent(llm=llm, memory_context_share=0.5)
+
+    assert agent.memory.max_tokens == 4000
+    agent.memory.add_message(Message.user_message("one two three"))
+    assert agent.memory.total_tokens == llm.count_message(agent.memory.messages[0])
@@ -0,0 +1,123 @@
+import asyncio
+import json
+
+import pytest
+
+from app.agent.toolcall import ToolCallAgent
+from app.schema import Function, ToolCall
+from app.tool import StrReplaceEditor, Terminate, ToolCollection
+from app.tool.base import BaseTool
+
+
+class SleepTool(BaseTool):
+    """Sleeps, then records the order in which calls finished."""
+
+    name: str = "sleep"
+    description: str = "Sleep for a while"
+    parameters: dict = {"type": "object", "properties": {"seconds": {}}}
+    finished: list = []
+    running: int = 0
+    max_running: int = 0
+
+    async def execute(self, seconds: float) -> str:
+        self.running += 1
+        self.max_running = max(self.max_running, self.running)
+        await asyncio.sleep(seconds)
+        self.running -= 1
+        self.finished.append(seconds)
+        return f"slept {seconds}"
+
+
+class ExclusiveSleepTool(SleepTool):
+    name: str = "exclusive_sleep"
+    parallel_safe: bool = False
+
+
+def make_call(index: int, name: str, seconds: float) -> ToolCall:
+    return ToolCall(
+        id=f"call_{index}",
+        function=Function(name=name, arguments=json.dumps({"seconds": seconds})),
+    )
+
+
+@pytest.fixture
+def agent(llm) -> ToolCallAgent:
+    tools = ToolCollection(SleepTool(finished=[]), ExclusiveSleepTool(finished=[]))
+    return ToolCallAgent(
+        llm=llm,
+        available_tools=tools,
+        parallel_tool_calls=True,
+        max_concurrent_tools=2,
+    )
+
+
+@pytest.mark.asyncio
+async def test_parallel_calls_keep_memory_order(agent):
+    """Tests that concurrent calls are recorded in the original order."""
+    agent.tool_calls = [
+        make_call(0, "sleep", 0.06),
+        make_call(1, "sleep", 0.01),
+        make_call(2, "sleep", 0.03),
+    ]
+
+    await agent.act()
+
+    sleep_tool = agent.available_tools.get_tool("sleep")
+    assert sleep_tool.finished == [0.01, 0.03, 0.06]
+    assert sleep_tool.max_running == 2
+    assert [msg.tool_call_id for msg in agent.memory.messages] == [
+        "call_0",
+        "call_1",
+        "call_2",
+    ]
+
+
+@pytest.mark.asyncio
+async def test_exclusive_tool_runs_alone(agent):
+    """Tests that exclusive tools act as a barrier between batches."""
+    agent.tool_calls = [
+        make_call(0, "sleep", 0.03),
+        make_call(1, "exclusive_sleep", 0.01),
+        make_call(2, "sleep", 0.01),
+    ]
+
+    await agent.act()
+
+    finished = agent.available_tools.get_tool("sleep").finished
+    assert finished == [0.03, 0.01]
+    assert agent.available_tools.get_tool("exclusive_sleep").max_running == 1
+
+
+@pytest.mark.asyncio
+async def test_sequential_mode_is_default(llm):
+    """Tests that calls run one at a time unless parallel mode is enabled."""
+    agent = ToolCallAgent(llm=llm, available_tools=ToolCollection(SleepTool()))
+    agent.available_tools.get_tool("sleep").finished = []
+    agent.tool_calls = [make_call(0, "sleep", 0.02), make_call(1, "sleep", 0.01)]
+
+    await agent.act()
+
+    assert agent.available_tools.get_tool("sleep").max_running == 1
+
+
+def test_special_tools_are_exclusive(agent):
+    """Tests that special tools are never run concurrently."""
+    agent.available_tools.add_tool(Terminate())
+    call = ToolCall(id="t", function=Function(name="terminate", arguments="{}"))
+
+    assert not agent._is_parallel_safe(call)
+    assert agent._is_parallel_safe(make_call(0, "sleep", 0))
+
+
+def test_file_editor_is_exclusive(agent):
+    """Tests that file edits in one turn never run concurrently."""
+    agent.available_tools.add_tool(StrReplaceEditor())
+    call = ToolCall(
+        id="e",
+        function=Function(
+            name="str_replace_editor",
+            arguments=json.dumps({"command": "view", "path": "/tmp"}),
+        ),
+    )
+
+    assert not agent._is_parallel_safe(call)
@@ -0,0 +1,124 @@
+import asyncio
+
+import pytest
+
+from app.agent.base import BaseAgent
+from app.flow.planning import PlanningFlow
+from app.runtime import DEFAULT_RUNTIME, get_runtime
+from app.tool import PlanningTool
+
+
+class SleepingAgent(BaseAgent):
+    """Finishes a step after a short sleep, recording how many run at once."""
+
+    name: str = "sleeper"
+    max_steps: int = 1
+    running: int = 0
+    peak: int = 0
+    fail_step: int = -1
+    runtimes: list = []
+
+    async def step(self) -> str:
+        cls = type(self)
+        cls.runtimes.append(get_runtime())
+        cls.running += 1
+        cls.peak = max(cls.peak, cls.running)
+        try:
+            await asyncio.sleep(0.05)
+        finally:
+            cls.running -= 1
+        if f"working on step {self.fail_step}:" in self.memory.messages[-1].content:
+            raise RuntimeError("step failed")
+        return "done"
+
+
+@pytest.fixture(autouse=True)
+def reset_counters():
+    SleepingAgent.running = SleepingAgent.peak = 0
+    SleepingAgent.runtimes = []
+
+
+def make_flow(llm, monkeypatch, workers: int, **agent_kwargs) -> PlanningFlow:
+    async def fake_ask(*args, **kwargs):
+        return "summary"
+
+    monkeypatch.setattr(llm, "ask", fake_ask)
+    agents = {
+        f"worker_{i}": SleepingAgent(llm=llm, **agent_kwargs) for i in range(workers)
+    }
+    return PlanningFlow(
+        agents,
+        llm=llm,
+        planning_tool=PlanningTool(plans={}),
+        plan_id="plan",
+        executors=list(agents),
+        max_parallel_steps=workers,
+    )
+
+
+async def create_plan(flow: PlanningFlow, steps, dependencies) -> dict:
+    await flow.planning_tool.execute(
+        command="create",
+        plan_id="plan",
+        title="Plan",
+        steps=steps,
+        step_dependencies=dependencies,
+    )
+    return flow.planning_tool.plans["plan"]
+
+
+@pytest.mark.asyncio
+async def test_independent_steps_run_concurrently(llm, monkeypatch):
+    """Tests that independent steps overlap and dependents wait for them."""
+    flow = make_flow(llm, monkeypatch, workers=3)
+    plan = await create_plan(flow, ["a", "b", "c", "merge"], [[], [], [], [0, 1, 2]])
+
+    result = await flow.execute("")
+
+    assert SleepingAgent.peak == 3
+    assert plan["step_statuses"] == ["completed"] * 4
+    assert "summary" in result
+
+
+@pytest.mark.asyncio
+async def test_parallelism_is_capped(llm, monkeypatch):
+    """Tests that no more than max_parallel_steps steps run at once."""
+    flow = make_flow(llm, monkeypatch, workers=3)
+    flow.max_parallel_steps = 2
+    plan = await create_plan(flow, ["a", "b", "c", "d"], [[], [], [], []])
+
+    await flow.execute("")
+
+    assert SleepingAgent.peak == 2
+    assert plan["step_statuses"] == ["completed"] * 4
+
+
+@pytest.mark.asyncio
+async def test_failed_step_blocks_its_dependents(llm, monkeypatch):
+    """Tests that a failing step is blocked and its dependents never run."""
+    flow = make_flow(llm, monkeypatch, workers=2, fail_step=0)
+    plan = await create_plan(flow, ["broken", "fine", "after broken"], [[], [], [0]])
+
+    await flow.execute("")
+
+    assert plan["step_statuses"] == ["blocked", "completed", "not_started"]
+
+
+@pytest.mark.asyncio
+async def test_concurrent_steps_get_their_own_runtime(llm, monkeypatch):
+    """Tests that parallel steps don't share the sandbox a sibling cleans up."""
+    cleanups = []
+
+    async def fake_cleanup():
+        cleanups.append(True)
+
+    monkeypatch.setattr(DEFAULT_RUNTIME.sandbox, "cleanup", fake_cleanup)
+    flow = make_flow(llm, monkeypatch, workers=2)
+    await create_plan(flow, ["a", "b"], [[], []])
+
+    await flow.execute("")
+
+    sandboxes = {id(runtime.sandbox) for runtime in SleepingAgent.runtimes}
+    assert len(sandboxes) == 2
+    assert DEFAULT_RUNTIME not in SleepingAgent.runtimes
+    assert cleanups == []
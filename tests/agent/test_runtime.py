@@ -0,0 +1,102 @@
+import asyncio
+import json
+import random
+
+import pytest
+
+from app.agent.toolcall import ToolCallAgent
+from app.runtime import (
+    DEFAULT_RUNTIME,
+    get_active_sessions,
+    get_runtime,
+    session_runtime,
+)
+from app.schema import Function, Message, ToolCall
+from app.tool import StrReplaceEditor, Terminate, ToolCollection
+
+
+SESSIONS = 40
+
+
+def stub_ask_tool(llm):
+    """A stub LLM that edits the file named in the request, then terminates."""
+
+    async def ask_tool(messages, **kwargs):
+        # Interleave sessions like real network calls would
+        await asyncio.sleep(random.uniform(0, 0.01))
+        llm.update_token_count(10, 5)
+
+        path = messages[0].content
+        step = sum(1 for m in messages if m.role == "assistant")
+        if step == 0:
+            name, args = "str_replace_editor", {
+                "command": "create",
+                "path": path,
+                "file_text": "draft",
+            }
+        elif step == 1:
+            name, args = "str_replace_editor", {
+                "command": "str_replace",
+                "path": path,
+                "old_str": "draft",
+                "new_str": "final",
+            }
+        else:
+            name, args = "terminate", {"status": "success"}
+        call = ToolCall(
+            id=f"call_{step}", function=Function(name=name, arguments=json.dumps(args))
+        )
+        return Message.from_tool_calls([call])
+
+    return ask_tool
+
+
+@pytest.mark.asyncio
+async def test_concurrent_sessions_have_isolated_state(tmp_path, llm, monkeypatch):
+    """Tests that many concurrent sessions keep their own runtime state."""
+    monkeypatch.setattr(llm, "ask_tool", stub_ask_tool(llm))
+
+    async def run_session(i: int) -> dict:
+        path = str(tmp_path / f"session_{i}.txt")
+        agent = ToolCallAgent(
+            llm=llm,
+            available_tools=ToolCollection(StrReplaceEditor(), Terminate()),
+            max_steps=5,
+        )
+        async with session_runtime(f"load_{i}") as runtime:
+            await agent.run(path)
+            assert get_runtime() is runtime
+            return {
+                "path": path,
+                "history": dict(runtime.file_history),
+                "usage": runtime.get_token_usage(),
+            }
+
+    results = await asyncio.gather(*(run_session(i) for i in range(SESSIONS)))
+
+    for result in results:
+        # Each session only saw its own edits and its own token usage
+        assert result["history"] == {result["path"]: ["draft", "draft"]}
+        assert result["usage"] == {
+            "default": {"input_tokens": 30, "completion_tokens": 15}
+        }
+    assert get_runtime() is DEFAULT_RUNTIME
+    assert not DEFAULT_RUNTIME.file_history
+    assert llm.total_input_tokens == 0
+    assert get_active_sessions() == []
+
+
+@pytest.mark.asyncio
+async def test_session_closes_its_sandbox():
+    """Tests that leaving a session cleans up its own sandbox only."""
+    async with session_runtime() as first:
+        async with session_runtime() as second:
+            assert second.sandbox is not first.sandbox
+            assert second.sandbox is not DEFAULT_RUNTIME.sandbox
+        cleaned = []
+
+        async def cleanup():
+            cleaned.append(True)
+
+        first.sandbox.cleanup = cleanup
+    assert cleaned == [True]
@@ -0,0 +1,158 @@
+import base64
+import json
+
+import pytest
+
+from app.agent.base import BaseAgent
+from app.flow.planning import PlanningFlow
+from app.schema import AgentState, Function, Memory, Message, ToolCall
+from app.session import SessionLog
+from app.tool import PlanningTool
+
+
+class CountingAgent(BaseAgent):
+    """Adds one assistant message per step and can crash on a given step."""
+
+    name: str = "counter"
+    crash_at: int = 0
+
+    async def step(self) -> str:
+        if self.current_step == self.crash_at:
+            raise RuntimeError("crash")
+        self.memory.add_message(Message.assistant_message(f"step {self.current_step}"))
+        return "ok"
+
+
+def read_records(session: SessionLog) -> list:
+    return [json.loads(line) for line in session.path.read_text().splitlines()]
+
+
+def test_messages_round_trip_with_images_out_of_line(tmp_path, llm):
+    """Tests that messages replay exactly and images are stored as files."""
+    image = base64.b64encode(b"jpeg bytes").decode()
+    call = ToolCall(id="call_1", function=Function(name="tool", arguments='{"a":1}'))
+    memory = Memory()
+    memory.add_messages(
+        [
+            Message.user_message("look", base64_image=image, image_dimensions=(4, 3)),
+            Message.from_tool_calls([call], content="calling"),
+            Message.tool_message("done", name="tool", tool_call_id="call_1"),
+        ]
+    )
+    agent = CountingAgent(llm=llm, memory=memory)
+
+    session = SessionLog(tmp_path / "session.jsonl")
+    session.record_agent("agent", agent)
+    session.close()
+
+    assert image not in session.path.read_text()
+    assert len(list(session.image_dir.iterdir())) == 1
+
+    snapshot = SessionLog(session.path).load().agents["agent"]
+    assert [m.to_dict() for m in snapshot.messages] == memory.to_dict_list()
+
+
+def test_only_changes_are_appended(tmp_path, llm):
+    """Tests that each checkpoint writes new messages and evictions only."""
+    agent = CountingAgent(llm=llm, memory=Memory(max_messages=3))
+    session = SessionLog(tmp_path / "session.jsonl")
+    for i in range(3):
+        agent.memory.add_message(Message.user_message(f"m{i}"))
+    session.record_agent("agent", agent)
+
+    agent.memory.add_message(Message.user_message("m3"))
+    session.record_agent("agent", agent)
+
+    kinds = [record["t"] for record in read_records(session)]
+    assert kinds == ["session"] + ["msg"] * 3 + ["agent", "msg", "drop", "agent"]
+
+    reloaded = SessionLog(session.path).load().agents["agent"]
+    assert [m.content for m in reloaded.messages] == ["m1", "m2", "m3"]
+
+
+def test_torn_last_record_is_ignored(tmp_path, llm):
+    """Tests that a write cut short by a crash does not break loading."""
+    agent = CountingAgent(llm=llm)
+    agent.memory.add_message(Message.user_message("kept"))
+    session = SessionLog(tmp_path / "session.jsonl")
+    session.record_agent("agent", agent)
+    session.close()
+    with open(session.path, "a") as f:
+        f.write('{"t":"msg","a":"agent","s":9,"r":"us')
+
+    snapshot = SessionLog(session.path).load().agents["agent"]
+    assert [m.content for m in snapshot.messages] == ["kept"]
+
+
+@pytest.mark.asyncio
+async def test_agent_resumes_after_crash(tmp_path, llm):
+    """Tests that a resumed agent continues from its last checkpoint."""
+    path = tmp_path / "session.jsonl"
+    agent = CountingAgent(llm=llm, max_steps=5, crash_at=3, session=SessionLog(path))
+    with pytest.raises(RuntimeError):
+        await agent.run("count")
+
+    session = SessionLog(path)
+    resumed = CountingAgent(llm=llm, max_steps=5, session=session)
+    resumed.restore(session.load().agents["counter"])
+    assert resumed.current_step == 2
+    assert resumed.state == AgentState.IDLE
+
+    await resumed.run()
+
+    contents = [m.content for m in resumed.memory.messages]
+    assert contents == ["count"] + [f"step {i}" for i in range(1, 6)]
+    # Replayed messages are not written to the log a second time
+    logged = [r["c"] for r in read_records(session) if r["t"] == "msg"]
+    assert logged == contents
+
+
+@pytest.mark.asyncio
+async def test_planning_flow_resumes_at_interrupted_step(tmp_path, llm, monkeypatch):
+    """Tests that a resumed flow skips completed steps and keeps memory."""
+
+    async def fake_ask(*args, **kwargs):
+        return "summary"
+
+    monkeypatch.setattr(llm, "ask", fake_ask)
+    path = tmp_path / "session.jsonl"
+    steps = ["first", "second", "third"]
+
+    def make_flow() -> PlanningFlow:
+        tool = PlanningTool(plans={})
+        agent = CountingAgent(llm=llm, max_steps=1)
+        return PlanningFlow(
+            {"worker": agent},
+            llm=llm,
+            planning_tool=tool,
+            plan_id="plan",
+            session=SessionLog(path),
+        )
+
+    flow = make_flow()
+    await flow.planning_tool.execute(
+        command="create", plan_id="plan", title="Plan", steps=steps
+    )
+    # Run the first step, then crash while executing the second
+    original = flow._execute_step
+    calls = 0
+
+    async def execute_step(executor, step_info):
+        nonlocal calls
+        calls += 1
+        if calls == 2:
+            raise KeyboardInterrupt
+        return await original(executor, step_info)
+
+    monkeypatch.setattr(flow, "_execute_step", execute_step)
+    with pytest.raises(KeyboardInterrupt):
+        await flow.execute("")
+
+    resumed = make_flow()
+    result = await resumed.resume()
+
+    plan = resumed.planning_tool.plans["plan"]
+    assert plan["step_statuses"] == ["completed"] * 3
+    assert "summary" in result
+    worker = resumed.agents["worker"]
+    assert [m.role for m in worker.memory.messages].count("user") == 3
@@ -0,0 +1,128 @@
+import asyncio
+import json
+import time
+from types import SimpleNamespace
+
+import pytest
+from openai.types.chat import ChatCompletionChunk
+
+from app.agent.toolcall import ToolCallAgent
+from app.schema import Message
+from app.tool import ToolCollection
+from app.tool.base import BaseTool
+
+
+def tool_call_chunks(calls, pieces: int = 3) -> list:
+    """Chunks of a streamed response making the given (name, arguments) calls."""
+    chunks = []
+    for index, (name, arguments) in enumerate(calls):
+        text = json.dumps(arguments)
+        size = -(-len(text) // pieces)
+        for i, start in enumerate(range(0, len(text), size)):
+            function = {"arguments": text[start : start + size]}
+            call = {"index": index, "function": function}
+            if i == 0:
+                call.update(id=f"call_{index}", type="function")
+                function["name"] = name
+            chunks.append(
+                ChatCompletionChunk.model_validate(
+                    {
+                        "id": "chunk",
+                        "object": "chat.completion.chunk",
+                        "created": 0,
+                        "model": "test",
+                        "choices": [{"index": 0, "delta": {"tool_calls": [call]}}],
+                    }
+                )
+            )
+    return chunks
+
+
+class StreamingCompletions:
+    """Stub completions API streaming chunks with a delay between them."""
+
+    def __init__(self, chunks, delay: float = 0.0):
+        self.chunks = chunks
+        self.delay = delay
+        self.sent = 0
+        self.finished_at = None
+
+    async def create(self, **params):
+        assert params["stream"] is True
+
+        async def stream():
+            for chunk in self.chunks:
+                await asyncio.sleep(self.delay)
+                self.sent += 1
+                yield chunk
+            self.finished_at = time.monotonic()
+
+        return stream()
+
+
+def use_completions(llm, completions) -> None:
+    llm.client = SimpleNamespace(chat=SimpleNamespace(completions=completions))
+
+
+@pytest.mark.asyncio
+async def test_tool_calls_are_emitted_as_soon_as_complete(llm):
+    """Tests that a call is handed over before the rest of the stream."""
+    completions = StreamingCompletions(
+        tool_call_chunks([("first", {"a": 1}), ("second", {"b": "two"})])
+    )
+    use_completions(llm, completions)
+    emitted = []
+
+    message = await llm.ask_tool(
+        [Message.user_message("go")],
+        tools=[{"type": "function", "function": {"name": "first"}}],
+        on_tool_call=lambda call: emitted.append(
+            (call.function.name, completions.sent)
+        ),
+    )
+
+    # "first" was complete after its own chunks, before "second" began
+    assert emitted[0] == ("first", 3)
+    assert emitted[1][0] == "second"
+    assert [json.loads(call.function.arguments) for call in message.tool_calls] == [
+        {"a": 1},
+        {"b": "two"},
+    ]
+    assert llm.total_completion_tokens > 0
+
+
+class SlowTool(BaseTool):
+    name: str = "slow"
+    description: str = "Records when it starts"
+    parameters: dict = {"type": "object", "properties": {"n": {}}}
+    started: list = []
+
+    async def execute(self, n: int) -> str:
+        self.started.append((n, time.monotonic()))
+        await asyncio.sleep(0.01)
+        return f"done {n}"
+
+
+@pytest.mark.asyncio
+async def test_agent_starts_tools_while_streaming(llm):
+    """Tests that the first tool runs before the response has finished."""
+    completions = StreamingCompletions(
+        tool_call_chunks([("slow", {"n": 0}), ("slow", {"n": 1}), ("slow", {"n": 2})]),
+        delay=0.01,
+    )
+    use_completions(llm, completions)
+    tool = SlowTool(started=[])
+    agent = ToolCallAgent(
+        llm=llm,
+        available_tools=ToolCollection(tool),
+        parallel_tool_calls=True,
+        stream_tool_calls=True,
+    )
+
+    assert await agent.think()
+    await agent.act()
+
+    assert tool.started[0][1] < completions.finished_at
+    assert [m.content for m in agent.memory.messages if m.role == "tool"] == [
+        f"Observed output of cmd `slow` executed:\ndone {n}" for n in range(3)
+    ]
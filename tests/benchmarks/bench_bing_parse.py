@@ -0,0 +1,62 @@
+"""
+Benchmark Bing result page parsing: streaming lxml path vs BeautifulSoup.
+
+Run from the repository root:
+
+    python -m tests.benchmarks.bench_bing_parse [--rounds N]
+
+Every bing_*.html page in tests/tool/fixtures is parsed. The bundled pages
+are generated to mimic Bing's result markup (inline styles and scripts, ads,
+pagination) at a realistic page size; save real result pages there, as
+returned to the engine's request headers, to benchmark against live markup.
+"""
+
+import argparse
+import statistics
+import time
+from pathlib import Path
+
+from app.tool.search.bing_search import BingSearchEngine
+
+
+FIXTURES = Path(__file__).resolve().parent.parent / "tool" / "fixtures"
+
+
+def time_parser(parse, pages, rounds: int) -> list:
+    """Per-page parse times in milliseconds over all rounds."""
+    timings = []
+    for _ in range(rounds):
+        for page in pages:
+            start = time.perf_counter()
+            parse(page)
+            timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rounds", type=int, default=50)
+    args = parser.parse_args()
+
+    pages = [path.read_bytes() for path in sorted(FIXTURES.glob("bing_*.html"))]
+    engine = BingSearchEngine()
+    parsers = {
+        "beautifulsoup": engine._parse_results_soup,
+        "streaming": engine._parse_results_fast,
+    }
+
+    results = {}
+    for name, parse in parsers.items():
+        parse(pages[0])  # warm up
+        timings = time_parser(parse, pages, args.rounds)
+        results[name] = statistics.median(timings)
+        print(
+            f"{name:>14}: median {results[name]:.2f} ms/page, "
+            f"p95 {sorted(timings)[int(len(timings) * 0.95)]:.2f} ms/page"
+        )
+
+    print(f"{'speedup':>14}: {results['beautifulsoup'] / results['streaming']:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
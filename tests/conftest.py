@@ -0,0 +1,26 @@
+from collections import defaultdict
+
+import pytest
+
+from app.llm import LLM
+from app.runtime import DEFAULT_RUNTIME, TokenUsage
+
+
+class WhitespaceTokenizer:
+    """Offline stand-in for a tiktoken encoding."""
+
+    name = "whitespace"
+
+    def encode(self, text: str) -> list:
+        return text.split()
+
+
+@pytest.fixture
+def llm(monkeypatch) -> LLM:
+    """Returns a fresh default LLM instance using an offline tokenizer."""
+    monkeypatch.setattr(
+        "tiktoken.encoding_for_model", lambda model: WhitespaceTokenizer()
+    )
+    monkeypatch.setattr(LLM, "_instances", {})
+    monkeypatch.setattr(DEFAULT_RUNTIME, "token_usage", defaultdict(TokenUsage))
+    return LLM()
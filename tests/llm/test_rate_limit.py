@@ -0,0 +1,142 @@
+import asyncio
+import time
+from types import SimpleNamespace
+
+import httpx
+import pytest
+from openai import (
+    AuthenticationError,
+    BadRequestError,
+    InternalServerError,
+    RateLimitError,
+)
+
+from app.llm_client import RateLimiter, TokenBucket, is_retryable, retry_after_seconds
+from app.schema import Message
+
+
+REQUEST = httpx.Request("POST", "https://api.example.com/v1/chat/completions")
+
+
+def api_error(cls, status: int, headers=None, body=None):
+    response = httpx.Response(status, headers=headers or {}, request=REQUEST)
+    return cls("error", response=response, body=body)
+
+
+class FlakyCompletions:
+    """Stub completions API that fails with the given errors, then answers."""
+
+    def __init__(self, *errors):
+        self.errors = list(errors)
+        self.calls = 0
+
+    async def create(self, **params):
+        self.calls += 1
+        if self.errors:
+            raise self.errors.pop(0)
+        message = SimpleNamespace(content="answer")
+        return SimpleNamespace(
+            choices=[SimpleNamespace(message=message)],
+            usage=SimpleNamespace(prompt_tokens=10, completion_tokens=2),
+        )
+
+
+def use_completions(llm, completions) -> None:
+    llm.client = SimpleNamespace(chat=SimpleNamespace(completions=completions))
+
+
+def test_retry_after_headers_are_parsed():
+    """Tests seconds, milliseconds and missing Retry-After headers."""
+    assert (
+        retry_after_seconds(api_error(RateLimitError, 429, {"retry-after": "3"})) == 3
+    )
+    assert (
+        retry_after_seconds(api_error(RateLimitError, 429, {"retry-after-ms": "250"}))
+        == 0.25
+    )
+    assert retry_after_seconds(api_error(RateLimitError, 429)) is None
+    assert retry_after_seconds(ValueError("local")) is None
+
+
+def test_only_transient_errors_are_retryable():
+    """Tests which errors are worth sending again."""
+    assert is_retryable(api_error(RateLimitError, 429))
+    assert is_retryable(api_error(InternalServerError, 503))
+    assert not is_retryable(api_error(AuthenticationError, 401))
+    assert not is_retryable(api_error(BadRequestError, 400))
+    assert not is_retryable(ValueError("bad messages"))
+
+    quota = api_error(RateLimitError, 429, body={"code": "insufficient_quota"})
+    assert not is_retryable(quota)
+
+
+@pytest.mark.asyncio
+async def test_rate_limit_is_retried_after_the_requested_delay(llm):
+    """Tests that a 429 is retried once Retry-After has passed."""
+    completions = FlakyCompletions(
+        api_error(RateLimitError, 429, {"retry-after-ms": "50"})
+    )
+    use_completions(llm, completions)
+
+    start = time.monotonic()
+    answer = await llm.ask([Message.user_message("hi")], stream=False)
+
+    assert answer == "answer"
+    assert completions.calls == 2
+    assert time.monotonic() - start >= 0.05
+    assert llm.rate_limiter.get_stats()["rate_limited"] == 1
+
+
+@pytest.mark.asyncio
+async def test_non_retryable_errors_are_raised_at_once(llm):
+    """Tests that client errors are not sent again."""
+    completions = FlakyCompletions(api_error(AuthenticationError, 401))
+    use_completions(llm, completions)
+
+    with pytest.raises(AuthenticationError):
+        await llm.ask([Message.user_message("hi")], stream=False)
+    assert completions.calls == 1
+
+
+@pytest.mark.asyncio
+async def test_concurrency_is_capped():
+    """Tests that no more than max_concurrent requests are in flight."""
+    limiter = RateLimiter(max_concurrent=2)
+    running = peak = 0
+
+    async def request():
+        nonlocal running, peak
+        async with limiter.limit():
+            running += 1
+            peak = max(peak, running)
+            await asyncio.sleep(0.01)
+            running -= 1
+
+    await asyncio.gather(*(request() for _ in range(6)))
+    assert peak == 2
+
+
+@pytest.mark.asyncio
+async def test_token_bucket_spreads_requests():
+    """Tests that a drained bucket makes callers wait for the refill."""
+    bucket = TokenBucket(rate_per_minute=60 * 100, capacity=10)  # 100 per second
+
+    start = time.monotonic()
+    await bucket.acquire(10)
+    await bucket.acquire(5)
+
+    assert time.monotonic() - start >= 0.045
+
+
+@pytest.mark.asyncio
+async def test_rate_limit_pauses_every_request():
+    """Tests that a 429 holds back requests that did not see it."""
+    limiter = RateLimiter()
+    with pytest.raises(RateLimitError):
+        async with limiter.limit():
+            raise api_error(RateLimitError, 429, {"retry-after-ms": "50"})
+
+    start = time.monotonic()
+    async with limiter.limit():
+        pass
+    assert time.monotonic() - start >= 0.04
@@ -0,0 +1,117 @@
+import sqlite3
+from types import SimpleNamespace
+
+import pytest
+
+from app.llm import InMemoryResponseCache, SQLiteResponseCache, close_response_caches
+from app.schema import Message
+
+
+class StubCompletions:
+    """Stub of the OpenAI chat completions API that counts requests."""
+
+    def __init__(self):
+        self.calls = 0
+
+    async def create(self, **params):
+        self.calls += 1
+        message = SimpleNamespace(content=f"answer {self.calls}")
+        return SimpleNamespace(
+            choices=[SimpleNamespace(message=message)],
+            usage=SimpleNamespace(prompt_tokens=10, completion_tokens=2),
+        )
+
+
+@pytest.fixture
+def stub_completions(llm) -> StubCompletions:
+    completions = StubCompletions()
+    llm.client = SimpleNamespace(chat=SimpleNamespace(completions=completions))
+    return completions
+
+
+def test_key_is_canonical():
+    """Tests that key order and ignored params don't change the key."""
+    key_a = InMemoryResponseCache.make_key("ask", {"model": "m", "temperature": 0})
+    key_b = InMemoryResponseCache.make_key(
+        "ask", {"temperature": 0, "model": "m", "stream": True}
+    )
+    key_c = InMemoryResponseCache.make_key("ask", {"model": "m", "temperature": 1})
+
+    assert key_a == key_b
+    assert key_a != key_c
+
+
+def test_memory_cache_lru_eviction():
+    """Tests LRU eviction and hit/miss counters of the in-memory backend."""
+    cache = InMemoryResponseCache(max_entries=2)
+    cache.set("a", "1")
+    cache.set("b", "2")
+    assert cache.get("a") == "1"  # "b" is now least recently used
+    cache.set("c", "3")
+
+    assert cache.get("b") is None
+    assert cache.get("c") == "3"
+    assert cache.get_stats()["hits"] == 2
+    assert cache.get_stats()["misses"] == 1
+
+
+def test_sqlite_cache_ttl_and_size(tmp_path, monkeypatch):
+    """Tests TTL expiry and size eviction of the SQLite backend."""
+    now = [1000.0]
+    monkeypatch.setattr("app.llm.time.time", lambda: now[0])
+    cache = SQLiteResponseCache(tmp_path / "cache.sqlite", ttl=60, max_entries=2)
+    try:
+        cache.set("a", "1")
+        now[0] += 1
+        cache.set("b", "2")
+        now[0] += 1
+        cache.set("c", "3")
+        assert len(cache) == 2
+        assert cache.get("a") is None
+
+        now[0] += 120
+        assert cache.get("c") is None
+    finally:
+        cache.close()
+
+
+def test_sqlite_cache_persists(tmp_path):
+    """Tests that entries survive reopening the SQLite file."""
+    path = tmp_path / "cache.sqlite"
+    cache = SQLiteResponseCache(path)
+    cache.set("key", "value")
+    cache.close()
+
+    reopened = SQLiteResponseCache(path)
+    try:
+        assert reopened.get("key") == "value"
+    finally:
+        reopened.close()
+
+
+def test_close_response_caches(llm, tmp_path):
+    """Tests that shutting down closes the caches of the LLM instances."""
+    cache = SQLiteResponseCache(tmp_path / "cache.sqlite")
+    llm.response_cache = cache
+
+    close_response_caches()
+
+    assert llm.response_cache is None
+    with pytest.raises(sqlite3.ProgrammingError):
+        len(cache)
+
+
+@pytest.mark.asyncio
+async def test_ask_served_from_cache(llm, stub_completions):
+    """Tests that a repeated request is answered without calling the API."""
+    llm.response_cache = InMemoryResponseCache()
+    messages = [Message.user_message("What is 1+1?")]
+
+    first = await llm.ask(messages, stream=False)
+    second = await llm.ask(messages, stream=False)
+    other = await llm.ask(messages, stream=False, temperature=0.5)
+
+    assert first == second == "answer 1"
+    assert other == "answer 2"
+    assert stub_completions.calls == 2
+    assert llm.get_cache_stats()["hits"] == 1
@@ -0,0 +1,153 @@
+import asyncio
+from types import SimpleNamespace
+
+import httpx
+import pytest
+from openai import InternalServerError
+
+from app.llm import InMemoryResponseCache
+from app.schema import Message
+from app.streaming import ConsoleSink, QueueSink, StreamSink, stream_to
+
+
+class StreamingCompletions:
+    """Stub completions API that streams a fixed answer in chunks."""
+
+    def __init__(self, chunks):
+        self.chunks = chunks
+
+    async def create(self, **params):
+        assert params["stream"]
+
+        async def stream():
+            for text in self.chunks:
+                delta = SimpleNamespace(content=text, tool_calls=None)
+                yield SimpleNamespace(choices=[SimpleNamespace(delta=delta)])
+
+        return stream()
+
+
+class InterruptedCompletions(StreamingCompletions):
+    """Stub completions API whose first stream breaks off after a chunk."""
+
+    def __init__(self, chunks):
+        super().__init__(chunks)
+        self.calls = 0
+
+    async def create(self, **params):
+        self.calls += 1
+        if self.calls > 1:
+            return await super().create(**params)
+
+        async def stream():
+            delta = SimpleNamespace(content=self.chunks[0], tool_calls=None)
+            yield SimpleNamespace(choices=[SimpleNamespace(delta=delta)])
+            request = httpx.Request("POST", "https://api.example.com/v1")
+            response = httpx.Response(
+                503, headers={"retry-after-ms": "0"}, request=request
+            )
+            raise InternalServerError("error", response=response, body=None)
+
+        return stream()
+
+
+class RecordingSink(StreamSink):
+    def __init__(self):
+        self.tokens = []
+        self.ended = []
+        self.resets = 0
+
+    async def on_token(self, text: str) -> None:
+        self.tokens.append(text)
+
+    async def on_end(self, text: str) -> None:
+        self.ended.append(text)
+
+    async def on_reset(self) -> None:
+        self.resets += 1
+        self.tokens.clear()
+
+
+@pytest.fixture
+def streaming_llm(llm):
+    completions = StreamingCompletions(["The ", "answer", "", " is 42"])
+    llm.client = SimpleNamespace(chat=SimpleNamespace(completions=completions))
+    return llm
+
+
+@pytest.mark.asyncio
+async def test_ask_forwards_chunks_to_sink(streaming_llm, capsys):
+    """Tests that streamed text goes to the sink, not stdout."""
+    sink = RecordingSink()
+
+    result = await streaming_llm.ask(
+        [Message.user_message("question")], stream_sink=sink
+    )
+
+    assert result == "The answer is 42"
+    assert sink.tokens == ["The ", "answer", " is 42"]
+    assert sink.ended == ["The answer is 42"]
+    assert capsys.readouterr().out == ""
+    assert streaming_llm.total_completion_tokens == 4
+
+
+@pytest.mark.asyncio
+async def test_context_sink_applies_to_tasks(streaming_llm):
+    """Tests that a sink installed with stream_to reaches tasks started inside."""
+    sink = RecordingSink()
+
+    with stream_to(sink):
+        result = await asyncio.create_task(
+            streaming_llm.ask([Message.user_message("question")])
+        )
+    await streaming_llm.ask([Message.user_message("another question")])
+
+    assert result == "The answer is 42"
+    assert sink.ended == ["The answer is 42"]
+
+
+@pytest.mark.asyncio
+async def test_queue_and_console_sinks(streaming_llm, capsys):
+    """Tests the event format of QueueSink and the output of ConsoleSink."""
+    queue: asyncio.Queue = asyncio.Queue()
+
+    await streaming_llm.ask(
+        [Message.user_message("question")], stream_sink=QueueSink(queue)
+    )
+    await streaming_llm.ask([Message.user_message("again")], stream_sink=ConsoleSink())
+
+    events = [queue.get_nowait() for _ in range(queue.qsize())]
+    assert events[0] == {"type": "token", "content": "The "}
+    assert events[-1] == {"type": "end", "content": "The answer is 42"}
+    assert capsys.readouterr().out == "The answer is 42\n"
+
+
+@pytest.mark.asyncio
+async def test_interrupted_stream_resets_sink(llm):
+    """Tests that text of a failed stream is withdrawn before the retry."""
+    completions = InterruptedCompletions(["The ", "answer"])
+    llm.client = SimpleNamespace(chat=SimpleNamespace(completions=completions))
+    sink = RecordingSink()
+
+    result = await llm.ask([Message.user_message("question")], stream_sink=sink)
+
+    assert result == "The answer"
+    assert completions.calls == 2
+    assert sink.resets == 1
+    assert sink.tokens == ["The ", "answer"]
+    assert sink.ended == ["The answer"]
+
+
+@pytest.mark.asyncio
+async def test_cached_response_reaches_sink(streaming_llm):
+    """Tests that a streamed request answered from the cache is still sent."""
+    streaming_llm.response_cache = InMemoryResponseCache()
+    messages = [Message.user_message("question")]
+    await streaming_llm.ask(messages)
+    sink = RecordingSink()
+
+    result = await streaming_llm.ask(messages, stream_sink=sink)
+
+    assert result == "The answer is 42"
+    assert sink.tokens == ["The answer is 42"]
+    assert sink.ended == ["The answer is 42"]
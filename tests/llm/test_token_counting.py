@@ -0,0 +1,77 @@
+from app.llm import LLM
+from app.schema import Message
+from app.tool import Terminate, ToolCollection
+
+
+def test_cached_count_matches_full_count(llm):
+    """Tests that cached per-message counts equal a full recount."""
+    messages = [
+        Message.system_message("You are a helpful assistant"),
+        Message.user_message("Hello there"),
+        Message.assistant_message("Hi! How can I help?"),
+    ]
+    expected = llm.token_counter.count_message_tokens(LLM.format_messages(messages))
+
+    assert llm.count_message_tokens(messages) == expected
+    # Second call is served from the per-message cache
+    assert llm.count_message_tokens(messages) == expected
+
+
+def test_only_new_messages_are_tokenized(llm, monkeypatch):
+    """Tests that previously counted messages are not tokenized again."""
+    messages = [Message.user_message(f"message {i}") for i in range(10)]
+    llm.count_message_tokens(messages)
+
+    calls = []
+    original = llm.token_counter.count_single_message
+
+    def counting(message):
+        calls.append(message)
+        return original(message)
+
+    monkeypatch.setattr(llm.token_counter, "count_single_message", counting)
+    messages.append(Message.user_message("a new message"))
+    llm.count_message_tokens(messages)
+
+    assert len(calls) == 1
+
+
+def test_changed_message_is_recounted(llm):
+    """Tests that reassigning a field invalidates the cached count."""
+    message = Message.user_message("short")
+    before = llm.count_message_tokens([message])
+
+    message.content = "a much longer message than the one before it"
+    after = llm.count_message_tokens([message])
+
+    assert after > before
+    assert after == llm.token_counter.count_message_tokens([message.to_dict()])
+
+
+def test_tool_param_tokens_are_cached(llm):
+    """Tests tool schema token counts on a ToolCollection."""
+    counter = llm.token_counter
+    tools = ToolCollection(Terminate())
+    expected = counter.count_text(str(Terminate().to_param()))
+
+    assert tools.count_param_tokens(counter) == expected
+    assert tools.count_param_tokens(counter) == expected
+    assert len(tools._param_tokens) == 1
+
+
+def test_image_dimensions_used_for_image_tokens(llm):
+    """Tests that known screenshot dimensions drive the image token count."""
+    message = Message.user_message(
+        "Current browser screenshot:", base64_image="abc", image_dimensions=(512, 512)
+    )
+    counter = llm.token_counter
+    expected = counter.count_single_message(
+        {"role": "user", "content": "Current browser screenshot:"}
+    ) + counter._calculate_high_detail_tokens(512, 512)
+
+    assert llm.count_message_tokens([message], supports_images=True) == (
+        counter.FORMAT_TOKENS + expected
+    )
+    formatted = LLM.format_messages([message], supports_images=True)[0]
+    assert "image_dimensions" not in formatted
+    assert "dimensions" not in formatted["content"][-1]
@@ -81,6 +81,33 @@ class TestAsyncDockerizedTerminal:
         assert "First" in cmd1
         assert "Second" in cmd2
 
+    @pytest.mark.asyncio
+    async def test_exit_code_tracking(self, terminal):
+        """Test that exit codes are tracked per command."""
+        await terminal.run_command("true")
+        assert terminal.session.last_exit_code == 0
+        await terminal.run_command("sh -c 'exit 3'")
+        assert terminal.session.last_exit_code == 3
+
+    @pytest.mark.asyncio
+    async def test_output_without_trailing_newline(self, terminal):
+        """Test output that looks like a prompt or lacks a final newline."""
+        result = await terminal.run_command("printf '$ 0'")
+        assert result == "$ 0"
+
+    @pytest.mark.asyncio
+    async def test_command_after_timeout(self, docker_container):
+        """Test that output of a timed-out command doesn't leak into the next."""
+        terminal = AsyncDockerizedTerminal(docker_container, default_timeout=1)
+        await terminal.init()
+        try:
+            with pytest.raises(TimeoutError):
+                await terminal.run_command("sleep 2; echo late")
+            result = await terminal.run_command("echo next", timeout=5)
+            assert result == "next"
+        finally:
+            await terminal.close()
+
     @pytest.mark.asyncio
     async def test_session_cleanup(self, docker_container):
         """Test proper cleanup of resources."""
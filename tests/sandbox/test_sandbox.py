@@ -1,7 +1,9 @@
+import os
+
 import pytest
 import pytest_asyncio
 
-from app.sandbox.core.sandbox import DockerSandbox, SandboxSettings
+from app.sandbox.core.sandbox import DockerSandbox, SandboxSettings, _iter_tar
 
 
 @pytest.fixture(scope="module")
@@ -137,6 +139,40 @@ async def test_sandbox_cleanup(sandbox_config):
     assert not any(c.id == container_id for c in containers)
 
 
+@pytest.mark.asyncio
+async def test_sandbox_copy_many(sandbox, tmp_path):
+    """Tests batch upload and download of files."""
+    uploads = {}
+    for i in range(3):
+        src = tmp_path / f"file_{i}.txt"
+        src.write_text(f"content {i}")
+        uploads[str(src)] = f"/workspace/batch/dir_{i}/file_{i}.txt"
+
+    await sandbox.copy_many(uploads)
+
+    downloads = {
+        dst: str(tmp_path / "out" / os.path.basename(dst)) for dst in uploads.values()
+    }
+    await sandbox.copy_many(downloads, to_container=False)
+    for i in range(3):
+        assert (tmp_path / "out" / f"file_{i}.txt").read_text() == f"content {i}"
+
+
+def test_tar_stream_roundtrip(tmp_path):
+    """Tests that streamed archives extract like regular ones."""
+    src = tmp_path / "data.bin"
+    src.write_bytes(os.urandom(5000))
+    dst = tmp_path / "copy.bin"
+
+    chunks = list(_iter_tar([(str(src), "data.bin")]))
+    # Feed the archive back in small, uneven chunks like an HTTP stream
+    archive = b"".join(chunks)
+    stream = (archive[i : i + 777] for i in range(0, len(archive), 777))
+    DockerSandbox._extract_stream(stream, "data.bin", str(dst))
+
+    assert dst.read_bytes() == src.read_bytes()
+
+
 @pytest.mark.asyncio
 async def test_sandbox_error_handling():
     """Tests error handling with invalid configuration."""
@@ -134,5 +134,55 @@ async def test_manager_cleanup(manager):
     assert not manager._last_used
 
 
+@pytest.mark.asyncio
+async def test_warm_pool(manager):
+    """Tests handing out sandboxes from the warm pool."""
+    manager.warm_pool_size = 1
+    await manager.warm_up()
+    assert manager.get_stats()["warm_sandboxes"] == 1
+
+    sandbox_id = await manager.create_sandbox()
+    assert sandbox_id in manager._sandboxes
+    sandbox = await manager.get_sandbox(sandbox_id)
+    result = await sandbox.run_command("echo 'warm'")
+    assert result.strip() == "warm"
+
+    # The pool is refilled in the background
+    await asyncio.wait(manager._refill_tasks.values(), timeout=60)
+    assert manager.get_stats()["warm_sandboxes"] == 1
+
+
+@pytest.mark.asyncio
+async def test_idle_warm_sandbox_recycled(manager):
+    """Tests that idle pooled sandboxes are replaced by fresh ones."""
+    manager.warm_pool_size = 1
+    await manager.warm_up()
+    pooled = next(iter(manager._warm_pool.values()))[0][0]
+
+    manager.idle_timeout = 0.1
+    await asyncio.sleep(0.2)
+    await manager._cleanup_idle_sandboxes()
+    await asyncio.wait(manager._refill_tasks.values(), timeout=60)
+
+    refilled = next(iter(manager._warm_pool.values()))[0][0]
+    assert refilled is not pooled
+    assert pooled.container is None
+
+
+@pytest.mark.asyncio
+async def test_evicted_warm_sandbox_cleaned_up(manager):
+    """Tests that a pooled sandbox evicted for a request is removed by cleanup."""
+    manager.warm_pool_size = 1
+    manager.max_sandboxes = 1
+    await manager.warm_up()
+    pooled = next(iter(manager._warm_pool.values()))[0][0]
+
+    await manager.create_sandbox(volume_bindings={tempfile.gettempdir(): "/data"})
+
+    await manager.cleanup()
+    assert not manager._eviction_tasks
+    assert pooled.container is None
+
+
 if __name__ == "__main__":
     pytest.main(["-v", __file__])
@@ -0,0 +1,209 @@
+import asyncio
+import subprocess
+import sys
+import time
+from types import SimpleNamespace
+
+import psutil
+import pytest
+
+from app.tool.browser_pool import BrowserPool, _PooledBrowser
+
+
+class FakePage:
+    def __init__(self):
+        self.url = "https://example.com"
+        self.closed = False
+
+    async def goto(self, url):
+        self.url = url
+
+    async def close(self):
+        self.closed = True
+
+
+class FakePlaywrightContext:
+    def __init__(self):
+        self.pages = [FakePage(), FakePage()]
+        self.cookies_cleared = False
+
+    async def clear_cookies(self):
+        self.cookies_cleared = True
+
+
+class FakeSession:
+    def __init__(self):
+        self.context = FakePlaywrightContext()
+        self.cached_state = object()
+
+
+class FakeContext:
+    def __init__(self, browser):
+        self.browser = browser
+        self.session = FakeSession()
+        self.closed = False
+
+    async def close(self):
+        self.closed = True
+
+
+class FakeBrowser:
+    def __init__(self):
+        self.contexts = []
+        self.closed = False
+
+    async def new_context(self, config=None):
+        context = FakeContext(self)
+        self.contexts.append(context)
+        return context
+
+    async def close(self):
+        self.closed = True
+
+
+class FakeBrowserPool(BrowserPool):
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.launched = []
+
+    def _new_browser(self):
+        browser = FakeBrowser()
+        self.launched.append(browser)
+        return browser
+
+
+@pytest.mark.asyncio
+async def test_released_context_is_reset_and_reused():
+    """Tests that a released context is cleaned and leased again."""
+    pool = FakeBrowserPool()
+
+    lease = await pool.acquire()
+    context = lease.context
+    await lease.release()
+
+    session = context.session
+    assert session.context.cookies_cleared
+    assert session.context.pages[0].url == "about:blank"
+    assert session.context.pages[1].closed
+    assert session.cached_state is None
+
+    again = await pool.acquire()
+    assert again.context is context
+    assert len(pool.launched) == 1
+    assert pool.get_stats()["contexts_reused"] == 1
+
+
+@pytest.mark.asyncio
+async def test_concurrent_leases_get_isolated_contexts_on_one_browser():
+    """Tests that concurrent leases share a browser but not a context."""
+    pool = FakeBrowserPool(max_contexts=3)
+
+    leases = await asyncio.gather(*(pool.acquire() for _ in range(3)))
+
+    assert len({id(lease.context) for lease in leases}) == 3
+    assert len(pool.launched) == 1
+    assert pool.get_stats()["active_contexts"] == 3
+
+
+@pytest.mark.asyncio
+async def test_acquire_waits_for_a_free_context_slot():
+    """Tests that max_contexts caps the number of leased contexts."""
+    pool = FakeBrowserPool(max_contexts=1)
+    first = await pool.acquire()
+
+    waiting = asyncio.create_task(pool.acquire())
+    await asyncio.sleep(0.01)
+    assert not waiting.done()
+
+    await first.release()
+    second = await asyncio.wait_for(waiting, 1)
+    assert second.context is first.context
+
+
+@pytest.mark.asyncio
+async def test_context_recycled_after_page_limit():
+    """Tests that a context which served too many pages is closed."""
+    pool = FakeBrowserPool(context_max_pages=2)
+
+    lease = await pool.acquire()
+    lease.record_page(2)
+    context = lease.context
+    await lease.release()
+
+    assert context.closed
+    assert (await pool.acquire()).context is not context
+    assert not pool.launched[0].closed
+
+
+@pytest.mark.asyncio
+async def test_browser_retired_when_memory_limit_exceeded(monkeypatch):
+    """Tests that browsers over the memory limit are relaunched."""
+    pool = FakeBrowserPool(max_memory_mb=100)
+    monkeypatch.setattr(BrowserPool, "memory_usage_mb", lambda self: 500)
+
+    lease = await pool.acquire()
+    other = await pool.acquire()
+    await lease.release()
+
+    # The browser still serves a lease, so it is only closed after that ends
+    assert lease.context.closed
+    assert not pool.launched[0].closed
+
+    await other.release()
+    assert pool.launched[0].closed
+
+    monkeypatch.setattr(BrowserPool, "memory_usage_mb", lambda self: 50)
+    await pool.acquire()
+    assert len(pool.launched) == 2
+
+
+@pytest.mark.asyncio
+async def test_close_shuts_down_browsers_with_active_leases():
+    """Tests that closing the pool closes browsers and late releases."""
+    pool = FakeBrowserPool()
+    lease = await pool.acquire()
+
+    await pool.close()
+    assert pool.launched[0].closed
+
+    await lease.release()
+    assert lease.context.closed
+    assert pool.get_stats()["browsers"] == 0
+
+
+def test_memory_counts_only_browser_process_trees():
+    """Tests that other children, such as Python workers, are not counted."""
+    sleep = "import time; time.sleep(30)"
+    driver = subprocess.Popen(
+        [
+            sys.executable,
+            "-c",
+            f"import subprocess, sys; subprocess.run([sys.executable, '-c', {sleep!r}])",
+        ]
+    )
+    worker = subprocess.Popen([sys.executable, "-c", sleep])
+    try:
+        transport = SimpleNamespace(_proc=SimpleNamespace(pid=driver.pid))
+        browser = FakeBrowser()
+        browser.playwright = SimpleNamespace(
+            _impl_obj=SimpleNamespace(_connection=SimpleNamespace(_transport=transport))
+        )
+        pool = BrowserPool()
+        pool._browsers.append(_PooledBrowser(browser))
+
+        for _ in range(50):
+            pids = pool._browser_pids()
+            if len(pids) == 2:
+                break
+            time.sleep(0.1)
+
+        assert driver.pid in pids
+        assert worker.pid not in pids
+        assert len(pids) == 2
+        assert pool.memory_usage_mb() > 0
+    finally:
+        for child in psutil.Process(driver.pid).children(recursive=True):
+            child.kill()
+        for process in (driver, worker):
+            process.kill()
+            process.wait()
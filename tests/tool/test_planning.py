@@ -0,0 +1,142 @@
+import random
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from app.exceptions import ToolError
+from app.tool import PlanningTool
+from app.tool.planning import PlanStore
+
+
+STEPS = ["fetch a", "fetch b", "merge", "report"]
+
+
+@pytest.mark.asyncio
+async def test_ready_steps_follow_dependencies():
+    """Tests that only steps with completed dependencies are ready."""
+    tool = PlanningTool(plans={})
+    await tool.execute(
+        command="create",
+        plan_id="plan",
+        title="Plan",
+        steps=STEPS,
+        step_dependencies=[[], [], [0, 1], [2]],
+    )
+    assert tool.get_ready_steps("plan") == [0, 1]
+
+    await tool.execute(
+        command="mark_step", plan_id="plan", step_index=0, step_status="completed"
+    )
+    assert tool.get_ready_steps("plan") == [1]
+
+    await tool.execute(
+        command="mark_step", plan_id="plan", step_index=1, step_status="completed"
+    )
+    assert tool.get_ready_steps("plan") == [2]
+
+
+@pytest.mark.asyncio
+async def test_plans_without_dependencies_run_in_order():
+    """Tests that a plan without dependencies is a sequential chain."""
+    tool = PlanningTool(plans={})
+    await tool.execute(command="create", plan_id="plan", title="Plan", steps=STEPS)
+
+    assert "step_dependencies" not in tool.plans["plan"]
+    assert tool.get_ready_steps("plan") == [0]
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "dependencies",
+    [
+        [[], [0], [1, 3], [2]],  # cycle
+        [[0], [], [], []],  # self dependency
+        [[], [7], [], []],  # unknown step
+        [[]] * 5,  # more entries than steps
+    ],
+)
+async def test_invalid_dependencies_are_rejected(dependencies):
+    """Tests that cycles and bad indices raise a ToolError."""
+    tool = PlanningTool(plans={})
+    with pytest.raises(ToolError):
+        await tool.execute(
+            command="create",
+            plan_id="plan",
+            title="Plan",
+            steps=STEPS,
+            step_dependencies=dependencies,
+        )
+    assert "plan" not in tool.plans
+
+
+@pytest.mark.asyncio
+async def test_update_drops_dependencies_of_changed_steps():
+    """Tests that editing steps keeps dependencies of unchanged steps only."""
+    tool = PlanningTool(plans={})
+    await tool.execute(
+        command="create",
+        plan_id="plan",
+        title="Plan",
+        steps=STEPS,
+        step_dependencies=[[], [0], [1], [2]],
+    )
+    await tool.execute(
+        command="update", plan_id="plan", steps=["fetch a", "fetch b", "other"]
+    )
+
+    assert tool.plans["plan"]["step_dependencies"] == [[], [0], []]
+
+
+@pytest.mark.asyncio
+async def test_current_step_is_indexed_without_formatting(monkeypatch):
+    """Tests that the current step follows marks without rendering plans."""
+    tool = PlanningTool(plans={})
+    await tool.execute(command="create", plan_id="plan", title="Plan", steps=STEPS)
+    monkeypatch.setattr(
+        PlanningTool, "_format_plan", lambda *args: pytest.fail("plan was formatted")
+    )
+    plans = tool.plans
+
+    assert plans.start_current_step("plan") == 0
+    assert tool.plans["plan"]["step_statuses"][0] == "in_progress"
+    plans.mark_step("plan", 0, "completed")
+    plans.mark_step("plan", 1, "blocked")
+    assert plans.current_step("plan") == 2
+
+    plans.mark_step("plan", 1, "not_started")
+    assert plans.current_step("plan") == 1
+
+    for index in range(len(STEPS)):
+        plans.mark_step("plan", index, "completed")
+    assert plans.current_step("plan") is None
+
+
+def test_concurrent_marks_from_threads_are_all_applied():
+    """Tests that marks of one plan from many threads keep the index right."""
+    steps = [f"step {i}" for i in range(200)]
+    plans = PlanStore({"plan": {"plan_id": "plan", "title": "Plan", "steps": steps}})
+    order = list(range(len(steps)))
+    random.Random(0).shuffle(order)
+
+    # Complete every step except 50, in random order, from many threads
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        list(
+            pool.map(
+                lambda i: plans.mark_step("plan", i, "completed"),
+                [i for i in order if i != 50],
+            )
+        )
+
+    statuses = plans["plan"]["step_statuses"]
+    assert statuses.count("completed") == len(steps) - 1
+    assert plans.current_step("plan") == 50
+
+
+@pytest.mark.asyncio
+async def test_tools_do_not_share_plans():
+    """Tests that each planning tool has its own plan store."""
+    first, second = PlanningTool(), PlanningTool()
+    await first.execute(command="create", plan_id="plan", title="Plan", steps=STEPS)
+
+    assert "plan" in first.plans
+    assert "plan" not in second.plans
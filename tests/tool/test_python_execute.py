@@ -0,0 +1,95 @@
+import asyncio
+
+import pytest
+
+from app.tool.python_execute import PythonExecute, PythonWorkerPool, get_worker_pool
+
+
+@pytest.mark.asyncio
+async def test_execute_captures_output():
+    """Tests that printed output is returned from a pooled worker."""
+    result = await PythonExecute().execute("print(sum(range(10)))")
+
+    assert result == {"observation": "45\n", "success": True}
+
+
+@pytest.mark.asyncio
+async def test_pooled_calls_do_not_share_globals():
+    """Tests that pooled executions start with fresh globals."""
+    tool = PythonExecute()
+    await tool.execute("value = 1")
+    result = await tool.execute("print(value)")
+
+    assert result["success"] is False
+    assert "value" in result["observation"]
+
+
+@pytest.mark.asyncio
+async def test_timeout_replaces_worker():
+    """Tests that a timed-out worker is killed and the pool keeps working."""
+    tool = PythonExecute()
+    result = await tool.execute("while True: pass", timeout=1)
+
+    assert result == {
+        "observation": "Execution timeout after 1 seconds",
+        "success": False,
+    }
+    assert (await tool.execute("print('ok')"))["observation"] == "ok\n"
+    assert all(worker.alive for worker in get_worker_pool()._idle)
+
+
+@pytest.mark.asyncio
+async def test_workers_recycled_after_max_executions():
+    """Tests that workers are replaced after max_executions runs."""
+    pool = PythonWorkerPool(size=1, max_executions=2)
+    try:
+        pids = []
+        for _ in range(4):
+            result = await pool.run("import os; print(os.getpid())", 5, 1000)
+            pids.append(result["observation"])
+
+        assert pids[0] == pids[1]
+        assert pids[1] != pids[2]
+        assert pids[2] == pids[3]
+    finally:
+        pool.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_output_is_bounded():
+    """Tests that large output is truncated to max_output characters."""
+    tool = PythonExecute(max_output=100)
+    result = await tool.execute("print('x' * 10000)")
+
+    assert result["success"] is True
+    assert result["observation"] == "x" * 100 + "\n... [output truncated]"
+
+
+@pytest.mark.asyncio
+async def test_session_mode_keeps_globals():
+    """Tests that session mode keeps variables between calls."""
+    tool = PythonExecute(session_mode=True)
+    try:
+        await tool.execute("import math\nvalue = math.sqrt(16)")
+        result = await tool.execute("print(value)")
+
+        assert result == {"observation": "4.0\n", "success": True}
+    finally:
+        await tool.cleanup()
+
+
+@pytest.mark.asyncio
+async def test_session_mode_serializes_concurrent_calls():
+    """Tests that concurrent calls on one session each get their own result."""
+    tool = PythonExecute(session_mode=True)
+    try:
+        results = await asyncio.gather(
+            *(
+                tool.execute(f"import time\ntime.sleep(0.05)\nprint({i})")
+                for i in range(3)
+            )
+        )
+
+        assert [result["observation"] for result in results] == ["0\n", "1\n", "2\n"]
+    finally:
+        await tool.cleanup()
@@ -0,0 +1,59 @@
+import io
+
+from PIL import Image, ImageDraw
+
+from app.tool.screenshot import changed_pixels, compress_screenshot
+
+
+def make_page(width=1600, height=1000, boxes=(), text=None):
+    image = Image.new("RGB", (width, height), "white")
+    draw = ImageDraw.Draw(image)
+    for box in boxes:
+        draw.rectangle(box, fill="black")
+    # An input field, optionally with something typed into it
+    draw.rectangle((200, 600, 700, 640), outline="gray")
+    if text:
+        draw.text((210, 612), text, fill="black")
+    buffer = io.BytesIO()
+    image.save(buffer, format="JPEG", quality=100)
+    return buffer.getvalue()
+
+
+def test_screenshot_downscaled_to_max_dimension():
+    """Tests that screenshots are shrunk to fit while keeping aspect ratio."""
+    raw = make_page(boxes=[(100, 100, 400, 300)])
+
+    shot = compress_screenshot(raw, max_dimension=800, quality=60)
+
+    assert (shot.width, shot.height) == (800, 500)
+    assert len(shot.data) < len(raw)
+    with Image.open(io.BytesIO(shot.data)) as image:
+        assert image.size == (800, 500)
+
+
+def test_small_screenshot_keeps_its_size():
+    """Tests that images within the limit are not upscaled."""
+    shot = compress_screenshot(make_page(640, 480), max_dimension=1280)
+
+    assert (shot.width, shot.height) == (640, 480)
+
+
+def test_fingerprint_ignores_reencoding():
+    """Tests that compressing the same page differently counts as unchanged."""
+    page = make_page(boxes=[(100, 100, 400, 300)])
+    same = compress_screenshot(page, quality=90)
+    reencoded = compress_screenshot(page, quality=40)
+
+    assert changed_pixels(same.fingerprint, reencoded.fingerprint) == 0
+
+
+def test_fingerprint_detects_small_changes():
+    """Tests that typed text and a ticked checkbox count as changes."""
+    before = compress_screenshot(make_page(boxes=[(100, 100, 400, 300)]))
+    typed = compress_screenshot(make_page(boxes=[(100, 100, 400, 300)], text="hi"))
+    ticked = compress_screenshot(
+        make_page(boxes=[(100, 100, 400, 300), (800, 610, 812, 622)])
+    )
+
+    assert changed_pixels(before.fingerprint, typed.fingerprint) > 0
+    assert changed_pixels(before.fingerprint, ticked.fingerprint) > 0
@@ -0,0 +1,201 @@
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs, urlparse
+
+import httpx
+import pytest
+
+from app.tool.search import BaiduSearchEngine, BingSearchEngine
+from app.tool.search.http_client import close_http_client
+
+
+BING_PAGES = 3
+PAGE_DELAY = 0.2
+
+
+def bing_page(first: int) -> str:
+    page = (first - 1) // 10
+    items = "".join(
+        f'<li class="b_algo"><h2><a href="https://example.com/{page}/{i}">'
+        f"Result {page}-{i}</a></h2><p>Abstract {page}-{i}</p></li>"
+        for i in range(10)
+    )
+    next_link = (
+        f'<a title="Next page" href="/search?q=x&first={first + 10}">Next</a>'
+        if page < BING_PAGES - 1
+        else ""
+    )
+    return f'<html><body><ol id="b_results">{items}</ol>{next_link}</body></html>'
+
+
+def baidu_page(offset: int) -> str:
+    items = "".join(
+        f'<div class="result c-container"><h3><a href="https://example.cn/{offset + i}">'
+        f'Title {offset + i}</a></h3><div class="c-abstract">Abstract {offset + i}</div></div>'
+        for i in range(10)
+    )
+    return (
+        f'<html><body><div id="content_left">{items}</div>'
+        f'<a class="n" href="/s?pn={offset + 10}">下一页</a></body></html>'
+    )
+
+
+class FixtureHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        url = urlparse(self.path)
+        params = parse_qs(url.query)
+        with self.server.lock:
+            self.server.in_flight += 1
+            self.server.max_in_flight = max(
+                self.server.max_in_flight, self.server.in_flight
+            )
+        time.sleep(PAGE_DELAY)
+        with self.server.lock:
+            self.server.in_flight -= 1
+        self.server.requests.append(self.path)
+        offset = int(params["first" if url.path == "/search" else "pn"][0])
+        if offset in self.server.failing:
+            self.send_error(503)
+            return
+        if url.path == "/search":
+            body = bing_page(offset)
+        else:
+            body = baidu_page(offset)
+        data = body.encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def fixture_server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), FixtureHandler)
+    server.requests = []
+    server.failing = set()  # Page offsets answered with 503
+    server.lock = threading.Lock()
+    server.in_flight = 0
+    server.max_in_flight = 0
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server, f"http://127.0.0.1:{server.server_port}"
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.mark.asyncio
+async def test_bing_fetches_pages_concurrently(fixture_server):
+    """Tests that Bing result pages are fetched in parallel over the pool."""
+    server, url = fixture_server
+    engine = BingSearchEngine()
+    engine.host_url = url
+
+    results = await engine.perform_search_async("x", num_results=25)
+    await close_http_client()
+
+    assert len(server.requests) == 3
+    assert server.max_in_flight == 3
+    assert results[0] == "https://example.com/0/0"
+    assert results[-1] == "https://example.com/2/4"
+    assert len(results) == 25
+
+
+@pytest.mark.asyncio
+async def test_bing_stops_at_last_page(fixture_server):
+    """Tests that pages past the last real page are not used."""
+    server, url = fixture_server
+    engine = BingSearchEngine()
+    engine.host_url = url
+
+    results = await engine.perform_search_async("x", num_results=50)
+    await close_http_client()
+
+    assert len(results) == BING_PAGES * 10
+    assert len(set(results)) == len(results)
+
+
+@pytest.mark.asyncio
+async def test_bing_tolerates_partial_page_failures(fixture_server):
+    """Tests that a failing page only drops that page's results."""
+    server, url = fixture_server
+    server.failing = {11}
+    engine = BingSearchEngine()
+    engine.host_url = url
+
+    results = await engine.perform_search_async("x", num_results=20)
+    await close_http_client()
+
+    assert results == [f"https://example.com/0/{i}" for i in range(10)]
+
+
+@pytest.mark.asyncio
+async def test_outage_raises_instead_of_returning_no_results(fixture_server):
+    """Tests that engines report a failure when every page fails to load."""
+    server, url = fixture_server
+    server.failing = {1, 11, 0, 10}
+    bing = BingSearchEngine()
+    bing.host_url = url
+    baidu = BaiduSearchEngine()
+    baidu.host_url = url
+
+    with pytest.raises(httpx.HTTPStatusError):
+        await bing.perform_search_async("x", num_results=20)
+    with pytest.raises(httpx.HTTPStatusError):
+        await baidu.perform_search_async("x", num_results=20)
+    await close_http_client()
+
+
+@pytest.mark.asyncio
+async def test_baidu_async_search_keeps_result_format(fixture_server):
+    """Tests that async Baidu results use the baidusearch dict format."""
+    server, url = fixture_server
+    engine = BaiduSearchEngine()
+    engine.host_url = url
+
+    results = await engine.perform_search_async("x", num_results=15)
+    await close_http_client()
+
+    assert len(server.requests) == 2
+    assert results[0] == {
+        "title": "Title 0",
+        "abstract": "Abstract 0",
+        "url": "https://example.cn/0",
+        "rank": 1,
+    }
+    assert [result["rank"] for result in results] == list(range(1, 16))
+
+
+FIXTURES = Path(__file__).resolve().parent / "fixtures"
+
+
+# Saved result pages; any bing_*.html added here is checked as well
+SAVED_BING_PAGES = sorted(path.name for path in FIXTURES.glob("bing_*.html"))
+
+
+@pytest.mark.parametrize("page", SAVED_BING_PAGES)
+def test_fast_bing_parser_matches_beautifulsoup(page):
+    """Tests that the streaming parser returns what BeautifulSoup returns."""
+    html = (FIXTURES / page).read_bytes()
+    engine = BingSearchEngine()
+
+    fast = engine._parse_results_fast(html, rank_start=5)
+    soup = engine._parse_results_soup(html, rank_start=5)
+
+    assert fast == soup
+    assert fast[0]
+    assert fast[0][0]["rank"] == 6
+
+
+def test_fast_bing_parser_without_results_list():
+    """Tests that a page without the results list yields no results."""
+    html = (
+        b'<html><body><li class="b_algo"><h2><a href="x">t</a></h2></li></body></html>'
+    )
+
+    assert BingSearchEngine()._parse_results(html) == ([], None)
@@ -0,0 +1,210 @@
+import time
+
+import pytest
+
+from app.config import SearchSettings
+from app.tool import web_search
+from app.tool.search import WebSearchEngine
+from app.tool.web_search import SearchCache, WebSearch
+
+
+class FakeEngine(WebSearchEngine):
+    def __init__(self, delay: float = 0.0, results=None, error: bool = False):
+        self.delay = delay
+        self.results = results or []
+        self.error = error
+        self.calls = 0
+
+    def perform_search(self, query, num_results=10, *args, **kwargs):
+        self.calls += 1
+        time.sleep(self.delay)
+        if self.error:
+            raise RuntimeError("429 Too Many Requests")
+        return self.results
+
+
+class FakeConfig:
+    def __init__(self, **settings):
+        self.search_config = SearchSettings(**settings)
+
+
+@pytest.fixture
+def search(monkeypatch):
+    WebSearch.engine_stats.clear()
+    monkeypatch.setattr(WebSearch, "search_cache", SearchCache())
+    tool = WebSearch()
+    tool._search_engine = {
+        "google": FakeEngine(delay=0.5, results=["https://slow.example"]),
+        "duckduckgo": FakeEngine(delay=0.01, results=["https://fast.example"]),
+        "baidu": FakeEngine(error=True),
+    }
+    yield tool
+    WebSearch.engine_stats.clear()
+
+
+def use_config(monkeypatch, **settings):
+    settings.setdefault("engine", "google")
+    settings.setdefault("fallback_engines", ["duckduckgo", "baidu"])
+    monkeypatch.setattr(web_search, "config", FakeConfig(**settings))
+
+
+@pytest.mark.asyncio
+async def test_hedge_delay_starts_fallback_for_slow_engine(search, monkeypatch):
+    """Tests that a fallback started after the hedge delay can win."""
+    use_config(monkeypatch, hedged=True, hedge_delay=0.05)
+
+    start = time.monotonic()
+    links = await search.execute("query")
+
+    assert links == ["https://fast.example"]
+    assert time.monotonic() - start < 0.4
+
+
+@pytest.mark.asyncio
+async def test_failure_starts_next_engine_immediately(search, monkeypatch):
+    """Tests that a failing engine triggers the next one without waiting."""
+    use_config(
+        monkeypatch,
+        engine="baidu",
+        fallback_engines=["duckduckgo"],
+        hedged=True,
+        hedge_delay=10,
+    )
+
+    start = time.monotonic()
+    links = await search.execute("query")
+
+    assert links == ["https://fast.example"]
+    assert time.monotonic() - start < 1
+    assert search._search_engine["baidu"].calls == 1
+
+
+@pytest.mark.asyncio
+async def test_all_engines_failing_returns_empty(search, monkeypatch):
+    """Tests that hedged search gives up once every engine has failed."""
+    use_config(
+        monkeypatch,
+        engine="baidu",
+        fallback_engines=[],
+        hedged=True,
+        max_retries=0,
+    )
+
+    assert await search.execute("query") == []
+    assert WebSearch.engine_stats["baidu"].errors == 1
+
+
+def test_engine_order_follows_observed_stats(search, monkeypatch):
+    """Tests that measured fast, reliable engines move to the front."""
+    use_config(monkeypatch)
+    assert search._get_engine_order() == ["google", "duckduckgo", "baidu"]
+
+    for _ in range(3):
+        WebSearch._get_engine_stats("google").record(2.0, True)
+        WebSearch._get_engine_stats("duckduckgo").record(0.2, True)
+        WebSearch._get_engine_stats("baidu").record(0.1, False)
+
+    assert search._get_engine_order() == ["duckduckgo", "google", "baidu"]
+
+    use_config(monkeypatch, adaptive_order=False)
+    assert search._get_engine_order() == ["google", "duckduckgo", "baidu"]
+
+
+def test_query_normalization_folds_trivial_differences():
+    """Tests that case, punctuation and whitespace don't change the key."""
+    assert SearchCache.make_key("google", "What's the  Weather,\tin Paris?", 10) == (
+        SearchCache.make_key("Google", "what s the weather in paris", 10)
+    )
+    assert SearchCache.make_key("google", "paris", 10) != SearchCache.make_key(
+        "google", "paris", 5
+    )
+
+
+@pytest.mark.asyncio
+async def test_repeated_search_is_served_from_cache(search, monkeypatch):
+    """Tests that a trivially different repeat query skips the engine."""
+    use_config(monkeypatch, engine="duckduckgo", fallback_engines=[])
+    engine = search._search_engine["duckduckgo"]
+
+    first = await search.execute("Python asyncio tutorial")
+    second = await search.execute("  python, asyncio TUTORIAL ")
+
+    assert first == second == ["https://fast.example"]
+    assert engine.calls == 1
+    assert WebSearch.search_cache.get_stats()["hits"] == 1
+
+
+def test_lookup_across_engines_counts_once():
+    """Tests that a lookup checking several engines is one hit or miss."""
+    cache = SearchCache()
+    engines = ["google", "bing", "duckduckgo"]
+
+    assert cache.get_first(engines, "query", 10) is None
+    cache.set("bing", "query", 10, ["https://a.example"])
+    assert cache.get_first(engines, "query", 10) == ("bing", ["https://a.example"])
+
+    stats = cache.get_stats()
+    assert (stats["hits"], stats["misses"]) == (1, 1)
+
+
+@pytest.mark.asyncio
+async def test_failed_engine_is_negatively_cached(search, monkeypatch):
+    """Tests that an engine that just failed is skipped for the same query."""
+    use_config(monkeypatch, engine="baidu", fallback_engines=["duckduckgo"])
+    baidu = search._search_engine["baidu"]
+    monkeypatch.setattr(
+        WebSearch, "_perform_search_with_engine", WebSearch._search_with_engine
+    )
+
+    await search.execute("query")
+    WebSearch.search_cache._entries.pop(SearchCache.make_key("duckduckgo", "query", 10))
+    await search.execute("query")
+
+    assert baidu.calls == 1
+    assert search._search_engine["duckduckgo"].calls == 2
+
+
+@pytest.mark.asyncio
+async def test_retry_tries_engines_that_all_failed(search, monkeypatch):
+    """Tests that a retry runs again when every engine is negatively cached."""
+    use_config(
+        monkeypatch,
+        engine="baidu",
+        fallback_engines=[],
+        max_retries=1,
+        retry_delay=0,
+    )
+    monkeypatch.setattr(
+        WebSearch, "_perform_search_with_engine", WebSearch._search_with_engine
+    )
+
+    assert await search.execute("query") == []
+    assert search._search_engine["baidu"].calls == 2
+
+
+def test_entries_expire_after_ttl(monkeypatch):
+    """Tests that entries are not served past their TTL."""
+    cache = SearchCache(ttl=10)
+    cache.set("google", "query", 10, ["https://a.example"])
+    assert cache.get("google", "query", 10) == ["https://a.example"]
+
+    now = time.time()
+    monkeypatch.setattr(time, "time", lambda: now + 11)
+    assert cache.get("google", "query", 10) is None
+
+
+def test_sqlite_tier_is_shared_across_instances(tmp_path):
+    """Tests that the SQLite tier serves results to a fresh cache."""
+    path = tmp_path / "search.sqlite"
+    first = SearchCache(path=path)
+    first.set("google", "query", 10, ["https://a.example"])
+    first.set_failed("bing", "query", 10)
+    first.close()
+
+    second = SearchCache(path=path)
+    try:
+        assert second.get("google", "query", 10) == ["https://a.example"]
+        assert second.is_failing("bing", "query", 10)
+        assert len(second) == 2
+    finally:
+        second.close()
@@ -0,0 +1,114 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from app import web_app
+from app.admission import AdmissionQueue, AdmissionRejected
+
+
+def test_admits_up_to_limit_then_queues_fifo():
+    """Tests that queued requests are admitted in arrival order."""
+    queue = AdmissionQueue("test", max_concurrent=1, max_queue=4, timeout=5)
+    queue.acquire()
+    order = []
+
+    def worker(i):
+        queue.acquire()
+        order.append(i)
+        queue.release()
+
+    threads = []
+    for i in range(3):
+        thread = threading.Thread(target=worker, args=(i,))
+        thread.start()
+        threads.append(thread)
+        # Wait until the worker is queued so arrival order is deterministic
+        while queue.get_stats()["queued"] < i + 1:
+            time.sleep(0.001)
+
+    queue.release()
+    for thread in threads:
+        thread.join()
+
+    assert order == [0, 1, 2]
+    stats = queue.get_stats()
+    assert stats["active"] == 0
+    assert stats["admitted"] == 4
+    assert stats["wait_max"] > 0
+
+
+def test_rejects_when_queue_full():
+    """Tests that requests beyond the queue bound are rejected at once."""
+    queue = AdmissionQueue("test", max_concurrent=1, max_queue=0)
+    queue.acquire()
+
+    with pytest.raises(AdmissionRejected) as exc_info:
+        queue.acquire()
+
+    assert exc_info.value.reason == "queue_full"
+    assert queue.get_stats()["rejected"] == 1
+
+
+def test_times_out_after_deadline():
+    """Tests that a queued request is dropped once its deadline passes."""
+    queue = AdmissionQueue("test", max_concurrent=1, max_queue=1, timeout=0.05)
+    queue.acquire()
+
+    with pytest.raises(AdmissionRejected) as exc_info:
+        queue.acquire()
+
+    assert exc_info.value.reason == "timeout"
+    stats = queue.get_stats()
+    assert stats["queued"] == 0
+    assert stats["timed_out"] == 1
+
+
+@pytest.mark.asyncio
+async def test_async_waiters_share_the_queue():
+    """Tests that async waiters are admitted when a thread releases."""
+    queue = AdmissionQueue("test", max_concurrent=1, max_queue=2, timeout=5)
+    queue.acquire()
+
+    waiter = asyncio.create_task(queue.acquire_async())
+    await asyncio.sleep(0.01)
+    assert not waiter.done()
+
+    threading.Thread(target=queue.release).start()
+    await asyncio.wait_for(waiter, 1)
+    assert queue.get_stats()["active"] == 1
+
+
+@pytest.mark.asyncio
+async def test_cancelled_async_waiter_leaves_queue():
+    """Tests that cancelling a queued async waiter frees its queue spot."""
+    queue = AdmissionQueue("test", max_concurrent=1, max_queue=1, timeout=5)
+    queue.acquire()
+
+    waiter = asyncio.create_task(queue.acquire_async())
+    await asyncio.sleep(0.01)
+    waiter.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await waiter
+
+    assert queue.get_stats()["queued"] == 0
+    queue.release()
+    assert queue.get_stats()["active"] == 0
+
+
+def test_slot_released_when_handler_raises(monkeypatch):
+    """Tests that a failing heavy route gives its admission slot back."""
+
+    def failing_upload():
+        raise RuntimeError("boom")
+
+    monkeypatch.setitem(web_app.app.view_functions, "upload_file", failing_upload)
+    client = web_app.app.test_client()
+
+    for _ in range(3):
+        assert client.post("/api/upload").status_code == 500
+
+    stats = client.get("/api/system/admission").get_json()
+    assert stats["upload"]["active"] == 0
+    assert stats["upload"]["admitted"] >= 3
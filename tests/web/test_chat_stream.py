@@ -0,0 +1,135 @@
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app import web_app
+from app.schema import Message, ToolCall
+from app.web_server import asgi_app
+
+
+def parse_sse(body: str):
+    return [
+        json.loads(line[len("data: ") :])
+        for line in body.splitlines()
+        if line.startswith("data: ")
+    ]
+
+
+class FakeAgent:
+    """Stands in for Manus: writes a tool round trip into memory."""
+
+    def __init__(self, memory):
+        self.memory = memory
+        self.available_tools = []
+
+    async def run(self, request: str) -> str:
+        self.memory.add_message(Message.user_message(request))
+        call = ToolCall(
+            id="call_1", function={"name": "python_execute", "arguments": "{}"}
+        )
+        self.memory.add_message(
+            Message(role="assistant", content="Let me check", tool_calls=[call])
+        )
+        self.memory.add_message(
+            Message.tool_message("42", name="python_execute", tool_call_id="call_1")
+        )
+        self.memory.add_message(Message.assistant_message("The answer is 42"))
+        return "Step 1: done"
+
+
+@pytest.fixture
+def client(monkeypatch):
+    async def fake_generate_response(message, model_id="default", context=None):
+        return f"echo: {message}"
+
+    monkeypatch.setattr(web_app, "generate_response", fake_generate_response)
+    monkeypatch.setattr(web_app, "lightweight_mode", False)
+    with TestClient(asgi_app) as client:
+        yield client
+
+
+def test_chat_mode_streams_message_and_done(client):
+    """Tests that chat mode streams a single answer followed by done."""
+    response = client.post("/api/chat/stream", json={"message": "hi", "mode": "chat"})
+
+    assert response.headers["content-type"].startswith("text/event-stream")
+    events = parse_sse(response.text)
+    assert [event["type"] for event in events] == ["message", "done"]
+    assert events[0]["content"] == "echo: hi"
+
+
+def test_agent_mode_streams_tool_events(client, monkeypatch):
+    """Tests that agent memory updates are streamed as chat events."""
+    import app.agent.manus
+
+    monkeypatch.setattr(web_app, "init_llm", lambda: object())
+    monkeypatch.setattr(app.agent.manus, "Manus", FakeAgent)
+
+    response = client.post("/api/chat/stream", json={"message": "what is 6*7?"})
+
+    events = parse_sse(response.text)
+    assert [event["type"] for event in events] == [
+        "thought",
+        "tool_call",
+        "tool_result",
+        "message",
+        "done",
+    ]
+    assert events[1]["name"] == "python_execute"
+    assert events[2]["content"] == "42"
+    assert events[-1]["result"] == "Step 1: done"
+
+
+def test_agent_mode_streams_tokens_before_message(client, monkeypatch):
+    """Tests that response text reaches the client while it is generated."""
+    import app.agent.manus
+    from app.streaming import get_stream_sink
+
+    class StreamingAgent(FakeAgent):
+        async def run(self, request: str) -> str:
+            sink = get_stream_sink()
+            for text in ["The answer", " is 42"]:
+                await sink.on_token(text)
+            await sink.on_end("The answer is 42")
+            self.memory.add_message(Message.assistant_message("The answer is 42"))
+            return "Step 1: done"
+
+    monkeypatch.setattr(web_app, "init_llm", lambda: object())
+    monkeypatch.setattr(app.agent.manus, "Manus", StreamingAgent)
+
+    response = client.post("/api/chat/stream", json={"message": "what is 6*7?"})
+
+    events = parse_sse(response.text)
+    assert [event["type"] for event in events] == [
+        "token",
+        "token",
+        "message",
+        "done",
+    ]
+    assert events[1]["content"] == " is 42"
+
+
+def test_streams_have_their_own_admission_limit(client):
+    """Tests that streaming chats don't take slots of the blocking chat route."""
+    before = client.get("/api/system/admission").json()
+    client.post("/api/chat/stream", json={"message": "hi", "mode": "chat"})
+
+    stats = client.get("/api/system/admission").json()
+    assert stats["chat_stream"]["admitted"] == before["chat_stream"]["admitted"] + 1
+    assert stats["chat"]["admitted"] == before["chat"]["admitted"]
+    assert stats["chat_stream"]["max_concurrent"] > stats["chat"]["max_concurrent"]
+
+
+def test_stream_rejects_missing_message(client):
+    """Tests that a request without a message is rejected."""
+    assert client.post("/api/chat/stream", json={}).status_code == 400
+
+
+def test_flask_chat_route_runs_on_shared_loop(client):
+    """Tests that the mounted Flask chat route returns the generated response."""
+    response = client.post("/api/chat", json={"message": "hello"})
+
+    assert response.status_code == 200
+    assert response.json()["status"] == "success"
+    assert response.json()["response"] == "echo: hello"
@@ -0,0 +1,53 @@
+import time
+
+from app import web_app
+from app.stats_sampler import SystemStatsSampler
+
+
+def test_sample_does_not_block():
+    """Tests that taking a snapshot doesn't wait on psutil intervals."""
+    sampler = SystemStatsSampler()
+    start = time.perf_counter()
+    snapshot = sampler.sample()
+
+    assert time.perf_counter() - start < 0.1
+    assert set(snapshot) == {"cpu", "memory", "disk", "process", "system"}
+    assert len(snapshot["cpu"]["per_core"]) == snapshot["cpu"]["cores"]
+
+
+def test_history_is_bounded():
+    """Tests that the ring buffer keeps only the newest snapshots."""
+    sampler = SystemStatsSampler(history_size=3)
+    for _ in range(5):
+        sampler.sample()
+
+    history = sampler.history()
+    assert len(history) == 3
+    assert history[-1] is sampler.latest()
+    assert sampler.history(2) == history[-2:]
+
+
+def test_background_thread_samples_on_interval():
+    """Tests that the sampler thread adds snapshots on its own."""
+    sampler = SystemStatsSampler(interval=0.01)
+    sampler.start()
+    try:
+        deadline = time.monotonic() + 2
+        while len(sampler.history()) < 3 and time.monotonic() < deadline:
+            time.sleep(0.01)
+    finally:
+        sampler.stop()
+
+    assert len(sampler.history()) >= 3
+
+
+def test_stats_endpoint_serves_snapshot_with_history():
+    """Tests that the stats endpoint answers from the sampler."""
+    client = web_app.app.test_client()
+    start = time.perf_counter()
+    response = client.get("/api/system/stats?history=5")
+
+    assert time.perf_counter() - start < 0.5
+    data = response.get_json()
+    assert data["system"]["lightweight_mode"] == web_app.lightweight_mode
+    assert 1 <= len(data["history"]) <= 5